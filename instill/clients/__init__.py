@@ -1,3 +1,11 @@
+from instill.clients.async_client import (
+    AsyncArtifactClient,
+    AsyncInstillClient,
+    AsyncMgmtClient,
+    AsyncModelClient,
+    AsyncPipelineClient,
+)
+from instill.clients.batcher import PipelineBatcher
 from instill.clients.client import (
     InstillClient,
     init_artifact_client,
@@ -6,6 +14,12 @@ from instill.clients.client import (
     init_model_client,
     init_pipeline_client,
 )
+from instill.clients.fanout import TriggerResult
+from instill.clients.instance import ChannelOptions
 from instill.clients.mgmt import MgmtClient
 from instill.clients.model import ModelClient
+from instill.clients.operation import OperationError, OperationWaiter
 from instill.clients.pipeline import PipelineClient
+from instill.clients.policy import CallPolicy, HedgingPolicy, RetryPolicy
+from instill.clients.prepared import AsyncPreparedTrigger, PreparedTrigger
+from instill.clients.stream import AsyncTriggerStream, TriggerStream
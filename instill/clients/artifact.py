@@ -1,8 +1,13 @@
 # pylint: disable=no-member,wrong-import-position,too-many-lines,no-name-in-module
-from datetime import datetime
-from typing import Callable, List, Optional
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional
 
 # common
+import requests
 from google.protobuf import timestamp_pb2
 
 # artifact
@@ -14,10 +19,22 @@ import instill.protogen.artifact.artifact.v1alpha.object_pb2 as object_interface
 import instill.protogen.artifact.artifact.v1alpha.qa_pb2 as qa_interface
 import instill.protogen.common.healthcheck.v1beta.healthcheck_pb2 as healthcheck
 from instill.clients.base import Client, RequestFactory
-from instill.clients.instance import InstillInstance
+from instill.clients.instance import ChannelOptions, InstillInstance
+from instill.clients.paginator import paginate_by_token
+from instill.clients.policy import CallPolicy
 from instill.helpers.const import HOST_URL_PROD
-from instill.utils.error_handler import grpc_handler
-from instill.utils.process_file import process_file
+from instill.utils.error_handler import NotServingException, grpc_handler, raising
+from instill.utils.health_cache import DEFAULT_HEALTH_CHECK_TTL, HealthCache
+from instill.utils.process_file import (
+    DEFAULT_UPLOAD_CHUNK_SIZE,
+    ChunkedFileReader,
+    UploadManifest,
+    get_file_info,
+    hash_file,
+    process_file,
+)
+
+MANIFEST_FILE_NAME = ".instill-manifest.json"
 
 
 class ArtifactClient(Client):
@@ -29,6 +46,10 @@ class ArtifactClient(Client):
         secure: bool = True,
         requester_id: str = "",
         async_enabled: bool = False,
+        health_check_ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        preflight_check: bool = True,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
         self.host: InstillInstance = InstillInstance(
             artifact_service.ArtifactPublicServiceStub,
@@ -36,6 +57,11 @@ class ArtifactClient(Client):
             token=api_token,
             secure=secure,
             async_enabled=async_enabled,
+            call_policy=call_policy,
+            channel_options=channel_options,
+        )
+        self.health = HealthCache(
+            self.is_serving, ttl=health_check_ttl, enabled=preflight_check
         )
         self.metadata = []
         self._lookup_uid = lookup_func
@@ -45,12 +71,10 @@ class ArtifactClient(Client):
             self.metadata = [("instill-requester-uid", requester_uid)]
 
     def close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        self.host.close()
 
     async def async_close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        await self.host.async_close()
 
     @property
     def host(self):
@@ -88,24 +112,27 @@ class ArtifactClient(Client):
     def readiness(
         self,
         async_enabled: bool = False,
+        timeout: Optional[float] = None,
     ) -> artifact_interface.ReadinessResponse:
         if async_enabled:
             return RequestFactory(
                 method=self.host.async_client.Readiness,
                 request=artifact_interface.ReadinessRequest(),
                 metadata=self.host.metadata + self.metadata,
+                timeout=timeout,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.Readiness,
             request=artifact_interface.ReadinessRequest(),
             metadata=self.host.metadata + self.metadata,
+            timeout=timeout,
         ).send_sync()
 
-    def is_serving(self) -> bool:
+    def is_serving(self, timeout: Optional[float] = None) -> bool:
         try:
             return (
-                self.readiness().health_check_response.status
+                self.readiness(timeout=timeout).health_check_response.status
                 == healthcheck.HealthCheckResponse.SERVING_STATUS_SERVING
             )
         except Exception:
@@ -259,6 +286,225 @@ class ArtifactClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    @grpc_handler
+    def upload_catalog_file_chunked(
+        self,
+        namespace_id: str,
+        catalog_id: str,
+        file_path: str,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        object_expire_days: int = 0,
+        async_enabled: bool = False,
+    ) -> artifact_interface.UploadCatalogFileResponse:
+        """Upload a file of any size through a presigned object upload URL.
+
+        Unlike `upload_catalog_file`, the content is neither base64 encoded
+        nor embedded in the gRPC message: it is streamed from disk to the
+        presigned URL from `get_object_upload_url` in `chunk_size` reads, and
+        the catalog file then references the uploaded object.
+        """
+        if async_enabled:
+            return asyncio.to_thread(
+                self._upload_catalog_file_chunked,
+                namespace_id,
+                catalog_id,
+                file_path,
+                chunk_size,
+                object_expire_days,
+            )
+        return self._upload_catalog_file_chunked(
+            namespace_id, catalog_id, file_path, chunk_size, object_expire_days
+        )
+
+    def _upload_catalog_file_chunked(
+        self,
+        namespace_id: str,
+        catalog_id: str,
+        file_path: str,
+        chunk_size: int,
+        object_expire_days: int,
+        file_name: Optional[str] = None,
+    ) -> artifact_interface.UploadCatalogFileResponse:
+        base_name, file_type = get_file_info(file_path)
+        file_name = file_name or base_name
+        timestamp = timestamp_pb2.Timestamp()
+        timestamp.FromDatetime(
+            datetime.fromtimestamp(os.path.getmtime(file_path), tz=timezone.utc)
+        )
+
+        upload = RequestFactory(
+            method=self.host.client.GetObjectUploadURL,
+            request=object_interface.GetObjectUploadURLRequest(
+                namespace_id=namespace_id,
+                object_name=file_name,
+                url_expire_days=1,
+                last_modified_time=timestamp,
+                object_expire_days=object_expire_days,
+            ),
+            metadata=self.host.metadata + self.metadata,
+        ).send_sync()
+
+        with ChunkedFileReader(file_path, chunk_size) as reader:
+            resp = requests.put(upload.upload_url, data=reader, timeout=None)
+            resp.raise_for_status()
+
+        return RequestFactory(
+            method=self.host.client.UploadCatalogFile,
+            request=artifact_interface.UploadCatalogFileRequest(
+                namespace_id=namespace_id,
+                catalog_id=catalog_id,
+                file=artifact_interface.File(
+                    name=file_name, type=file_type, object_uid=upload.object.uid
+                ),
+            ),
+            metadata=self.host.metadata + self.metadata,
+        ).send_sync()
+
+    def upload_directory(
+        self,
+        namespace_id: str,
+        catalog_id: str,
+        path: str,
+        workers: int = 8,
+        manifest_path: Optional[str] = None,
+        process_batch_size: int = 100,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+    ) -> dict:
+        """Upload every supported file under `path` to a catalog and process them.
+
+        Files are type-checked, hashed and uploaded on `workers` threads,
+        named by their path relative to `path`. A file whose sha256 is
+        already recorded for this catalog in the manifest
+        (`<path>/.instill-manifest.json` by default), or was uploaded earlier
+        in the same run, is skipped. Files larger than `chunk_size` are
+        streamed as in `upload_catalog_file_chunked`. New files are then
+        passed to `process_catalog_files` in batches of `process_batch_size`,
+        and recorded in the manifest once their batch was accepted.
+
+        Returns:
+            a dict of the relative paths that were `uploaded`, `skipped` as
+            already uploaded, `unsupported`, or `failed` (mapped to the error),
+            and of the `file_uids` sent for processing
+        """
+        if not self.health.is_serving():
+            raise NotServingException
+
+        manifest = UploadManifest(
+            manifest_path or os.path.join(path, MANIFEST_FILE_NAME)
+        )
+        catalog = f"{namespace_id}/{catalog_id}"
+        file_paths = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            if not name.startswith(MANIFEST_FILE_NAME)
+        )
+        summary: dict = {
+            "uploaded": [],
+            "skipped": [],
+            "unsupported": [],
+            "failed": {},
+            "file_uids": [],
+        }
+        # content hash -> Event set once the upload claiming it has finished
+        claims: dict = {}
+        uploaded_hashes: set = set()
+        lock = threading.Lock()
+
+        def claim(content_hash: str) -> bool:
+            """Claim a hash for upload, or return False if another file had it."""
+            while True:
+                with lock:
+                    if content_hash in uploaded_hashes:
+                        return False
+                    pending = claims.get(content_hash)
+                    if pending is None:
+                        claims[content_hash] = threading.Event()
+                        return True
+                # wait for the claiming upload; if it failed, try to claim again
+                pending.wait()
+
+        def release(content_hash: str, uploaded: bool):
+            with lock:
+                if uploaded:
+                    uploaded_hashes.add(content_hash)
+                claims.pop(content_hash).set()
+
+        def ingest(file_path: str):
+            rel_path = os.path.relpath(file_path, path)
+            try:
+                get_file_info(file_path)
+            except ValueError:
+                return rel_path, "unsupported", None
+            content_hash = hash_file(file_path)
+            if manifest.get(catalog, content_hash) is not None or not claim(
+                content_hash
+            ):
+                return rel_path, "skipped", None
+
+            # the relative path keeps same-named files of different folders apart
+            file_name = rel_path.replace(os.sep, "/")
+            uploaded = False
+            try:
+                if os.path.getsize(file_path) > chunk_size:
+                    resp = self._upload_catalog_file_chunked(
+                        namespace_id, catalog_id, file_path, chunk_size, 0, file_name
+                    )
+                else:
+                    file = process_file(file_path)
+                    file.name = file_name
+                    resp = RequestFactory(
+                        method=self.host.client.UploadCatalogFile,
+                        request=artifact_interface.UploadCatalogFileRequest(
+                            namespace_id=namespace_id,
+                            catalog_id=catalog_id,
+                            file=file,
+                        ),
+                        metadata=self.host.metadata + self.metadata,
+                    ).send_sync()
+                uploaded = True
+            finally:
+                release(content_hash, uploaded)
+            return rel_path, "uploaded", (resp.file.file_uid, content_hash, file_name)
+
+        def ingest_or_fail(file_path: str):
+            try:
+                return ingest(file_path)
+            except Exception as e:
+                return os.path.relpath(file_path, path), "failed", e
+
+        uploads = {}  # file uid -> (relative path, content hash, file name)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for rel_path, status, value in executor.map(ingest_or_fail, file_paths):
+                if status == "failed":
+                    summary["failed"][rel_path] = value
+                    continue
+                summary[status].append(rel_path)
+                if status == "uploaded":
+                    file_uid, content_hash, file_name = value
+                    uploads[file_uid] = (rel_path, content_hash, file_name)
+
+        # files are recorded in the manifest only once processing has been
+        # requested, so a file whose processing failed is retried next time
+        file_uids = list(uploads)
+        try:
+            for i in range(0, len(file_uids), process_batch_size):
+                batch = file_uids[i : i + process_batch_size]
+                try:
+                    raising(self.process_catalog_files)(batch)
+                except Exception as e:
+                    for file_uid in batch:
+                        summary["failed"][uploads[file_uid][0]] = e
+                    continue
+                summary["file_uids"].extend(batch)
+                for file_uid in batch:
+                    _, content_hash, file_name = uploads[file_uid]
+                    manifest.add(catalog, content_hash, file_name, file_uid)
+        finally:
+            manifest.save()
+
+        return summary
+
     @grpc_handler
     def delete_catalog_file(
         self,
@@ -345,6 +591,27 @@ class ArtifactClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_catalog_files(
+        self,
+        namespace_id: str,
+        catalog_id: str,
+        files_filter: Optional[list[str]] = None,
+        page_size: int = 10,
+        prefetch: bool = True,
+    ) -> Iterator[artifact_interface.File]:
+        """Lazily iterate over all files of a catalog, see `list_catalog_files`."""
+        return paginate_by_token(
+            lambda token: self.list_catalog_files(
+                namespace_id=namespace_id,
+                catalog_id=catalog_id,
+                files_filter=files_filter,
+                page_size=page_size,
+                page_token=token,
+            ),
+            "files",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_chunks(
         self,
@@ -0,0 +1,374 @@
+# pylint: disable=no-member,no-name-in-module,protected-access
+import asyncio
+import functools
+import inspect
+from typing import Any, Dict, List, Optional, Type
+
+import instill.protogen.common.healthcheck.v1beta.healthcheck_pb2 as healthcheck
+import instill.protogen.core.mgmt.v1beta.mgmt_pb2 as mgmt_interface
+from instill.clients.artifact import ArtifactClient
+from instill.clients.fanout import (
+    DEFAULT_TRIGGER_CONCURRENCY,
+    TriggerResult,
+    async_fan_out,
+)
+from instill.clients.instance import ChannelOptions
+from instill.clients.mgmt import MgmtClient
+from instill.clients.model import ModelClient
+from instill.clients.pipeline import PipelineClient
+from instill.clients.policy import CallPolicy
+from instill.clients.prepared import AsyncPreparedTrigger
+from instill.clients.stream import AsyncTriggerStream
+from instill.helpers.const import HOST_URL_PROD
+from instill.utils.error_handler import (
+    NamespaceException,
+    NotServingException,
+    async_grpc_handler,
+    is_grpc_handler,
+    raising,
+)
+from instill.utils.health_cache import (
+    DEFAULT_HEALTH_CHECK_TIMEOUT,
+    DEFAULT_HEALTH_CHECK_TTL,
+    HealthCache,
+)
+from instill.utils.logger import Logger
+from instill.utils.namespace_cache import get_namespace_cache
+
+
+def _async_method(func):
+    """Turn a `grpc_handler` method of a sync client into a coroutine.
+
+    The sync method builds the request and, with `async_enabled=True`, hands
+    back an awaitable `grpc.aio` call (or an async iterator for streams).
+    """
+
+    @async_grpc_handler
+    @functools.wraps(func)
+    async def method(self, *args, **kwargs):
+        return await self._call(func.__name__, *args, **kwargs)
+
+    return method
+
+
+class AsyncClient:
+    """Base class of the asyncio clients built on `grpc.aio`.
+
+    Every `grpc_handler` method of `sync_client_class` is exposed as a
+    coroutine with the same name and arguments. Requests are built by a
+    wrapped sync client and sent over its pooled `grpc.aio` channel, so no
+    call blocks the event loop. That channel is acquired from the running
+    loop on the first call, so a client may be created outside the loop it is
+    used on. RPC errors are raised instead of exiting.
+    """
+
+    sync_client_class: Type
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, attr in vars(cls.sync_client_class).items():
+            if name.startswith("_") or name in vars(cls):
+                continue
+            if is_grpc_handler(attr):
+                setattr(cls, name, _async_method(attr))
+
+    def __init__(
+        self,
+        api_token: str,
+        url: str = HOST_URL_PROD,
+        secure: bool = True,
+        health_check_ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        preflight_check: bool = True,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
+    ) -> None:
+        kwargs: Dict[str, Any] = {}
+        if self.sync_client_class is not MgmtClient:
+            kwargs["lookup_func"] = self._unsupported_lookup
+        self._client = self.sync_client_class(
+            api_token=api_token,
+            url=url,
+            secure=secure,
+            async_enabled=True,
+            preflight_check=False,
+            call_policy=call_policy,
+            channel_options=channel_options,
+            **kwargs,
+        )
+        self.health = HealthCache(
+            self._client.is_serving,
+            ttl=health_check_ttl,
+            enabled=preflight_check,
+            async_probe=self.is_serving,
+        )
+
+    @staticmethod
+    def _unsupported_lookup(_: str) -> str:
+        raise NamespaceException("use AsyncInstillClient to resolve a requester")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def host(self):
+        return self._client.host
+
+    @property
+    def metadata(self):
+        return self._client.metadata
+
+    @metadata.setter
+    def metadata(self, metadata: list):
+        self._client.metadata = metadata
+
+    async def close(self):
+        await self._client.async_close()
+
+    async def _call(self, name: str, *args, **kwargs):
+        # the wrapped sync client skips its own preflight check, which this
+        # client makes on the loop instead
+        kwargs["async_enabled"] = True
+        resp = raising(getattr(self._client, name))(*args, **kwargs)
+        if inspect.isawaitable(resp):
+            resp = await resp
+        return resp
+
+    async def liveness(self):
+        return await self._client.liveness(async_enabled=True)
+
+    async def readiness(self, timeout: Optional[float] = None):
+        return await self._client.readiness(async_enabled=True, timeout=timeout)
+
+    async def is_serving(self, timeout: Optional[float] = None) -> bool:
+        try:
+            resp = await self.readiness(timeout=timeout)
+            return (
+                resp.health_check_response.status
+                == healthcheck.HealthCheckResponse.SERVING_STATUS_SERVING
+            )
+        except Exception:
+            return False
+
+
+class AsyncMgmtClient(AsyncClient):
+    sync_client_class = MgmtClient
+
+    async def _lookup_namespace_uid(self, namespace_id: str) -> str:
+        return await get_namespace_cache().async_resolve(
+            self.host.url, namespace_id, self._fetch_namespace_uid
+        )
+
+    async def _fetch_namespace_uid(self, namespace_id: str) -> str:
+        resp = await self._call("check_namespace", namespace_id)
+        if resp.type == mgmt_interface.CheckNamespaceAdminResponse.NAMESPACE_USER:
+            resp = await self._call("get_user", namespace_id)
+            return resp.user.uid
+        if (
+            resp.type
+            == mgmt_interface.CheckNamespaceAdminResponse.NAMESPACE_ORGANIZATION
+        ):
+            resp = await self._call("get_organization", namespace_id)
+            return resp.organization.uid
+        raise NamespaceException("namespace ID not available")
+
+
+class AsyncPipelineClient(AsyncClient):
+    sync_client_class = PipelineClient
+
+    def prepare_trigger(
+        self, namespace_id: str, pipeline_id: str
+    ) -> AsyncPreparedTrigger:
+        """Async counterpart of `PipelineClient.prepare_trigger`."""
+        return self._client.prepare_trigger(namespace_id, pipeline_id).as_async(
+            self.health
+        )
+
+    async def trigger_many(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        inputs: List[List[dict]],
+        concurrency: int = DEFAULT_TRIGGER_CONCURRENCY,
+        ordered: bool = True,
+    ) -> List[TriggerResult]:
+        """Coroutine counterpart of `PipelineClient.trigger_many`."""
+        if not await self.health.async_is_serving():
+            raise NotServingException
+        prepared = self.prepare_trigger(namespace_id, pipeline_id)
+        return await async_fan_out(
+            prepared.trigger,
+            inputs,
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+
+    def stream_trigger(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        data: List[dict],
+        timeout: Optional[float] = None,
+    ) -> AsyncTriggerStream:
+        """Async counterpart of `PipelineClient.stream_trigger`.
+
+        Example:
+            async for chunk in client.stream_trigger(ns, pipeline_id, data):
+                print(chunk["outputs"])
+        """
+        return AsyncTriggerStream(
+            lambda: raising(self._client.trigger_with_stream)(
+                namespace_id,
+                pipeline_id,
+                data,
+                async_enabled=True,
+                timeout=timeout,
+            ),
+            self.health,
+        )
+
+
+class AsyncModelClient(AsyncClient):
+    sync_client_class = ModelClient
+
+    def prepare_trigger(
+        self, namespace_id: str, model_id: str, version: str
+    ) -> AsyncPreparedTrigger:
+        """Async counterpart of `ModelClient.prepare_trigger`."""
+        return self._client.prepare_trigger(namespace_id, model_id, version).as_async(
+            self.health
+        )
+
+    async def trigger_many(
+        self,
+        namespace_id: str,
+        model_id: str,
+        inputs: List[List[dict]],
+        version: str,
+        concurrency: int = DEFAULT_TRIGGER_CONCURRENCY,
+        ordered: bool = True,
+    ) -> List[TriggerResult]:
+        """Coroutine counterpart of `ModelClient.trigger_many`."""
+        if not await self.health.async_is_serving():
+            raise NotServingException
+        prepared = self.prepare_trigger(namespace_id, model_id, version)
+        return await async_fan_out(
+            prepared.trigger,
+            inputs,
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+
+
+class AsyncArtifactClient(AsyncClient):
+    sync_client_class = ArtifactClient
+
+
+class AsyncInstillClient:
+    """asyncio counterpart of `InstillClient`.
+
+    Construction never performs I/O. Service probes and requester lookup run
+    concurrently on the loop in `connect()`, which `async with` calls for you;
+    otherwise each service is probed lazily on its first call.
+
+    Example:
+        async with AsyncInstillClient(api_token=token) as client:
+            outputs = await client.pipeline.trigger(namespace_id, pipeline_id, data)
+    """
+
+    def __init__(
+        self,
+        api_token: str,
+        url: str = HOST_URL_PROD,
+        secure: bool = True,
+        requester_id: str = "",
+        health_check_ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        preflight_check: bool = True,
+        lazy_health_check: bool = False,
+        health_check_timeout: float = DEFAULT_HEALTH_CHECK_TIMEOUT,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
+    ) -> None:
+        kwargs: Dict[str, Any] = {
+            "api_token": api_token,
+            "url": url,
+            "secure": secure,
+            "health_check_ttl": health_check_ttl,
+            "preflight_check": preflight_check,
+            "call_policy": call_policy,
+            "channel_options": channel_options,
+        }
+        self.mgmt = AsyncMgmtClient(**kwargs)
+        self.pipeline = AsyncPipelineClient(**kwargs)
+        self.model = AsyncModelClient(**kwargs)
+        self.artifact = AsyncArtifactClient(**kwargs)
+
+        self._requester_id = requester_id
+        self._lazy_health_check = lazy_health_check
+        self._health_check_timeout = health_check_timeout
+        self._connected = False
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _clients(self) -> tuple:
+        return (self.mgmt, self.pipeline, self.model, self.artifact)
+
+    async def connect(self):
+        """Probe all services concurrently and resolve the requester namespace."""
+        if self._connected:
+            return self
+
+        if not self._lazy_health_check:
+            await self._probe_services(self._health_check_timeout)
+
+        if self._requester_id != "":
+            requester_uid = await self.mgmt._lookup_namespace_uid(self._requester_id)
+            for client in self._clients():
+                client.metadata = [("instill-requester-uid", requester_uid)]
+
+        self._connected = True
+        return self
+
+    async def _probe_services(self, timeout: float):
+        clients = self._clients()
+        statuses = await asyncio.gather(
+            *(client.is_serving(timeout) for client in clients)
+        )
+        for client, status in zip(clients, statuses):
+            client.health.set(status)
+
+        mgmt_serving, pipeline_serving, model_serving, artifact_serving = statuses
+        if not mgmt_serving:
+            Logger.w("Instill Core is required")
+            raise NotServingException
+        if not pipeline_serving:
+            Logger.w("Instill VDP is not serving, VDP functionalities will not work")
+        if not model_serving:
+            Logger.w(
+                "Instill Model is not serving, Model functionalities will not work"
+            )
+        if not artifact_serving:
+            Logger.w(
+                "Instill Artifact is not serving, Artifact functionalities will not work"
+            )
+
+    async def close(self):
+        await asyncio.gather(*(client.close() for client in self._clients()))
+
+    def get_mgmt(self) -> AsyncMgmtClient:
+        return self.mgmt
+
+    def get_artifact(self) -> AsyncArtifactClient:
+        return self.artifact
+
+    def get_pipeline(self) -> AsyncPipelineClient:
+        return self.pipeline
+
+    def get_model(self) -> AsyncModelClient:
+        return self.model
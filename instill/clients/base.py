@@ -1,10 +1,11 @@
 """Base client interface module."""
 
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Optional, Union
 
 import google.protobuf.message
 import grpc
+from google.protobuf.json_format import MessageToDict
 
 
 class Client(ABC):
@@ -40,12 +41,12 @@ class Client(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def readiness(self):
+    def readiness(self, async_enabled: bool = False, timeout: Optional[float] = None):
         """Check if the service is ready to serve."""
         raise NotImplementedError
 
     @abstractmethod
-    def is_serving(self):
+    def is_serving(self, timeout: Optional[float] = None):
         """Check if the service is currently serving."""
         raise NotImplementedError
 
@@ -58,22 +59,56 @@ class RequestFactory:
         method: Union[grpc.UnaryUnaryMultiCallable, grpc.StreamUnaryMultiCallable],
         request: google.protobuf.message.Message,
         metadata,
+        timeout: Optional[float] = None,
+        compression: Optional[grpc.Compression] = None,
     ) -> None:
         self.method = method
         self.request = request
         self.metadata = metadata
+        self.timeout = timeout
+        self.compression = compression
 
     def send_sync(self):
         """Send a synchronous gRPC request."""
-        return self.method(request=self.request, metadata=self.metadata)
+        return self.method(
+            request=self.request,
+            metadata=self.metadata,
+            timeout=self.timeout,
+            compression=self.compression,
+        )
 
     def send_stream(self):
         """Send a streaming gRPC request."""
         return self.method(
             request_iterator=iter([self.request]),
             metadata=self.metadata,
+            timeout=self.timeout,
+            compression=self.compression,
         )
 
     async def send_async(self):
         """Send an asynchronous gRPC request."""
-        return await self.method(request=self.request, metadata=self.metadata)
+        return await self.method(
+            request=self.request,
+            metadata=self.metadata,
+            timeout=self.timeout,
+            compression=self.compression,
+        )
+
+    def send_async_stream(self):
+        """Send an asynchronous server-streaming gRPC request.
+
+        The returned `grpc.aio` call is an async iterator of responses and is
+        not awaitable itself.
+        """
+        return self.method(
+            request=self.request,
+            metadata=self.metadata,
+            timeout=self.timeout,
+            compression=self.compression,
+        )
+
+
+async def message_to_dict_async(response) -> dict:
+    """Await a gRPC response and convert it to a dict."""
+    return MessageToDict(await response)
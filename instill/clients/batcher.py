@@ -0,0 +1,155 @@
+# pylint: disable=no-member
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from instill.clients.pipeline import PipelineClient
+from instill.utils.error_handler import raising
+
+
+class _PendingBatch:
+    def __init__(self) -> None:
+        self.items: List[Tuple[dict, Future]] = []
+        self.deadline = 0.0
+
+
+class PipelineBatcher:
+    """Coalesce single-item pipeline triggers into batched requests.
+
+    Callers on any thread submit one input at a time; inputs for the same
+    pipeline are sent together in one `TriggerNamespacePipelineRequest` once
+    `max_batch_size` inputs are queued or the oldest one has waited
+    `max_wait_ms`. Each caller receives its own output, in the same shape as
+    `PipelineClient.trigger` returns for a single input. RPC errors fail the
+    futures of the affected batch instead of exiting the process, and so does
+    `NotServingException` when the client's cached serving status, checked
+    before each batch, says the host is down.
+
+    Example:
+        with PipelineBatcher(client.pipeline, max_batch_size=16) as batcher:
+            resp = batcher.trigger(namespace_id, pipeline_id, {"prompt": "hi"})
+    """
+
+    def __init__(
+        self,
+        client: PipelineClient,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        max_in_flight: int = 4,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self._client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: Dict[Tuple[str, str], _PendingBatch] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="pipeline-batcher"
+        )
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, namespace_id: str, pipeline_id: str, data: dict) -> Future:
+        """Queue one input and return a future resolving to its trigger output."""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("PipelineBatcher is closed")
+            key = (namespace_id, pipeline_id)
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = _PendingBatch()
+                batch.deadline = time.monotonic() + self.max_wait
+                self._pending[key] = batch
+            batch.items.append((data, future))
+            if len(batch.items) >= self.max_batch_size:
+                self._dispatch(key)
+            self._cond.notify()
+        return future
+
+    def trigger(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        data: dict,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        return self.submit(namespace_id, pipeline_id, data).result(timeout)
+
+    async def trigger_async(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        data: dict,
+    ) -> dict:
+        return await asyncio.wrap_future(self.submit(namespace_id, pipeline_id, data))
+
+    def flush(self):
+        """Send every queued input now, without waiting for `max_wait_ms`."""
+        with self._cond:
+            for key in list(self._pending):
+                self._dispatch(key)
+
+    def close(self):
+        """Flush queued inputs and wait for in-flight batches to finish."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                now = time.monotonic()
+                for key, batch in list(self._pending.items()):
+                    if batch.deadline <= now:
+                        self._dispatch(key)
+                timeout = None
+                if self._pending:
+                    next_deadline = min(b.deadline for b in self._pending.values())
+                    timeout = max(next_deadline - now, 0)
+                self._cond.wait(timeout=timeout)
+
+    def _dispatch(self, key: Tuple[str, str]):
+        # called with self._cond held
+        batch = self._pending.pop(key)
+        self._executor.submit(self._send_batch, key, batch.items)
+
+    def _send_batch(self, key: Tuple[str, str], items: List[Tuple[dict, Future]]):
+        items = [item for item in items if item[1].set_running_or_notify_cancel()]
+        if not items:
+            return
+        futures = [future for _, future in items]
+        try:
+            resp = raising(self._client.trigger)(key[0], key[1], [d for d, _ in items])
+            outputs = resp.get("outputs", [])
+            if len(outputs) != len(items):
+                raise ValueError(
+                    f"expected {len(items)} outputs from batched trigger, "
+                    f"got {len(outputs)}"
+                )
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        metadata = resp.get("metadata")
+        for future, output in zip(futures, outputs):
+            result = {"outputs": [output]}
+            if metadata is not None:
+                result["metadata"] = metadata
+            future.set_result(result)
@@ -1,11 +1,19 @@
 # pylint: disable=no-name-in-module,no-member
-import instill.protogen.core.mgmt.v1beta.mgmt_pb2 as mgmt_interface
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 from instill.clients.artifact import ArtifactClient
+from instill.clients.instance import ChannelOptions
 from instill.clients.mgmt import MgmtClient
 from instill.clients.model import ModelClient
 from instill.clients.pipeline import PipelineClient
+from instill.clients.policy import CallPolicy
 from instill.helpers.const import HOST_URL_PROD
-from instill.utils.error_handler import NamespaceException, NotServingException
+from instill.utils.error_handler import NotServingException
+from instill.utils.health_cache import (
+    DEFAULT_HEALTH_CHECK_TIMEOUT,
+    DEFAULT_HEALTH_CHECK_TTL,
+)
 from instill.utils.logger import Logger
 
 
@@ -17,68 +25,118 @@ class InstillClient:
         secure: bool = True,
         requester_id="",
         async_enabled: bool = False,
+        health_check_ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        preflight_check: bool = True,
+        lazy_health_check: bool = False,
+        health_check_timeout: float = DEFAULT_HEALTH_CHECK_TIMEOUT,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
         self.mgmt = MgmtClient(
             api_token=api_token,
             url=url,
             secure=secure,
-            requester_id=requester_id,
             async_enabled=async_enabled,
+            health_check_ttl=health_check_ttl,
+            preflight_check=preflight_check,
+            call_policy=call_policy,
+            channel_options=channel_options,
         )
-        if not self.mgmt.is_serving():
-            Logger.w("Instill Core is required")
-            raise NotServingException
-
         self.pipeline = PipelineClient(
             api_token=api_token,
             url=url,
             secure=secure,
             lookup_func=self._lookup_namespace_uid,
-            requester_id=requester_id,
             async_enabled=async_enabled,
+            health_check_ttl=health_check_ttl,
+            preflight_check=preflight_check,
+            call_policy=call_policy,
+            channel_options=channel_options,
         )
-        if not self.pipeline.is_serving():
-            Logger.w("Instill VDP is not serving, VDP functionalities will not work")
-
         self.model = ModelClient(
             api_token=api_token,
             url=url,
             secure=secure,
             lookup_func=self._lookup_namespace_uid,
-            requester_id=requester_id,
             async_enabled=async_enabled,
+            health_check_ttl=health_check_ttl,
+            preflight_check=preflight_check,
+            call_policy=call_policy,
+            channel_options=channel_options,
         )
-        if not self.model.is_serving():
-            Logger.w(
-                "Instill Model is not serving, Model functionalities will not work"
-            )
-
         self.artifact = ArtifactClient(
             api_token=api_token,
             url=url,
             secure=secure,
             lookup_func=self._lookup_namespace_uid,
-            requester_id=requester_id,
             async_enabled=async_enabled,
+            health_check_ttl=health_check_ttl,
+            preflight_check=preflight_check,
+            call_policy=call_policy,
+            channel_options=channel_options,
         )
-        if not self.artifact.is_serving():
+
+        # with lazy_health_check each service is probed on its first call
+        if not lazy_health_check:
+            self._probe_services(health_check_timeout)
+
+        if requester_id != "":
+            requester_uid = self._lookup_namespace_uid(requester_id)
+            for client in self._clients():
+                client.metadata = [("instill-requester-uid", requester_uid)]
+
+    @classmethod
+    def from_config(cls, host: str = "default", **kwargs) -> "InstillClient":
+        """Create a client for one of the hosts of the SDK `Configuration`.
+
+        Args:
+            host: name of the host in the configuration file
+            kwargs: other `InstillClient` arguments
+        """
+        # imported here as loading instill.config reads the user's config file
+        from instill.config import (  # pylint: disable=import-outside-toplevel
+            global_config,
+        )
+
+        instill_host = global_config.hosts[host]
+        return cls(
+            api_token=instill_host.token,
+            url=instill_host.url,
+            secure=instill_host.secure,
+            channel_options=ChannelOptions(**(instill_host.channel_options or {})),
+            **kwargs,
+        )
+
+    def _clients(self) -> tuple:
+        return (self.mgmt, self.pipeline, self.model, self.artifact)
+
+    def _probe_services(self, timeout: float):
+        """Probe all services concurrently, each bounded by `timeout` seconds."""
+        clients = self._clients()
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            statuses = list(
+                executor.map(lambda client: client.is_serving(timeout), clients)
+            )
+        for client, status in zip(clients, statuses):
+            client.health.set(status)
+
+        mgmt_serving, pipeline_serving, model_serving, artifact_serving = statuses
+        if not mgmt_serving:
+            Logger.w("Instill Core is required")
+            raise NotServingException
+        if not pipeline_serving:
+            Logger.w("Instill VDP is not serving, VDP functionalities will not work")
+        if not model_serving:
+            Logger.w(
+                "Instill Model is not serving, Model functionalities will not work"
+            )
+        if not artifact_serving:
             Logger.w(
                 "Instill Artifact is not serving, Artifact functionalities will not work"
             )
 
     def _lookup_namespace_uid(self, namespace_id: str):
-        resp = self.mgmt.check_namespace(namespace_id)
-        if resp.type == mgmt_interface.CheckNamespaceAdminResponse.NAMESPACE_USER:
-            namespace_uid = self.mgmt.get_user(namespace_id).user.uid
-        elif (
-            resp.type
-            == mgmt_interface.CheckNamespaceAdminResponse.NAMESPACE_ORGANIZATION
-        ):
-            namespace_uid = self.mgmt.get_organization(namespace_id).organization.uid
-        else:
-            raise NamespaceException("namespace ID not available")
-
-        return namespace_uid
+        return self.mgmt._lookup_namespace_uid(namespace_id)
 
     def close(self):
         self.mgmt.close()
@@ -87,10 +145,10 @@ class InstillClient:
         self.artifact.close()
 
     async def async_close(self):
-        self.mgmt.async_close()
-        self.pipeline.async_close()
-        self.model.async_close()
-        self.artifact.async_close()
+        await self.mgmt.async_close()
+        await self.pipeline.async_close()
+        await self.model.async_close()
+        await self.artifact.async_close()
 
     def get_mgmt(self) -> MgmtClient:
         return self.mgmt
@@ -135,7 +193,7 @@ def init_artifact_client(
         async_enabled=async_enabled,
         secure=secure,
     )
-    if not client.get_artifact().is_serving():
+    if not client.get_artifact().health.is_serving():
         Logger.w(
             "Instill Artifact is not serving, Artifact functionalities will not work"
         )
@@ -158,7 +216,7 @@ def init_model_client(
         async_enabled=async_enabled,
         secure=secure,
     )
-    if not client.get_model().is_serving():
+    if not client.get_model().health.is_serving():
         Logger.w("Instill Model is not serving, Model functionalities will not work")
         raise NotServingException
 
@@ -179,7 +237,7 @@ def init_pipeline_client(
         async_enabled=async_enabled,
         secure=secure,
     )
-    if not client.get_pipeline().is_serving():
+    if not client.get_pipeline().health.is_serving():
         Logger.w("Instill VDP is not serving, VDP functionalities will not work")
         raise NotServingException
 
@@ -200,7 +258,7 @@ def init_mgmt_client(
         async_enabled=async_enabled,
         secure=secure,
     )
-    if not client.get_mgmt().is_serving():
+    if not client.get_mgmt().health.is_serving():
         Logger.w("Instill Core is required")
         raise NotServingException
 
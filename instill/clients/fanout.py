@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Awaitable, Callable, Iterator, List, Optional, Sequence
+
+DEFAULT_TRIGGER_CONCURRENCY = 8
+
+
+class TriggerResult:
+    """Outcome of one trigger in a `trigger_many` fan-out.
+
+    Exactly one of `output` and `error` is set. `index` is the position of
+    the input in the sequence passed to `trigger_many`.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        inputs: Any,
+        output: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        self.index = index
+        self.inputs = inputs
+        self.output = output
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"TriggerResult(index={self.index}, {status})"
+
+
+def _run_one(call: Callable[[Any], Any], index: int, inputs: Any) -> TriggerResult:
+    try:
+        return TriggerResult(index, inputs, output=call(inputs))
+    except Exception as e:
+        return TriggerResult(index, inputs, error=e)
+
+
+def fan_out(
+    call: Callable[[Any], Any],
+    inputs: Sequence[Any],
+    concurrency: int = DEFAULT_TRIGGER_CONCURRENCY,
+    ordered: bool = True,
+) -> Iterator[TriggerResult]:
+    """Run `call` once per input on a pool of at most `concurrency` threads.
+
+    All inputs are submitted before this returns. The returned iterator
+    yields results in input order, or as they complete with `ordered=False`,
+    and shuts the pool down once exhausted.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    executor = ThreadPoolExecutor(
+        max_workers=min(concurrency, max(len(inputs), 1)),
+        thread_name_prefix="trigger-many",
+    )
+    futures = [executor.submit(_run_one, call, i, inp) for i, inp in enumerate(inputs)]
+
+    def results() -> Iterator[TriggerResult]:
+        try:
+            for future in futures if ordered else as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return results()
+
+
+async def async_fan_out(
+    call: Callable[[Any], Awaitable[Any]],
+    inputs: Sequence[Any],
+    concurrency: int = DEFAULT_TRIGGER_CONCURRENCY,
+    ordered: bool = True,
+) -> List[TriggerResult]:
+    """Await `call` once per input with at most `concurrency` calls in flight.
+
+    Results are returned in input order, or in completion order with
+    `ordered=False`.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(index: int, inp: Any) -> TriggerResult:
+        async with semaphore:
+            try:
+                return TriggerResult(index, inp, output=await call(inp))
+            except Exception as e:
+                return TriggerResult(index, inp, error=e)
+
+    tasks = [run_one(i, inp) for i, inp in enumerate(inputs)]
+    if ordered:
+        return list(await asyncio.gather(*tasks))
+    return [await task for task in asyncio.as_completed(tasks)]
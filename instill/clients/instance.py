@@ -1,60 +1,326 @@
-from typing import Union
+import asyncio
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
 
 import grpc
 
+import instill.protogen.artifact.artifact.v1alpha.artifact_public_service_pb2 as artifact_service_pb
 import instill.protogen.artifact.artifact.v1alpha.artifact_public_service_pb2_grpc as artifact_service
+import instill.protogen.core.mgmt.v1beta.mgmt_public_service_pb2 as mgmt_service_pb
 import instill.protogen.core.mgmt.v1beta.mgmt_public_service_pb2_grpc as mgmt_service
+import instill.protogen.model.model.v1alpha.model_public_service_pb2 as model_service_pb
 import instill.protogen.model.model.v1alpha.model_public_service_pb2_grpc as model_service
+import instill.protogen.pipeline.pipeline.v1beta.pipeline_public_service_pb2 as pipeline_service_pb
 import instill.protogen.pipeline.pipeline.v1beta.pipeline_public_service_pb2_grpc as pipeline_service
+from instill.clients.policy import DEFAULT_CALL_POLICY, CallPolicy
 
 MB = 1024**2
 
+DEFAULT_CHANNEL_OPTIONS = (
+    ("grpc.max_send_message_length", 32 * MB),
+    ("grpc.max_receive_message_length", 32 * MB),
+)
+
+
+class ChannelOptions:
+    """gRPC channel arguments of the connection to a host.
+
+    Args:
+        max_send_message_length: largest request in bytes
+        max_receive_message_length: largest response in bytes
+        keepalive_time: seconds between HTTP/2 keepalive pings, None to not
+            ping; must not be shorter than the server's minimum ping interval
+        keepalive_timeout: seconds to wait for a ping ack before the
+            connection is considered dead
+        keepalive_permit_without_calls: also ping connections with no call
+            in flight, so idle connections dropped by a load balancer are
+            noticed before the next call
+        lb_policy: e.g. "round_robin" to spread calls over every address the
+            host name resolves to, instead of gRPC's default "pick_first"
+        http2_window_size: fixed HTTP/2 flow control window in bytes, None
+            to let gRPC size it by probing the bandwidth-delay product
+        extra: any other channel arguments, by name
+
+    Example:
+        options = ChannelOptions(keepalive_time=60, lb_policy="round_robin")
+        client = InstillClient(api_token=token, channel_options=options)
+    """
+
+    def __init__(
+        self,
+        max_send_message_length: int = 32 * MB,
+        max_receive_message_length: int = 32 * MB,
+        keepalive_time: Optional[float] = None,
+        keepalive_timeout: float = 20.0,
+        keepalive_permit_without_calls: bool = False,
+        lb_policy: Optional[str] = None,
+        http2_window_size: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.max_send_message_length = max_send_message_length
+        self.max_receive_message_length = max_receive_message_length
+        self.keepalive_time = keepalive_time
+        self.keepalive_timeout = keepalive_timeout
+        self.keepalive_permit_without_calls = keepalive_permit_without_calls
+        self.lb_policy = lb_policy
+        self.http2_window_size = http2_window_size
+        self.extra = dict(extra or {})
+
+    def to_options(self) -> tuple:
+        options: list = [
+            ("grpc.max_send_message_length", self.max_send_message_length),
+            ("grpc.max_receive_message_length", self.max_receive_message_length),
+        ]
+        if self.keepalive_time is not None:
+            options += [
+                ("grpc.keepalive_time_ms", int(self.keepalive_time * 1000)),
+                ("grpc.keepalive_timeout_ms", int(self.keepalive_timeout * 1000)),
+                (
+                    "grpc.keepalive_permit_without_calls",
+                    int(self.keepalive_permit_without_calls),
+                ),
+                # by default only two pings are sent while no data flows
+                ("grpc.http2.max_pings_without_data", 0),
+            ]
+        if self.lb_policy is not None:
+            options.append(("grpc.lb_policy_name", self.lb_policy))
+        if self.http2_window_size is not None:
+            options += [
+                ("grpc.http2.lookahead_bytes", self.http2_window_size),
+                ("grpc.http2.bdp_probe", 0),
+            ]
+        options += sorted(self.extra.items())
+        return tuple(options)
+
+
+# every service stub of a host shares one channel, so the service config of
+# a channel covers all of them
+SERVICES = tuple(
+    service
+    for module in (
+        artifact_service_pb,
+        mgmt_service_pb,
+        model_service_pb,
+        pipeline_service_pb,
+    )
+    for service in module.DESCRIPTOR.services_by_name.values()
+)
+
+
+class ChannelPool:
+    """Process-wide pool of refcounted gRPC channels.
+
+    Channels are keyed by (url, secure, options) so that every service stub
+    pointing at the same host shares one TCP/TLS/HTTP2 connection. Secure
+    channels bake the access token into their credentials, so the token is
+    part of the key for those; insecure channels send the token as metadata
+    and can be shared across tokens. A `grpc.aio` channel only works on the
+    event loop it was created on, so those are also keyed by the running
+    loop, e.g. one per `asyncio.run()`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._channels: Dict[Tuple, list] = {}
+
+    @staticmethod
+    def make_key(
+        url: str,
+        token: str,
+        secure: bool,
+        options: Tuple,
+        aio: bool = False,
+    ) -> Tuple:
+        loop = None
+        if aio:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+        # the loop itself rather than its id, which a later loop may reuse
+        return (url, secure, token if secure else "", tuple(options), aio, loop)
+
+    def acquire(self, key: Tuple):
+        with self._lock:
+            entry = self._channels.get(key)
+            if entry is None:
+                entry = [self._create_channel(*key[:5]), 0]
+                self._channels[key] = entry
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, key: Tuple):
+        """Drop one reference to a channel.
+
+        Returns:
+            the channel once its last reference is released, so the caller can
+            close it (awaiting the close for `grpc.aio` channels), else None
+        """
+        with self._lock:
+            entry = self._channels.get(key)
+            if entry is None:
+                return None
+            entry[1] -= 1
+            if entry[1] > 0:
+                return None
+            del self._channels[key]
+            return entry[0]
+
+    def refcount(self, key: Tuple) -> int:
+        with self._lock:
+            entry = self._channels.get(key)
+            return 0 if entry is None else entry[1]
+
+    @staticmethod
+    def _create_channel(url: str, secure: bool, token: str, options: Tuple, aio: bool):
+        channel_options = list(options)
+        if not secure:
+            if aio:
+                return grpc.aio.insecure_channel(url, options=channel_options)
+            return grpc.insecure_channel(url, options=channel_options)
+
+        ssl_creds = grpc.ssl_channel_credentials()
+        call_creds = grpc.access_token_call_credentials(token)
+        creds = grpc.composite_channel_credentials(ssl_creds, call_creds)
+        if aio:
+            return grpc.aio.secure_channel(
+                target=url, credentials=creds, options=channel_options
+            )
+        return grpc.secure_channel(
+            target=url, credentials=creds, options=channel_options
+        )
+
+
+channel_pool = ChannelPool()
+
 
 class InstillInstance:
-    def __init__(self, stub, url: str, token: str, secure: bool, async_enabled: bool):
+    def __init__(
+        self,
+        stub,
+        url: str,
+        token: str,
+        secure: bool,
+        async_enabled: bool,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
+    ):
+        if call_policy is None:
+            call_policy = DEFAULT_CALL_POLICY
+        if channel_options is None:
+            channel_options = ChannelOptions()
         self.url: str = url
         self.token: str = token
         self.async_enabled: bool = async_enabled
         self.metadata: list = []
-
-        channel_options = [
-            ("grpc.max_send_message_length", 32 * MB),
-            ("grpc.max_receive_message_length", 32 * MB),
-        ]
+        self._closed: bool = False
+        self._async_channel_key: Optional[Tuple] = None
+        self._close_task: Optional[asyncio.Task] = None
 
         if not secure:
-            channel = grpc.insecure_channel(url, options=channel_options)
             self.metadata = [
                 (
                     "authorization",
                     f"Bearer {token}",
                 ),
             ]
-            if async_enabled:
-                async_channel = grpc.aio.insecure_channel(url, options=channel_options)
-        else:
-            ssl_creds = grpc.ssl_channel_credentials()
-            call_creds = grpc.access_token_call_credentials(token)
-            creds = grpc.composite_channel_credentials(ssl_creds, call_creds)
-            channel = grpc.secure_channel(
-                target=url, credentials=creds, options=channel_options
-            )
-            if async_enabled:
-                async_channel = grpc.aio.secure_channel(
-                    target=url, credentials=creds, options=channel_options
-                )
-        self.channel: grpc.Channel = channel
+
+        self.call_policy: CallPolicy = call_policy
+        options = channel_options.to_options() + call_policy.channel_options(SERVICES)
+        self._stub = stub
+        self._secure = secure
+        self._options = options
+        self._channel_key = channel_pool.make_key(url, token, secure, options)
+        self.channel: grpc.Channel = channel_pool.acquire(self._channel_key)
         self.client: Union[
             model_service.ModelPublicServiceStub,
             pipeline_service.PipelinePublicServiceStub,
             mgmt_service.MgmtPublicServiceStub,
             artifact_service.ArtifactPublicServiceStub,
-        ] = stub(channel)
-        if async_enabled:
-            self.async_channel: grpc.Channel = async_channel
-            self.async_client: Union[
-                model_service.ModelPublicServiceStub,
-                pipeline_service.PipelinePublicServiceStub,
-                mgmt_service.MgmtPublicServiceStub,
-                artifact_service.ArtifactPublicServiceStub,
-            ] = stub(async_channel)
+        ] = call_policy.wrap_stub(stub(self.channel))
+        self._async_channel: Optional[grpc.aio.Channel] = None
+        self._async_client: Any = None
+
+    @property
+    def async_channel(self) -> grpc.aio.Channel:
+        """The pooled `grpc.aio` channel of the running event loop.
+
+        A `grpc.aio` channel only works on the loop it was created on, so it
+        is acquired on first use from each loop rather than at construction.
+        """
+        self._acquire_async_channel()
+        return self._async_channel
+
+    @property
+    def async_client(
+        self,
+    ) -> Union[
+        model_service.ModelPublicServiceStub,
+        pipeline_service.PipelinePublicServiceStub,
+        mgmt_service.MgmtPublicServiceStub,
+        artifact_service.ArtifactPublicServiceStub,
+    ]:
+        """The service stub over `async_channel`."""
+        self._acquire_async_channel()
+        return self._async_client
+
+    def _acquire_async_channel(self):
+        if not self.async_enabled:
+            raise AttributeError("grpc.aio calls need async_enabled=True")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            raise RuntimeError(
+                "grpc.aio calls must be made from a running event loop"
+            ) from None
+        if self._async_channel_key is not None and self._async_channel_key[-1] is loop:
+            return
+        if self._closed:
+            raise RuntimeError("client is closed")
+        # the previous loop's channel, if any, is unusable from this loop and
+        # is closed by gRPC once garbage collected
+        self._release_async_channel()
+        key = channel_pool.make_key(
+            self.url, self.token, self._secure, self._options, aio=True
+        )
+        self._async_channel = channel_pool.acquire(key)
+        self._async_client = self.call_policy.wrap_stub(self._stub(self._async_channel))
+        self._async_channel_key = key
+
+    def close(self):
+        """Release the pooled channels, closing them if this was the last user.
+
+        The close of a released `grpc.aio` channel is scheduled on its event
+        loop if that loop is running, else gRPC closes the channel once it is
+        garbage collected. Use `async_close` to await it instead.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        channel = channel_pool.release(self._channel_key)
+        if channel is not None:
+            channel.close()
+        loop = None if self._async_channel_key is None else self._async_channel_key[-1]
+        async_channel = self._release_async_channel()
+        if async_channel is None or loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if running is loop:
+            self._close_task = loop.create_task(async_channel.close())
+
+    async def async_close(self):
+        """Release both pooled channels, awaiting the `grpc.aio` channel close."""
+        async_channel = self._release_async_channel()
+        self.close()
+        if async_channel is not None:
+            await async_channel.close()
+
+    def _release_async_channel(self):
+        if self._async_channel_key is None:
+            return None
+        key, self._async_channel_key = self._async_channel_key, None
+        self._async_channel = self._async_client = None
+        return channel_pool.release(key)
@@ -1,6 +1,6 @@
 # pylint: disable=no-member,wrong-import-position
 from datetime import datetime
-from typing import List
+from typing import Iterator, List, Optional
 
 # common
 from google.protobuf import field_mask_pb2, timestamp_pb2
@@ -12,9 +12,13 @@ import instill.protogen.core.mgmt.v1beta.metric_pb2 as metric_interface
 import instill.protogen.core.mgmt.v1beta.mgmt_pb2 as mgmt_interface
 import instill.protogen.core.mgmt.v1beta.mgmt_public_service_pb2_grpc as mgmt_service
 from instill.clients.base import Client, RequestFactory
-from instill.clients.instance import InstillInstance
+from instill.clients.instance import ChannelOptions, InstillInstance
+from instill.clients.paginator import paginate_by_token
+from instill.clients.policy import CallPolicy
 from instill.helpers.const import HOST_URL_PROD
 from instill.utils.error_handler import NamespaceException, grpc_handler
+from instill.utils.health_cache import DEFAULT_HEALTH_CHECK_TTL, HealthCache
+from instill.utils.namespace_cache import get_namespace_cache
 
 
 class MgmtClient(Client):
@@ -25,6 +29,10 @@ class MgmtClient(Client):
         secure: bool = True,
         requester_id: str = "",
         async_enabled: bool = False,
+        health_check_ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        preflight_check: bool = True,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
 
         self.host: InstillInstance = InstillInstance(
@@ -33,6 +41,11 @@ class MgmtClient(Client):
             token=api_token,
             secure=secure,
             async_enabled=async_enabled,
+            call_policy=call_policy,
+            channel_options=channel_options,
+        )
+        self.health = HealthCache(
+            self.is_serving, ttl=health_check_ttl, enabled=preflight_check
         )
 
         self.metadata = []
@@ -42,12 +55,10 @@ class MgmtClient(Client):
             self.metadata = [("instill-requester-uid", requester_uid)]
 
     def close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        self.host.close()
 
     async def async_close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        await self.host.async_close()
 
     @property
     def host(self):
@@ -66,6 +77,11 @@ class MgmtClient(Client):
         self._metadata = metadata
 
     def _lookup_namespace_uid(self, namespace_id: str):
+        return get_namespace_cache().resolve(
+            self.host.url, namespace_id, self._fetch_namespace_uid
+        )
+
+    def _fetch_namespace_uid(self, namespace_id: str):
         resp = self.check_namespace(namespace_id)
         if resp.type == mgmt_interface.CheckNamespaceAdminResponse.NAMESPACE_USER:
             namespace_uid = self.get_user(namespace_id).user.uid
@@ -94,25 +110,29 @@ class MgmtClient(Client):
         ).send_sync()
 
     def readiness(
-        self, async_enabled: bool = False
+        self,
+        async_enabled: bool = False,
+        timeout: Optional[float] = None,
     ) -> mgmt_interface.ReadinessResponse:
         if async_enabled:
             return RequestFactory(
                 method=self.host.async_client.Readiness,
                 request=mgmt_interface.ReadinessRequest(),
                 metadata=self.host.metadata + self.metadata,
+                timeout=timeout,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.Readiness,
             request=mgmt_interface.ReadinessRequest(),
             metadata=self.host.metadata + self.metadata,
+            timeout=timeout,
         ).send_sync()
 
-    def is_serving(self) -> bool:
+    def is_serving(self, timeout: Optional[float] = None) -> bool:
         try:
             return (
-                self.readiness().health_check_response.status
+                self.readiness(timeout=timeout).health_check_response.status
                 == healthcheck.HealthCheckResponse.SERVING_STATUS_SERVING
             )
         except Exception:
@@ -289,6 +309,23 @@ class MgmtClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_organizations(
+        self,
+        filter_str: str = "",
+        total_size: int = 100,
+        prefetch: bool = True,
+    ) -> Iterator[mgmt_interface.Organization]:
+        """Lazily iterate over all organizations, see `list_organization`."""
+        return paginate_by_token(
+            lambda token: self.list_organization(
+                filter_str=filter_str,
+                total_size=total_size,
+                next_page_token=token,
+            ),
+            "organizations",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_organization(
         self,
@@ -556,6 +593,21 @@ class MgmtClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_tokens(
+        self,
+        total_size: int = 100,
+        prefetch: bool = True,
+    ) -> Iterator[mgmt_interface.ApiToken]:
+        """Lazily iterate over all API tokens, see `list_tokens`."""
+        return paginate_by_token(
+            lambda token: self.list_tokens(
+                total_size=total_size,
+                next_page_token=token,
+            ),
+            "tokens",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def delete_token(
         self,
@@ -674,6 +726,23 @@ class MgmtClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_pipeline_trigger_records(
+        self,
+        total_size: int = 10,
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[metric_interface.PipelineTriggerRecord]:
+        """Lazily iterate over all pipeline trigger records, see `list_pipeline_trigger_records`."""
+        return paginate_by_token(
+            lambda token: self.list_pipeline_trigger_records(
+                total_size=total_size,
+                filter_str=filter_str,
+                next_page_token=token,
+            ),
+            "pipeline_trigger_records",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_pipeline_trigger_count(
         self,
@@ -773,6 +842,23 @@ class MgmtClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_pipeline_trigger_table_records(
+        self,
+        total_size: int = 100,
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[metric_interface.PipelineTriggerTableRecord]:
+        """Lazily iterate over all pipeline trigger table records, see `list_pipeline_trigger_table_records`."""
+        return paginate_by_token(
+            lambda token: self.list_pipeline_trigger_table_records(
+                total_size=total_size,
+                filter_str=filter_str,
+                next_page_token=token,
+            ),
+            "pipeline_trigger_table_records",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_pipeline_trigger_chart_records(
         self,
@@ -886,6 +972,23 @@ class MgmtClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_users(
+        self,
+        total_size: int = 100,
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[mgmt_interface.User]:
+        """Lazily iterate over all users, see `list_users`."""
+        return paginate_by_token(
+            lambda token: self.list_users(
+                total_size=total_size,
+                filter_str=filter_str,
+                next_page_token=token,
+            ),
+            "users",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_authenticated_subscription(
         self,
@@ -1,7 +1,8 @@
 # pylint: disable=no-member,wrong-import-position,too-many-lines,no-name-in-module
 from datetime import datetime
-from typing import Callable, List, Optional
+from typing import Callable, Iterator, List, Optional
 
+import grpc
 from google.protobuf import field_mask_pb2, timestamp_pb2
 from google.protobuf.struct_pb2 import Struct
 
@@ -13,9 +14,14 @@ import instill.protogen.model.model.v1alpha.model_definition_pb2 as model_defini
 import instill.protogen.model.model.v1alpha.model_pb2 as model_interface
 import instill.protogen.model.model.v1alpha.model_public_service_pb2_grpc as model_service
 from instill.clients.base import Client, RequestFactory
-from instill.clients.instance import InstillInstance
+from instill.clients.fanout import DEFAULT_TRIGGER_CONCURRENCY, TriggerResult, fan_out
+from instill.clients.instance import ChannelOptions, InstillInstance
+from instill.clients.paginator import paginate_by_page, paginate_by_token
+from instill.clients.policy import CallPolicy
+from instill.clients.prepared import PreparedTrigger
 from instill.helpers.const import HOST_URL_PROD
-from instill.utils.error_handler import grpc_handler
+from instill.utils.error_handler import NotServingException, grpc_handler, raising
+from instill.utils.health_cache import DEFAULT_HEALTH_CHECK_TTL, HealthCache
 
 
 class ModelClient(Client):
@@ -27,6 +33,10 @@ class ModelClient(Client):
         secure: bool = True,
         requester_id: str = "",
         async_enabled: bool = False,
+        health_check_ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        preflight_check: bool = True,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
         self.host: InstillInstance = InstillInstance(
             model_service.ModelPublicServiceStub,
@@ -34,6 +44,11 @@ class ModelClient(Client):
             token=api_token,
             secure=secure,
             async_enabled=async_enabled,
+            call_policy=call_policy,
+            channel_options=channel_options,
+        )
+        self.health = HealthCache(
+            self.is_serving, ttl=health_check_ttl, enabled=preflight_check
         )
         self.metadata = []
 
@@ -42,12 +57,10 @@ class ModelClient(Client):
             self.metadata = [("instill-requester-uid", requester_uid)]
 
     def close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        self.host.close()
 
     async def async_close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        await self.host.async_close()
 
     @property
     def host(self):
@@ -91,25 +104,29 @@ class ModelClient(Client):
         ).send_sync()
 
     def readiness(
-        self, async_enabled: bool = False
+        self,
+        async_enabled: bool = False,
+        timeout: Optional[float] = None,
     ) -> model_interface.ReadinessResponse:
         if async_enabled:
             return RequestFactory(
                 method=self.host.async_client.Readiness,
                 request=model_interface.ReadinessRequest(),
                 metadata=self.host.metadata + self.metadata,
+                timeout=timeout,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.Readiness,
             request=model_interface.ReadinessRequest(),
             metadata=self.host.metadata + self.metadata,
+            timeout=timeout,
         ).send_sync()
 
-    def is_serving(self) -> bool:
+    def is_serving(self, timeout: Optional[float] = None) -> bool:
         try:
             return (
-                self.readiness().health_check_response.status
+                self.readiness(timeout=timeout).health_check_response.status
                 == healthcheck.HealthCheckResponse.SERVING_STATUS_SERVING
             )
         except Exception:
@@ -228,6 +245,7 @@ class ModelClient(Client):
         task_inputs: List[dict],
         version: str,
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> model_interface.TriggerNamespaceModelResponse:
 
         request = model_interface.TriggerNamespaceModelRequest(
@@ -245,14 +263,67 @@ class ModelClient(Client):
                 method=self.host.async_client.TriggerNamespaceModel,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
+                compression=compression,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.TriggerNamespaceModel,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
 
+    def trigger_many(
+        self,
+        namespace_id: str,
+        model_id: str,
+        inputs: List[List[dict]],
+        version: str,
+        concurrency: int = DEFAULT_TRIGGER_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Iterator[TriggerResult]:
+        """Run one `trigger` per item of `inputs` with bounded concurrency.
+
+        Args:
+            inputs: the `task_inputs` of each trigger
+            concurrency: maximum number of triggers in flight
+            ordered: yield results in input order instead of as completed
+
+        Returns:
+            an iterator of `TriggerResult`; failed triggers carry their error
+            instead of terminating the process
+        """
+        if not self.health.is_serving():
+            raise NotServingException
+        prepared = self.prepare_trigger(namespace_id, model_id, version)
+        return fan_out(
+            raising(prepared.trigger),
+            inputs,
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+
+    def prepare_trigger(
+        self, namespace_id: str, model_id: str, version: str
+    ) -> PreparedTrigger:
+        """Bind a `trigger` to one model version, for sending it many times.
+
+        Returns:
+            a `PreparedTrigger` whose `trigger(task_inputs)` returns the same
+            response as `trigger`
+        """
+        return PreparedTrigger(
+            self,
+            "TriggerNamespaceModel",
+            model_interface.TriggerNamespaceModelRequest(
+                namespace_id=namespace_id,
+                model_id=model_id,
+                version=version,
+            ),
+            "task_inputs",
+            lambda item: item.fields,
+        )
+
     @grpc_handler
     def trigger_async(
         self,
@@ -261,6 +332,7 @@ class ModelClient(Client):
         task_inputs: List[dict],
         version: str,
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> model_interface.TriggerAsyncNamespaceModelResponse:
 
         request = model_interface.TriggerAsyncNamespaceModelRequest(
@@ -278,12 +350,14 @@ class ModelClient(Client):
                 method=self.host.async_client.TriggerAsyncNamespaceModel,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
+                compression=compression,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.TriggerAsyncNamespaceModel,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
 
     @grpc_handler
@@ -293,6 +367,7 @@ class ModelClient(Client):
         model_id: str,
         task_inputs: List[dict],
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> model_interface.TriggerNamespaceLatestModelResponse:
 
         request = model_interface.TriggerNamespaceLatestModelRequest(
@@ -309,12 +384,14 @@ class ModelClient(Client):
                 method=self.host.async_client.TriggerNamespaceLatestModel,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
+                compression=compression,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.TriggerNamespaceLatestModel,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
 
     @grpc_handler
@@ -324,6 +401,7 @@ class ModelClient(Client):
         model_id: str,
         task_inputs: List[dict],
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> model_interface.TriggerAsyncNamespaceLatestModelResponse:
 
         request = model_interface.TriggerAsyncNamespaceLatestModelRequest(
@@ -340,12 +418,14 @@ class ModelClient(Client):
                 method=self.host.async_client.TriggerAsyncNamespaceLatestModel,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
+                compression=compression,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.TriggerAsyncNamespaceLatestModel,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
 
     @grpc_handler
@@ -478,6 +558,7 @@ class ModelClient(Client):
         self,
         operation_id: str,
         async_enabled: bool = False,
+        timeout: Optional[float] = None,
     ) -> model_interface.GetModelOperationResponse:
 
         if async_enabled:
@@ -488,6 +569,7 @@ class ModelClient(Client):
                     view=model_definition_interface.VIEW_FULL,
                 ),
                 metadata=self.host.metadata + self.metadata,
+                timeout=timeout,
             ).send_async()
 
         return RequestFactory(
@@ -497,6 +579,7 @@ class ModelClient(Client):
                 view=model_definition_interface.VIEW_FULL,
             ),
             metadata=self.host.metadata + self.metadata,
+            timeout=timeout,
         ).send_sync()
 
     @grpc_handler
@@ -748,6 +831,33 @@ class ModelClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_models(
+        self,
+        namespace_id: str,
+        is_public: bool = True,
+        total_size: int = 10,
+        show_deleted: bool = False,
+        public=False,
+        filter_str: str = "",
+        order_by: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[model_interface.Model]:
+        """Lazily iterate over all models of a namespace, see `list_models`."""
+        return paginate_by_token(
+            lambda token: self.list_models(
+                namespace_id=namespace_id,
+                is_public=is_public,
+                total_size=total_size,
+                show_deleted=show_deleted,
+                public=public,
+                filter_str=filter_str,
+                order_by=order_by,
+                next_page_token=token,
+            ),
+            "models",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_model_definitions(
         self,
@@ -776,6 +886,21 @@ class ModelClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_model_definitions(
+        self,
+        page_size: int = 10,
+        prefetch: bool = True,
+    ) -> Iterator[model_definition_interface.ModelDefinition]:
+        """Lazily iterate over all model definitions, see `list_model_definitions`."""
+        return paginate_by_token(
+            lambda token: self.list_model_definitions(
+                page_size=page_size,
+                page_token=token,
+            ),
+            "model_definitions",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_available_regions(
         self,
@@ -907,6 +1032,25 @@ class ModelClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_model_versions(
+        self,
+        namespace_id: str,
+        model_id: str,
+        page_size: int = 10,
+        prefetch: bool = True,
+    ) -> Iterator[model_interface.ModelVersion]:
+        """Lazily iterate over all versions of a model, see `list_model_versions`."""
+        return paginate_by_page(
+            lambda page: self.list_model_versions(
+                namespace_id=namespace_id,
+                model_id=model_id,
+                page_size=page_size,
+                page=page,
+            ),
+            "versions",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def delete_model_version(
         self,
@@ -976,6 +1120,29 @@ class ModelClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_model_runs(
+        self,
+        namespace_id: str,
+        model_id: str,
+        page_size: int = 10,
+        order_by: str = "",
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[model_interface.ModelRun]:
+        """Lazily iterate over all runs of a model, see `list_model_runs`."""
+        return paginate_by_page(
+            lambda page: self.list_model_runs(
+                namespace_id=namespace_id,
+                model_id=model_id,
+                page_size=page_size,
+                order_by=order_by,
+                filter_str=filter_str,
+                page=page,
+            ),
+            "runs",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_model_runs_by_requester(
         self,
@@ -1021,3 +1188,28 @@ class ModelClient(Client):
             ),
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
+
+    def iter_model_runs_by_requester(
+        self,
+        start: datetime,
+        stop: datetime,
+        requester_id: str,
+        page_size: int = 10,
+        order_by: str = "",
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[model_interface.ModelRun]:
+        """Lazily iterate over all model runs of a requester, see `list_model_runs_by_requester`."""
+        return paginate_by_page(
+            lambda page: self.list_model_runs_by_requester(
+                start=start,
+                stop=stop,
+                requester_id=requester_id,
+                page_size=page_size,
+                order_by=order_by,
+                filter_str=filter_str,
+                page=page,
+            ),
+            "runs",
+            prefetch=prefetch,
+        )
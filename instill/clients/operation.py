@@ -0,0 +1,257 @@
+# pylint: disable=no-member,no-name-in-module
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import as_completed as futures_as_completed
+from concurrent.futures import wait as futures_wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import grpc
+from google.longrunning import operations_pb2
+
+from instill.clients.model import ModelClient
+from instill.clients.pipeline import PipelineClient
+from instill.utils.error_handler import raising
+
+DEFAULT_POLL_TIMEOUT = 10.0  # seconds
+
+RETRYABLE_STATUS_CODES = (
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+)
+
+
+class OperationError(Exception):
+    """A long-running operation finished with an error status."""
+
+    def __init__(self, operation: operations_pb2.Operation):
+        self.operation = operation
+        self.message = (
+            f"operation {operation.name} failed: "
+            f"[{operation.error.code}] {operation.error.message}"
+        )
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class _Tracked:
+    def __init__(self, name: str, future: Future, interval: float) -> None:
+        self.name = name
+        self.future = future
+        self.interval = interval
+
+
+class OperationWaiter:
+    """Wait for many long-running operations with one background poller.
+
+    Operations returned by `trigger_async` style calls are registered with
+    `add`, which returns a future resolving to the finished
+    `google.longrunning.Operation` (or raising `OperationError`). A single
+    scheduler thread polls every operation that is due in one round over a
+    small pool, then backs each one off exponentially with jitter, so idle
+    operations cost fewer RPCs the longer they run and polls of different
+    operations never line up. Each poll has a `poll_timeout` deadline; a poll
+    that times out counts as the operation still running, so one hung RPC
+    cannot stall the other operations of its round for long.
+
+    Example:
+        with OperationWaiter(client.pipeline) as waiter:
+            for _ in range(100):
+                resp = client.pipeline.trigger_async(namespace_id, pipeline_id, data)
+                waiter.add(resp.operation)
+            for future in waiter.as_completed():
+                print(future.result().response)
+    """
+
+    def __init__(
+        self,
+        client: Union[PipelineClient, ModelClient],
+        initial_interval: float = 0.1,
+        max_interval: float = 5.0,
+        multiplier: float = 1.5,
+        jitter: float = 0.2,
+        max_concurrent_polls: int = 8,
+        poll_timeout: Optional[float] = DEFAULT_POLL_TIMEOUT,
+    ) -> None:
+        self._get_operation = self._operation_getter(client, poll_timeout)
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+        self._tracked: Dict[str, _Tracked] = {}
+        self._schedule: List[tuple] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_polls, thread_name_prefix="operation-waiter"
+        )
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @staticmethod
+    def _operation_getter(
+        client: Union[PipelineClient, ModelClient], timeout: Optional[float]
+    ) -> Callable[[str], operations_pb2.Operation]:
+        # raising, so that a failed poll surfaces as an exception on the
+        # future instead of exiting the process
+        if isinstance(client, ModelClient):
+            get = client.get_model_operation
+        elif isinstance(client, PipelineClient):
+            get = client.get_operation
+        else:
+            raise TypeError("OperationWaiter needs a PipelineClient or a ModelClient")
+        return lambda name: raising(get)(name, timeout=timeout).operation
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._tracked)
+
+    def add(self, operation: Union[str, operations_pb2.Operation]) -> Future:
+        """Track an operation by name, or by the `Operation` a trigger returned.
+
+        Adding an operation that is already tracked returns its existing future.
+        """
+        if isinstance(operation, operations_pb2.Operation):
+            name = operation.name
+            if operation.done:
+                future: Future = Future()
+                self._resolve(future, operation)
+                return future
+        else:
+            name = operation
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("OperationWaiter is closed")
+            tracked = self._tracked.get(name)
+            if tracked is not None:
+                return tracked.future
+            tracked = _Tracked(name, Future(), self.initial_interval)
+            self._tracked[name] = tracked
+            self._push(tracked, time.monotonic() + self._jittered(tracked.interval))
+            self._cond.notify()
+            return tracked.future
+
+    def wait(
+        self,
+        operations: Iterable[Union[str, operations_pb2.Operation]],
+        timeout: Optional[float] = None,
+    ) -> List[operations_pb2.Operation]:
+        """Block until all `operations` finish and return them in order.
+
+        Raises:
+            OperationError: if any of the operations failed
+            TimeoutError: if they did not all finish within `timeout` seconds
+        """
+        futures = [self.add(op) for op in operations]
+        _, not_done = futures_wait(futures, timeout=timeout)
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} operations still running")
+        return [f.result() for f in futures]
+
+    def as_completed(
+        self,
+        operations: Optional[Iterable[Union[str, operations_pb2.Operation]]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Future]:
+        """Yield operation futures as they finish.
+
+        Defaults to every operation tracked at the time of the call.
+        """
+        if operations is None:
+            with self._cond:
+                futures = [t.future for t in self._tracked.values()]
+        else:
+            futures = [self.add(op) for op in operations]
+        return futures_as_completed(futures, timeout=timeout)
+
+    def close(self):
+        """Stop polling and cancel the futures of unfinished operations."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+        self._executor.shutdown(wait=True)
+        with self._cond:
+            for tracked in self._tracked.values():
+                tracked.future.cancel()
+            self._tracked.clear()
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _push(self, tracked: _Tracked, at: float):
+        # called with self._cond held
+        heapq.heappush(self._schedule, (at, next(self._counter), tracked))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    now = time.monotonic()
+                    if self._schedule and self._schedule[0][0] <= now:
+                        break
+                    timeout = self._schedule[0][0] - now if self._schedule else None
+                    self._cond.wait(timeout=timeout)
+                if self._closed:
+                    return
+                due = []
+                while self._schedule and self._schedule[0][0] <= now:
+                    due.append(heapq.heappop(self._schedule)[2])
+
+            for tracked, outcome in zip(due, self._executor.map(self._poll, due)):
+                self._handle(tracked, outcome)
+
+    def _poll(self, tracked: _Tracked):
+        if tracked.future.cancelled():
+            return None
+        try:
+            return self._get_operation(tracked.name)
+        except Exception as e:
+            return e
+
+    def _handle(self, tracked: _Tracked, outcome):
+        done = True
+        if tracked.future.cancelled():
+            pass
+        elif isinstance(outcome, grpc.RpcError) and (
+            outcome.code() in RETRYABLE_STATUS_CODES  # type: ignore[attr-defined]
+        ):
+            done = False
+        elif isinstance(outcome, Exception):
+            tracked.future.set_exception(outcome)
+        elif outcome.done:
+            self._resolve(tracked.future, outcome)
+        else:
+            done = False
+
+        with self._cond:
+            if done:
+                self._tracked.pop(tracked.name, None)
+                return
+            tracked.interval = min(
+                tracked.interval * self.multiplier, self.max_interval
+            )
+            self._push(tracked, time.monotonic() + self._jittered(tracked.interval))
+
+    @staticmethod
+    def _resolve(future: Future, operation: operations_pb2.Operation):
+        if operation.HasField("error") and operation.error.code != 0:
+            future.set_exception(OperationError(operation))
+        else:
+            future.set_result(operation)
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional
+
+
+def _iter_pages(
+    fetch: Callable[[Any], Any],
+    cursor: Any,
+    next_cursor: Callable[[Any, Any], Optional[Any]],
+    prefetch: bool,
+) -> Iterator[Any]:
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        resp = fetch(cursor)
+        while True:
+            cursor = next_cursor(resp, cursor)
+            pending = None
+            if executor is not None and cursor is not None:
+                # fetch page N+1 while the caller consumes page N
+                pending = executor.submit(fetch, cursor)
+            yield resp
+            if cursor is None:
+                return
+            resp = pending.result() if pending is not None else fetch(cursor)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def paginate_by_token(
+    fetch: Callable[[str], Any],
+    items_field: str,
+    prefetch: bool = True,
+) -> Iterator[Any]:
+    """Lazily yield the items of every page of a `page_token` paginated list.
+
+    Args:
+        fetch: returns the response for a page token, "" being the first page
+        items_field: name of the repeated field holding the items
+        prefetch: request the next page in the background while the caller
+            consumes the current one
+    """
+
+    def next_cursor(resp, _) -> Optional[str]:
+        return resp.next_page_token or None
+
+    for page in _iter_pages(fetch, "", next_cursor, prefetch):
+        yield from getattr(page, items_field)
+
+
+def paginate_by_page(
+    fetch: Callable[[int], Any],
+    items_field: str,
+    prefetch: bool = True,
+) -> Iterator[Any]:
+    """Lazily yield the items of every page of a `page` number paginated list.
+
+    Args:
+        fetch: returns the response for a zero-based page number
+        items_field: name of the repeated field holding the items
+        prefetch: request the next page in the background while the caller
+            consumes the current one
+    """
+
+    def next_cursor(resp, page: int) -> Optional[int]:
+        items = getattr(resp, items_field)
+        page_size = resp.page_size or len(items)
+        if not items or (page + 1) * page_size >= resp.total_size:
+            return None
+        return page + 1
+
+    for page in _iter_pages(fetch, 0, next_cursor, prefetch):
+        yield from getattr(page, items_field)
@@ -1,7 +1,8 @@
 # pylint: disable=no-member,wrong-import-position,too-many-lines,no-name-in-module
 from datetime import datetime
-from typing import Callable, List, Optional
+from typing import Callable, Iterator, List, Optional
 
+import grpc
 from google.protobuf import field_mask_pb2, timestamp_pb2
 from google.protobuf.json_format import MessageToDict
 
@@ -13,11 +14,17 @@ import instill.protogen.pipeline.pipeline.v1beta.integration_pb2 as integration_
 import instill.protogen.pipeline.pipeline.v1beta.pipeline_pb2 as pipeline_interface
 import instill.protogen.pipeline.pipeline.v1beta.pipeline_public_service_pb2_grpc as pipeline_service
 import instill.protogen.pipeline.pipeline.v1beta.secret_pb2 as secret_interface
-from instill.clients.base import Client, RequestFactory
-from instill.clients.instance import InstillInstance
+from instill.clients.base import Client, RequestFactory, message_to_dict_async
+from instill.clients.fanout import DEFAULT_TRIGGER_CONCURRENCY, TriggerResult, fan_out
+from instill.clients.instance import ChannelOptions, InstillInstance
+from instill.clients.paginator import paginate_by_page, paginate_by_token
+from instill.clients.policy import CallPolicy
+from instill.clients.prepared import PreparedTrigger
+from instill.clients.stream import TriggerStream
 from instill.helpers.const import HOST_URL_PROD
 from instill.protogen.pipeline.pipeline.v1beta import common_pb2
-from instill.utils.error_handler import grpc_handler
+from instill.utils.error_handler import NotServingException, grpc_handler, raising
+from instill.utils.health_cache import DEFAULT_HEALTH_CHECK_TTL, HealthCache
 
 
 class PipelineClient(Client):
@@ -29,6 +36,10 @@ class PipelineClient(Client):
         secure: bool = True,
         requester_id: str = "",
         async_enabled: bool = False,
+        health_check_ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        preflight_check: bool = True,
+        call_policy: Optional[CallPolicy] = None,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
         self.host: InstillInstance = InstillInstance(
             pipeline_service.PipelinePublicServiceStub,
@@ -36,6 +47,11 @@ class PipelineClient(Client):
             token=api_token,
             secure=secure,
             async_enabled=async_enabled,
+            call_policy=call_policy,
+            channel_options=channel_options,
+        )
+        self.health = HealthCache(
+            self.is_serving, ttl=health_check_ttl, enabled=preflight_check
         )
         self.metadata = []
 
@@ -44,12 +60,10 @@ class PipelineClient(Client):
             self.metadata = [("instill-requester-uid", requester_uid)]
 
     def close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        self.host.close()
 
     async def async_close(self):
-        if self.is_serving():
-            self.host.channel.close()
+        await self.host.async_close()
 
     @property
     def host(self):
@@ -84,25 +98,29 @@ class PipelineClient(Client):
         ).send_sync()
 
     def readiness(
-        self, async_enabled: bool = False
+        self,
+        async_enabled: bool = False,
+        timeout: Optional[float] = None,
     ) -> pipeline_interface.ReadinessResponse:
         if async_enabled:
             return RequestFactory(
                 method=self.host.async_client.Readiness,
                 request=pipeline_interface.ReadinessRequest(),
                 metadata=self.host.metadata + self.metadata,
+                timeout=timeout,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.Readiness,
             request=pipeline_interface.ReadinessRequest(),
             metadata=self.host.metadata + self.metadata,
+            timeout=timeout,
         ).send_sync()
 
-    def is_serving(self) -> bool:
+    def is_serving(self, timeout: Optional[float] = None) -> bool:
         try:
             return (
-                self.readiness().health_check_response.status
+                self.readiness(timeout=timeout).health_check_response.status
                 == healthcheck.HealthCheckResponse.SERVING_STATUS_SERVING
             )
         except Exception:
@@ -196,6 +214,29 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_public_pipelines(
+        self,
+        order_by: str = "",
+        is_public: bool = True,
+        filter_str: str = "",
+        total_size: int = 100,
+        show_deleted: bool = False,
+        prefetch: bool = True,
+    ) -> Iterator[pipeline_interface.Pipeline]:
+        """Lazily iterate over all public pipelines, see `list_public_pipelines`."""
+        return paginate_by_token(
+            lambda token: self.list_public_pipelines(
+                order_by=order_by,
+                is_public=is_public,
+                filter_str=filter_str,
+                total_size=total_size,
+                show_deleted=show_deleted,
+                next_page_token=token,
+            ),
+            "pipelines",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_pipelines(
         self,
@@ -244,6 +285,31 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_pipelines(
+        self,
+        namespace_id: str,
+        order_by: str = "",
+        is_public: bool = True,
+        filter_str: str = "",
+        total_size: int = 100,
+        show_deleted: bool = False,
+        prefetch: bool = True,
+    ) -> Iterator[pipeline_interface.Pipeline]:
+        """Lazily iterate over all pipelines of a namespace, see `list_pipelines`."""
+        return paginate_by_token(
+            lambda token: self.list_pipelines(
+                namespace_id=namespace_id,
+                order_by=order_by,
+                is_public=is_public,
+                filter_str=filter_str,
+                total_size=total_size,
+                show_deleted=show_deleted,
+                next_page_token=token,
+            ),
+            "pipelines",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def create_pipeline(
         self,
@@ -495,6 +561,7 @@ class PipelineClient(Client):
         pipeline_id: str,
         data: List[dict],
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> dict:
         request = pipeline_interface.TriggerNamespacePipelineRequest(
             namespace_id=namespace_id,
@@ -506,20 +573,71 @@ class PipelineClient(Client):
             request.data.append(trigger_data)
 
         if async_enabled:
-            resp = RequestFactory(
-                method=self.host.async_client.TriggerNamespacePipeline,
-                request=request,
-                metadata=self.host.metadata + self.metadata,
-            ).send_async()
-            return MessageToDict(resp)
+            return message_to_dict_async(
+                RequestFactory(
+                    method=self.host.async_client.TriggerNamespacePipeline,
+                    request=request,
+                    metadata=self.host.metadata + self.metadata,
+                    compression=compression,
+                ).send_async()
+            )
 
         resp = RequestFactory(
             method=self.host.client.TriggerNamespacePipeline,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
         return MessageToDict(resp)
 
+    def trigger_many(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        inputs: List[List[dict]],
+        concurrency: int = DEFAULT_TRIGGER_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Iterator[TriggerResult]:
+        """Run one `trigger` per item of `inputs` with bounded concurrency.
+
+        Args:
+            inputs: the `data` of each trigger
+            concurrency: maximum number of triggers in flight
+            ordered: yield results in input order instead of as completed
+
+        Returns:
+            an iterator of `TriggerResult`; failed triggers carry their error
+            instead of terminating the process
+        """
+        if not self.health.is_serving():
+            raise NotServingException
+        prepared = self.prepare_trigger(namespace_id, pipeline_id)
+        return fan_out(
+            raising(prepared.trigger),
+            inputs,
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+
+    def prepare_trigger(self, namespace_id: str, pipeline_id: str) -> PreparedTrigger:
+        """Bind a `trigger` to one pipeline, for sending it many times.
+
+        Returns:
+            a `PreparedTrigger` whose `trigger(data)` returns the same dict as
+            `trigger`
+        """
+        return PreparedTrigger(
+            self,
+            "TriggerNamespacePipeline",
+            pipeline_interface.TriggerNamespacePipelineRequest(
+                namespace_id=namespace_id,
+                pipeline_id=pipeline_id,
+            ),
+            "data",
+            lambda item: item.variable.fields,
+            MessageToDict,
+        )
+
     @grpc_handler
     def trigger_with_stream(
         self,
@@ -527,6 +645,8 @@ class PipelineClient(Client):
         pipeline_id: str,
         data: List[dict],
         async_enabled: bool = False,
+        timeout: Optional[float] = None,
+        compression: Optional[grpc.Compression] = None,
     ) -> pipeline_interface.TriggerNamespacePipelineWithStreamResponse:
         request = pipeline_interface.TriggerNamespacePipelineWithStreamRequest(
             namespace_id=namespace_id,
@@ -542,14 +662,39 @@ class PipelineClient(Client):
                 method=self.host.async_client.TriggerNamespacePipelineWithStream,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
-            ).send_async()
+                timeout=timeout,
+                compression=compression,
+            ).send_async_stream()
 
         return RequestFactory(
             method=self.host.client.TriggerNamespacePipelineWithStream,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            timeout=timeout,
+            compression=compression,
         ).send_sync()
 
+    def stream_trigger(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        data: List[dict],
+        timeout: Optional[float] = None,
+    ) -> TriggerStream:
+        """Trigger a pipeline and iterate over its outputs as they stream in.
+
+        Args:
+            timeout: deadline in seconds for the whole stream
+
+        Returns:
+            a `TriggerStream` yielding each response decoded to a dict
+        """
+        return TriggerStream(
+            raising(self.trigger_with_stream)(
+                namespace_id, pipeline_id, data, timeout=timeout
+            )
+        )
+
     @grpc_handler
     def trigger_async(
         self,
@@ -557,6 +702,7 @@ class PipelineClient(Client):
         pipeline_id: str,
         data: List[dict],
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> pipeline_interface.TriggerAsyncNamespacePipelineResponse:
         request = pipeline_interface.TriggerAsyncNamespacePipelineRequest(
             namespace_id=namespace_id,
@@ -572,12 +718,14 @@ class PipelineClient(Client):
                 method=self.host.async_client.TriggerAsyncNamespacePipeline,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
+                compression=compression,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.TriggerAsyncNamespacePipeline,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
 
     @grpc_handler
@@ -670,6 +818,29 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_pipeline_releases(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        total_size: int = 10,
+        filter_str: str = "",
+        show_deleted: bool = False,
+        prefetch: bool = True,
+    ) -> Iterator[pipeline_interface.PipelineRelease]:
+        """Lazily iterate over all releases of a pipeline, see `list_pipeline_releases`."""
+        return paginate_by_token(
+            lambda token: self.list_pipeline_releases(
+                namespace_id=namespace_id,
+                pipeline_id=pipeline_id,
+                total_size=total_size,
+                filter_str=filter_str,
+                show_deleted=show_deleted,
+                next_page_token=token,
+            ),
+            "releases",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_pipeline_release(
         self,
@@ -839,6 +1010,7 @@ class PipelineClient(Client):
         release_id: str,
         data: List[dict],
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> pipeline_interface.TriggerNamespacePipelineReleaseResponse:
         request = pipeline_interface.TriggerNamespacePipelineReleaseRequest(
             namespace_id=namespace_id,
@@ -855,12 +1027,14 @@ class PipelineClient(Client):
                 method=self.host.async_client.TriggerNamespacePipelineRelease,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
+                compression=compression,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.TriggerNamespacePipelineRelease,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
 
     @grpc_handler
@@ -871,6 +1045,7 @@ class PipelineClient(Client):
         release_id: str,
         data: List[dict],
         async_enabled: bool = False,
+        compression: Optional[grpc.Compression] = None,
     ) -> pipeline_interface.TriggerAsyncNamespacePipelineReleaseResponse:
         request = pipeline_interface.TriggerAsyncNamespacePipelineReleaseRequest(
             namespace_id=namespace_id,
@@ -887,12 +1062,14 @@ class PipelineClient(Client):
                 method=self.host.async_client.TriggerAsyncNamespacePipelineRelease,
                 request=request,
                 metadata=self.host.metadata + self.metadata,
+                compression=compression,
             ).send_async()
 
         return RequestFactory(
             method=self.host.client.TriggerAsyncNamespacePipelineRelease,
             request=request,
             metadata=self.host.metadata + self.metadata,
+            compression=compression,
         ).send_sync()
 
     @grpc_handler
@@ -957,6 +1134,23 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_secrets(
+        self,
+        namespace_id: str,
+        total_size: int = 10,
+        prefetch: bool = True,
+    ) -> Iterator[secret_interface.Secret]:
+        """Lazily iterate over all secrets of a namespace, see `list_secrets`."""
+        return paginate_by_token(
+            lambda token: self.list_secrets(
+                namespace_id=namespace_id,
+                total_size=total_size,
+                next_page_token=token,
+            ),
+            "secrets",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_secret(
         self,
@@ -1075,11 +1269,29 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_component_definitions(
+        self,
+        total_size: int = 100,
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[component_definition.ComponentDefinition]:
+        """Lazily iterate over all component definitions, see `list_component_definitions`."""
+        return paginate_by_page(
+            lambda page: self.list_component_definitions(
+                total_size=total_size,
+                filter_str=filter_str,
+                page=page,
+            ),
+            "component_definitions",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_operation(
         self,
         operation_id: str,
         async_enabled: bool = False,
+        timeout: Optional[float] = None,
     ) -> pipeline_interface.GetOperationResponse:
         if async_enabled:
             return RequestFactory(
@@ -1088,6 +1300,7 @@ class PipelineClient(Client):
                     operation_id=operation_id,
                 ),
                 metadata=self.host.metadata + self.metadata,
+                timeout=timeout,
             ).send_async()
 
         return RequestFactory(
@@ -1096,6 +1309,7 @@ class PipelineClient(Client):
                 operation_id=operation_id,
             ),
             metadata=self.host.metadata + self.metadata,
+            timeout=timeout,
         ).send_sync()
 
     @grpc_handler
@@ -1160,6 +1374,29 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_pipeline_runs(
+        self,
+        namespace_id: str,
+        pipeline_id: str,
+        total_size: int = 10,
+        filter_str: str = "",
+        order_by: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[pipeline_interface.PipelineRun]:
+        """Lazily iterate over all runs of a pipeline, see `list_pipeline_runs`."""
+        return paginate_by_page(
+            lambda page: self.list_pipeline_runs(
+                namespace_id=namespace_id,
+                pipeline_id=pipeline_id,
+                total_size=total_size,
+                filter_str=filter_str,
+                order_by=order_by,
+                page=page,
+            ),
+            "pipeline_runs",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_component_runs(
         self,
@@ -1197,6 +1434,27 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_component_runs(
+        self,
+        pipeline_run_id: str,
+        total_size: int = 10,
+        filter_str: str = "",
+        order_by: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[pipeline_interface.ComponentRun]:
+        """Lazily iterate over all component runs of a pipeline run, see `list_component_runs`."""
+        return paginate_by_page(
+            lambda page: self.list_component_runs(
+                pipeline_run_id=pipeline_run_id,
+                total_size=total_size,
+                filter_str=filter_str,
+                order_by=order_by,
+                page=page,
+            ),
+            "component_runs",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_pipeline_runs_by_requester(
         self,
@@ -1243,6 +1501,31 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_pipeline_runs_by_requester(
+        self,
+        start: datetime,
+        stop: datetime,
+        requester_id: str,
+        total_size: int = 10,
+        filter_str: str = "",
+        order_by: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[pipeline_interface.PipelineRun]:
+        """Lazily iterate over all pipeline runs of a requester, see `list_pipeline_runs_by_requester`."""
+        return paginate_by_page(
+            lambda page: self.list_pipeline_runs_by_requester(
+                start=start,
+                stop=stop,
+                requester_id=requester_id,
+                total_size=total_size,
+                filter_str=filter_str,
+                order_by=order_by,
+                page=page,
+            ),
+            "pipeline_runs",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def list_connections(
         self,
@@ -1275,6 +1558,25 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_connections(
+        self,
+        namespace_id: str,
+        total_size: int = 10,
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[integration_interface.Connection]:
+        """Lazily iterate over all connections of a namespace, see `list_connections`."""
+        return paginate_by_token(
+            lambda token: self.list_connections(
+                namespace_id=namespace_id,
+                total_size=total_size,
+                filter_str=filter_str,
+                next_page_token=token,
+            ),
+            "connections",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_connection(
         self,
@@ -1506,6 +1808,23 @@ class PipelineClient(Client):
             metadata=self.host.metadata + self.metadata,
         ).send_sync()
 
+    def iter_integrations(
+        self,
+        total_size: int = 10,
+        filter_str: str = "",
+        prefetch: bool = True,
+    ) -> Iterator[integration_interface.Integration]:
+        """Lazily iterate over all integrations, see `list_integrations`."""
+        return paginate_by_token(
+            lambda token: self.list_integrations(
+                total_size=total_size,
+                filter_str=filter_str,
+                next_page_token=token,
+            ),
+            "integrations",
+            prefetch=prefetch,
+        )
+
     @grpc_handler
     def get_integration(
         self,
@@ -0,0 +1,367 @@
+"""Per-method deadlines, retries, hedging and compression of client RPCs.
+
+Deadlines and retries are expressed as a gRPC service config and enforced by
+the gRPC core library on every call made over a channel. Only idempotent
+RPCs are retried. gRPC Python does not implement the service config
+`hedgingPolicy`, so hedged triggers are sent by `HedgedUnaryUnary` instead,
+and requests are compressed by `CompressedCall` once they reach a size
+threshold.
+"""
+
+import asyncio
+import json
+import queue
+import time
+from typing import Dict, Iterable, Optional, Sequence
+
+import grpc
+
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_HEDGING_DELAY = 0.5  # seconds
+DEFAULT_COMPRESSION_THRESHOLD = 1024  # bytes
+
+# read-only RPCs that are safe to send more than once
+IDEMPOTENT_METHOD_PREFIXES = ("Get", "List", "LookUp", "Check", "Watch")
+# triggers that run a pipeline or model and return its outputs
+HEDGED_METHOD_PREFIXES = ("Trigger",)
+UNHEDGED_METHOD_PREFIXES = ("TriggerAsync",)
+
+
+def _duration(seconds: float) -> str:
+    return f"{seconds:.9f}s"
+
+
+class RetryPolicy:
+    """Exponential backoff retries, applied to idempotent RPCs only.
+
+    The gRPC core library caps `max_attempts` at 5 and adds jitter to each
+    backoff.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 5.0,
+        backoff_multiplier: float = 2.0,
+        retryable_status_codes: Sequence[grpc.StatusCode] = (
+            grpc.StatusCode.UNAVAILABLE,
+        ),
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff_multiplier = backoff_multiplier
+        self.retryable_status_codes = tuple(retryable_status_codes)
+
+    def to_config(self) -> dict:
+        return {
+            "maxAttempts": self.max_attempts,
+            "initialBackoff": _duration(self.initial_backoff),
+            "maxBackoff": _duration(self.max_backoff),
+            "backoffMultiplier": self.backoff_multiplier,
+            "retryableStatusCodes": [c.name for c in self.retryable_status_codes],
+        }
+
+
+class HedgingPolicy:
+    """Send up to `max_attempts` copies of a trigger, `hedging_delay` apart.
+
+    The first successful response wins and the other attempts are cancelled.
+    A failure with one of `non_fatal_status_codes` starts the next attempt
+    right away; any other failure is returned immediately.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 2,
+        hedging_delay: float = DEFAULT_HEDGING_DELAY,
+        non_fatal_status_codes: Sequence[grpc.StatusCode] = (
+            grpc.StatusCode.UNAVAILABLE,
+        ),
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.hedging_delay = hedging_delay
+        self.non_fatal_status_codes = tuple(non_fatal_status_codes)
+
+    def is_non_fatal(self, error: BaseException) -> bool:
+        code = error.code() if isinstance(error, grpc.RpcError) else None  # type: ignore[attr-defined]
+        return code in self.non_fatal_status_codes
+
+
+# marks the default `CallPolicy.retry`, replaced by a new `RetryPolicy()` per
+# policy so that policies never share one
+_DEFAULT_RETRY = RetryPolicy()
+
+
+class CallPolicy:
+    """Deadlines, retries and hedging of every RPC made by a client.
+
+    Args:
+        timeout: default deadline in seconds of non-idempotent RPCs, such as
+            triggers; None for no deadline
+        idempotent_timeout: default deadline of idempotent RPCs (`Get*`,
+            `List*`, `LookUp*`, `Check*`, `Watch*`); None for no deadline
+        retry: retry policy of idempotent RPCs, a new `RetryPolicy()` by
+            default; None to disable retries
+        hedging: hedging policy of unary triggers, None to disable hedging
+        method_timeouts: deadlines by RPC name, e.g. `TriggerNamespacePipeline`,
+            overriding the defaults above
+        compression: `grpc.Compression.Gzip` or `Deflate` to compress
+            requests, None to send them uncompressed
+        compression_threshold: serialized size in bytes below which requests
+            are sent uncompressed
+
+    A deadline passed to a single call still applies; the earlier of the two
+    wins. So does a `compression` passed to a single trigger, regardless of
+    the threshold. Responses are compressed only if the server is configured
+    to; the client accepts gzip and deflate responses either way.
+
+    Example:
+        policy = CallPolicy(hedging=HedgingPolicy(hedging_delay=0.2))
+        client = InstillClient(api_token=token, call_policy=policy)
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        idempotent_timeout: Optional[float] = None,
+        retry: Optional[RetryPolicy] = _DEFAULT_RETRY,
+        hedging: Optional[HedgingPolicy] = None,
+        method_timeouts: Optional[Dict[str, float]] = None,
+        compression: Optional[grpc.Compression] = None,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    ) -> None:
+        self.timeout = timeout
+        self.idempotent_timeout = idempotent_timeout
+        self.retry = RetryPolicy() if retry is _DEFAULT_RETRY else retry
+        self.hedging = hedging
+        self.method_timeouts = dict(method_timeouts or {})
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+
+    @staticmethod
+    def is_idempotent(method: str) -> bool:
+        return method.startswith(IDEMPOTENT_METHOD_PREFIXES)
+
+    def is_hedged(self, method: str) -> bool:
+        return (
+            self.hedging is not None
+            and method.startswith(HEDGED_METHOD_PREFIXES)
+            and not method.startswith(UNHEDGED_METHOD_PREFIXES)
+        )
+
+    def timeout_for(self, method: str) -> Optional[float]:
+        if method in self.method_timeouts:
+            return self.method_timeouts[method]
+        if self.is_idempotent(method):
+            return self.idempotent_timeout
+        return self.timeout
+
+    def service_config(self, services: Iterable) -> str:
+        """The gRPC service config of this policy as JSON.
+
+        Args:
+            services: protobuf `ServiceDescriptor`s of the services sharing
+                the channel
+        """
+        method_configs = []
+        for service in services:
+            if self.timeout is not None:
+                method_configs.append(
+                    {
+                        "name": [{"service": service.full_name}],
+                        "timeout": _duration(self.timeout),
+                    }
+                )
+            for method in service.methods:
+                name = method.name
+                if name not in self.method_timeouts and not self.is_idempotent(name):
+                    continue  # covered by the service wide entry above
+                config: dict = {
+                    "name": [{"service": service.full_name, "method": name}]
+                }
+                timeout = self.timeout_for(name)
+                if timeout is not None:
+                    config["timeout"] = _duration(timeout)
+                if self.retry is not None and self.is_idempotent(name):
+                    config["retryPolicy"] = self.retry.to_config()
+                method_configs.append(config)
+        return json.dumps({"methodConfig": method_configs}, sort_keys=True)
+
+    def channel_options(self, services: Iterable) -> tuple:
+        return (
+            ("grpc.enable_retries", 1),
+            ("grpc.service_config", self.service_config(services)),
+        )
+
+    def wrap_stub(self, stub):
+        """Apply the hedging and compression of this policy to a stub.
+
+        Hedged unary triggers are replaced by `HedgedUnaryUnary`, and with
+        `compression` set every RPC taking a single request message is
+        wrapped by `CompressedCall`.
+        """
+        if self.hedging is None and self.compression is None:
+            return stub
+        for name, method in list(vars(stub).items()):
+            unary_unary = isinstance(
+                method, (grpc.UnaryUnaryMultiCallable, grpc.aio.UnaryUnaryMultiCallable)
+            )
+            if unary_unary and self.hedging is not None and self.is_hedged(name):
+                method = HedgedUnaryUnary(method, self.hedging)
+            if self.compression is not None and (
+                unary_unary
+                or isinstance(
+                    method,
+                    (grpc.UnaryStreamMultiCallable, grpc.aio.UnaryStreamMultiCallable),
+                )
+            ):
+                method = CompressedCall(
+                    method, self.compression, self.compression_threshold
+                )
+            setattr(stub, name, method)
+        return stub
+
+
+DEFAULT_CALL_POLICY = CallPolicy()
+
+
+class HedgedUnaryUnary:
+    """A unary-unary multicallable that sends hedged attempts.
+
+    Works on both sync and `grpc.aio` multicallables; for the latter calling
+    it returns a coroutine. The deadline passed by the caller bounds all
+    attempts together.
+    """
+
+    def __init__(self, method, policy: HedgingPolicy) -> None:
+        self._method = method
+        self._policy = policy
+        self._aio = isinstance(method, grpc.aio.UnaryUnaryMultiCallable)
+
+    def __getattr__(self, name: str):
+        return getattr(self._method, name)
+
+    def __call__(self, request, timeout=None, metadata=None, **kwargs):
+        if self._aio:
+            return self._async_call(request, timeout, metadata, **kwargs)
+        return self._sync_call(request, timeout, metadata, **kwargs)
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+    def _sync_call(self, request, timeout, metadata, **kwargs):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done: queue.Queue = queue.Queue()
+        calls: list = []
+        finished = 0
+        launch = True
+        try:
+            while True:
+                if launch and len(calls) < self._policy.max_attempts:
+                    call = self._method.future(
+                        request,
+                        timeout=self._remaining(deadline),
+                        metadata=metadata,
+                        **kwargs,
+                    )
+                    call.add_done_callback(done.put)
+                    calls.append(call)
+                launch = False
+
+                wait = None
+                if len(calls) < self._policy.max_attempts:
+                    wait = self._policy.hedging_delay
+                try:
+                    call = done.get(timeout=wait)
+                except queue.Empty:
+                    launch = True  # no response within the hedging delay
+                    continue
+
+                finished += 1
+                error = call.exception()
+                if error is None:
+                    return call.result()
+                if (
+                    not self._policy.is_non_fatal(error)
+                    or finished == self._policy.max_attempts
+                ):
+                    raise error
+                launch = True
+        finally:
+            for call in calls:
+                call.cancel()
+
+    async def _async_call(self, request, timeout, metadata, **kwargs):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        calls: list = []
+        pending: set = set()
+        finished = 0
+        launch = True
+        try:
+            while True:
+                if launch and len(calls) < self._policy.max_attempts:
+                    call = self._method(
+                        request,
+                        timeout=self._remaining(deadline),
+                        metadata=metadata,
+                        **kwargs,
+                    )
+                    calls.append(call)
+                    pending.add(asyncio.ensure_future(call))
+                launch = False
+
+                wait = None
+                if len(calls) < self._policy.max_attempts:
+                    wait = self._policy.hedging_delay
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch = True  # no response within the hedging delay
+                    continue
+
+                for task in done:
+                    finished += 1
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if (
+                        not self._policy.is_non_fatal(error)
+                        or finished == self._policy.max_attempts
+                    ):
+                        raise error
+                launch = True
+        finally:
+            for task in pending:
+                task.cancel()
+            for call in calls:
+                call.cancel()
+
+
+class CompressedCall:
+    """A multicallable that compresses requests of at least `threshold` bytes.
+
+    Smaller requests are sent with `grpc.Compression.NoCompression`, since
+    compressing them costs more CPU than it saves on the wire. A
+    `compression` passed by the caller is used as is.
+    """
+
+    def __init__(self, method, compression: grpc.Compression, threshold: int) -> None:
+        self._method = method
+        self._compression = compression
+        self._threshold = threshold
+
+    def __getattr__(self, name: str):
+        return getattr(self._method, name)
+
+    def __call__(self, request, **kwargs):
+        if kwargs.get("compression") is None:
+            # under the upb backend serializing is cheaper than ByteSize()
+            if len(request.SerializeToString()) >= self._threshold:
+                kwargs["compression"] = self._compression
+            else:
+                kwargs["compression"] = grpc.Compression.NoCompression
+        return self._method(request, **kwargs)
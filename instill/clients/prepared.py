@@ -0,0 +1,128 @@
+# pylint: disable=no-member
+from typing import Callable, List, Optional
+
+import google.protobuf.message
+import grpc
+
+from instill.clients.base import RequestFactory
+from instill.helpers.struct_codec import fill_struct
+from instill.utils.error_handler import async_grpc_handler, grpc_handler
+
+
+class _TriggerTemplate:
+    """Request template and call metadata shared by prepared triggers.
+
+    Args:
+        client: the sync client whose host and metadata are used
+        method: name of the trigger RPC, e.g. `TriggerNamespacePipeline`
+        request: request with every field but the inputs already set
+        inputs_field: repeated field of `request` holding one item per input
+        fields_of: returns the Struct fields to fill for an added item
+        to_output: converts the response before it is returned
+        health: `HealthCache` checked before each call, defaults to the
+            client's
+    """
+
+    def __init__(
+        self,
+        client,
+        method: str,
+        request: google.protobuf.message.Message,
+        inputs_field: str,
+        fields_of: Callable,
+        to_output: Optional[Callable] = None,
+        health=None,
+    ) -> None:
+        self._client = client
+        self._method_name = method
+        self._template = request
+        self._inputs_field = inputs_field
+        self._fields_of = fields_of
+        self._to_output = to_output
+        self.health = client.health if health is None else health
+        self._host = None
+        self._client_metadata = None
+        self._metadata: tuple = ()
+
+    def build_request(self, inputs: List[dict]) -> google.protobuf.message.Message:
+        """Copy the template and add `inputs` to it."""
+        request = type(self._template)()
+        request.CopyFrom(self._template)
+        items = getattr(request, self._inputs_field)
+        for item in inputs:
+            fill_struct(self._fields_of(items.add()), item)
+        return request
+
+    def _call_metadata(self) -> tuple:
+        # rebuilt only when the client gets a new host or metadata, e.g. once
+        # the requester namespace is resolved
+        host, metadata = self._client.host, self._client.metadata
+        if host is not self._host or metadata is not self._client_metadata:
+            self._metadata = tuple(host.metadata + metadata)
+            self._host, self._client_metadata = host, metadata
+        return self._metadata
+
+    def _output(self, resp):
+        return resp if self._to_output is None else self._to_output(resp)
+
+
+class PreparedTrigger(_TriggerTemplate):
+    """A trigger bound to one pipeline or model version.
+
+    The static request fields and the call metadata are built once, so each
+    call only pays for converting its inputs. Create one with
+    `PipelineClient.prepare_trigger` or `ModelClient.prepare_trigger`.
+
+    Example:
+        trigger = client.pipeline.prepare_trigger(namespace_id, pipeline_id)
+        for data in batches:
+            outputs = trigger.trigger(data)
+    """
+
+    def as_async(self, health=None) -> "AsyncPreparedTrigger":
+        """The same trigger sent over the client's `grpc.aio` channel."""
+        return AsyncPreparedTrigger(
+            self._client,
+            self._method_name,
+            self._template,
+            self._inputs_field,
+            self._fields_of,
+            self._to_output,
+            health=health,
+        )
+
+    @grpc_handler
+    def trigger(
+        self,
+        inputs: List[dict],
+        timeout: Optional[float] = None,
+        compression: Optional[grpc.Compression] = None,
+    ):
+        resp = RequestFactory(
+            method=getattr(self._client.host.client, self._method_name),
+            request=self.build_request(inputs),
+            metadata=self._call_metadata(),
+            timeout=timeout,
+            compression=compression,
+        ).send_sync()
+        return self._output(resp)
+
+
+class AsyncPreparedTrigger(_TriggerTemplate):
+    """Coroutine counterpart of `PreparedTrigger`, sent over `grpc.aio`."""
+
+    @async_grpc_handler
+    async def trigger(
+        self,
+        inputs: List[dict],
+        timeout: Optional[float] = None,
+        compression: Optional[grpc.Compression] = None,
+    ):
+        resp = await RequestFactory(
+            method=getattr(self._client.host.async_client, self._method_name),
+            request=self.build_request(inputs),
+            metadata=self._call_metadata(),
+            timeout=timeout,
+            compression=compression,
+        ).send_async()
+        return self._output(resp)
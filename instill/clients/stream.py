@@ -0,0 +1,94 @@
+import asyncio
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+import grpc
+from google.protobuf.json_format import MessageToDict
+
+from instill.utils.error_handler import NotServingException
+from instill.utils.health_cache import HealthCache
+
+
+def _is_cancellation(rpc_error: grpc.RpcError) -> bool:
+    return rpc_error.code() == grpc.StatusCode.CANCELLED  # type: ignore[attr-defined]
+
+
+class TriggerStream:
+    """Iterator over the partial outputs of a streaming pipeline trigger.
+
+    Each response is yielded as soon as it arrives, decoded to a dict with
+    `outputs` and `metadata`. `cancel` (or leaving a `with` block) stops the
+    RPC; iteration then ends quietly. A deadline expiring mid-stream raises
+    the `grpc.RpcError` with `DEADLINE_EXCEEDED`.
+
+    Example:
+        with client.pipeline.stream_trigger(ns, pipeline_id, data) as stream:
+            for chunk in stream:
+                print(chunk["outputs"])
+    """
+
+    def __init__(self, call) -> None:
+        self._call = call
+        self._cancelled = False
+
+    def __iter__(self) -> Iterator[dict]:
+        try:
+            for resp in self._call:
+                yield MessageToDict(resp)
+        except grpc.RpcError as rpc_error:
+            if not (self._cancelled and _is_cancellation(rpc_error)):
+                raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+    def cancel(self):
+        self._cancelled = True
+        self._call.cancel()
+
+
+class AsyncTriggerStream:
+    """Async iterator counterpart of `TriggerStream`.
+
+    The RPC starts on the first iteration, after the service's cached
+    serving status has been checked.
+    """
+
+    def __init__(self, start: Callable, health: Optional[HealthCache] = None):
+        self._start = start
+        self._health = health
+        self._call: Optional[grpc.aio.UnaryStreamCall] = None
+        self._cancelled = False
+
+    def __aiter__(self) -> AsyncIterator[dict]:
+        return self._iterate()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.cancel()
+
+    def cancel(self):
+        self._cancelled = True
+        if self._call is not None:
+            self._call.cancel()
+
+    async def _iterate(self) -> AsyncIterator[dict]:
+        if self._health is not None and not await self._health.async_is_serving():
+            raise NotServingException
+        if self._cancelled:
+            return
+        call = self._call = self._start()
+        try:
+            async for resp in call:
+                yield MessageToDict(resp)
+        except asyncio.CancelledError:
+            # a locally cancelled grpc.aio call raises CancelledError
+            if not self._cancelled:
+                raise
+        except grpc.RpcError as rpc_error:
+            if not (self._cancelled and _is_cancellation(rpc_error)):
+                raise
@@ -21,6 +21,8 @@ class _InstillHost(BaseModel):
     url: str
     secure: bool
     token: str
+    # keyword arguments of `instill.clients.ChannelOptions`
+    channel_options: t.Optional[t.Dict[str, t.Any]] = None
 
 
 class _Config(BaseModel):
@@ -69,9 +71,15 @@ class Configuration:
                 c,
             )
 
-    def set_default(self, url: str, token: str, secure: bool):
+    def set_default(
+        self,
+        url: str,
+        token: str,
+        secure: bool,
+        channel_options: t.Optional[t.Dict[str, t.Any]] = None,
+    ):
         self._config.hosts["default"] = _InstillHost(
-            url=url, secure=secure, token=token
+            url=url, secure=secure, token=token, channel_options=channel_options
         )
 
 
@@ -1,5 +1,9 @@
 # pylint: disable=no-name-in-module
-from instill.helpers.ray_config import InstillDeployable, instill_deployment
+from instill.helpers.ray_config import (
+    InstillDeployable,
+    instill_batch,
+    instill_deployment,
+)
 from instill.helpers.ray_io import (
     construct_custom_output,
     construct_task_chat_output,
@@ -26,4 +30,5 @@ from instill.helpers.ray_io import (
     parse_task_ocr_to_vision_input,
     parse_task_semantic_segmentation_to_vision_input,
     parse_task_text_to_image_input,
+    stream_task_output,
 )
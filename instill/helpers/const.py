@@ -20,10 +20,16 @@ PROMPT_ROLES = ["user", "assistant", "system"]
 IMAGE_INPUT_TYPE_URL = "image-url"
 IMAGE_INPUT_TYPE_BASE64 = "image-base64"
 
+BBOX_FORMAT_XYWH = "xywh"
+BBOX_FORMAT_XYXY = "xyxy"
+
 HOST_URL_PROD = "localhost:8080"
 
 EMBEDDING_FORMAT_FLOAT = "float"
 EMBEDDING_FORMAT_BASE64 = "base64"
+EMBEDDING_DTYPE_FLOAT32 = "float32"
+EMBEDDING_DTYPE_FLOAT16 = "float16"
+EMBEDDING_DTYPE_INT8 = "int8"
 EMBEDDING_INPUT_TYPE_QUERY = "query"
 EMBEDDING_INPUT_TYPE_DOCUMENT = "document"
 EMBEDDING_TRUNCATE_NONE = "none"
@@ -139,11 +145,14 @@ DEFAULT_RUNTIME_ENV = {
 }
 DEFAULT_MAX_ONGOING_REQUESTS = 4
 DEFAULT_MAX_QUEUED_REQUESTS = 1000
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_BATCH_WAIT_TIMEOUT_S = 0.01
 
 RAM_MINIMUM_RESERVE = 1  # GB
 RAM_UPSCALE_FACTOR = 1.25
 VRAM_MINIMUM_RESERVE = 2  # GB
 VRAM_UPSCALE_FACTOR = 1.25
+DEFAULT_KV_CACHE_TOKENS = 4096
 
 ENV_MEMORY = "RAY_MEMORY"
 ENV_TOTAL_VRAM = "RAY_TOTAL_VRAM"
@@ -155,3 +164,5 @@ ENV_NUM_OF_MIN_REPLICAS = "RAY_NUM_OF_MIN_REPLICAS"
 ENV_NUM_OF_MAX_REPLICAS = "RAY_NUM_OF_MAX_REPLICAS"
 ENV_IS_TEST_MODEL = "RAY_IS_TEST_MODEL"
 ENV_IS_HIGH_SCALE_MODEL = "RAY_IS_HIGH_SCALE_MODEL"
+ENV_IMAGE_CACHE_BYTES = "RAY_IMAGE_CACHE_BYTES"
+ENV_KV_CACHE_TOKENS = "RAY_KV_CACHE_TOKENS"
@@ -0,0 +1,151 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from PIL import Image
+
+DEFAULT_IMAGE_CACHE_BYTES = 512 * 1024**2
+DEFAULT_IMAGE_CACHE_TTL = 300.0  # seconds, for responses without freshness info
+
+
+class _CacheEntry:
+    def __init__(self, image: Image.Image, size: int) -> None:
+        self.image = image
+        self.size = size
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.expires_at = 0.0
+        self.must_revalidate = False
+
+
+def image_nbytes(image: Image.Image) -> int:
+    """Approximate decoded size of an image in bytes."""
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """In-process LRU cache of decoded images keyed by URL.
+
+    The cache is bounded by the decoded size of its images; the least
+    recently used ones are evicted first. Freshness follows the response's
+    `Cache-Control` header (`max-age`, `no-cache`, `no-store`), falling back
+    to `default_ttl`. Stale entries are revalidated with `If-None-Match` /
+    `If-Modified-Since`, and a `304 Not Modified` keeps the decoded image.
+    Callers always receive a copy, so the cached image cannot be mutated.
+
+    Example:
+        get_image_fetcher().cache = ImageCache(max_bytes=1024**3)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_IMAGE_CACHE_BYTES,
+        default_ttl: float = DEFAULT_IMAGE_CACHE_TTL,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def current_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, url: str) -> Optional[Image.Image]:
+        """Return a fresh cached image, or None if it is missing or stale."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or not self._is_fresh(entry):
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            return entry.image.copy()
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        with self._lock:
+            entry = self._entries.get(url)
+            headers: Dict[str, str] = {}
+            if entry is None:
+                return headers
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            return headers
+
+    def revalidated(self, url: str, headers) -> Optional[Image.Image]:
+        """Refresh a stale entry after a `304 Not Modified` response."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            self._apply_headers(entry, headers)
+            self._entries.move_to_end(url)
+            self.revalidations += 1
+            self.hits += 1
+            return entry.image.copy()
+
+    def put(self, url: str, image: Image.Image, headers) -> Image.Image:
+        """Cache a freshly downloaded image and return a copy for the caller."""
+        image.load()
+        with self._lock:
+            self.misses += 1
+            self._remove(url)
+            size = image_nbytes(image)
+            cache_control = headers.get("Cache-Control", "").lower()
+            if "no-store" in cache_control or size > self.max_bytes:
+                return image
+            entry = _CacheEntry(image, size)
+            self._apply_headers(entry, headers)
+            self._entries[url] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return image.copy()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _apply_headers(self, entry: _CacheEntry, headers):
+        entry.etag = headers.get("ETag", entry.etag)
+        entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+        cache_control = headers.get("Cache-Control", "").lower()
+        max_age = re.search(r"max-age=(\d+)", cache_control)
+        ttl = int(max_age.group(1)) if max_age else self.default_ttl
+        entry.must_revalidate = "no-cache" in cache_control
+        entry.expires_at = time.monotonic() + ttl
+
+    def _is_fresh(self, entry: _CacheEntry) -> bool:
+        return not entry.must_revalidate and time.monotonic() < entry.expires_at
+
+    def _remove(self, url: str):
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry.size
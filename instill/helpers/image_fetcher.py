@@ -0,0 +1,148 @@
+import asyncio
+import io
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from PIL import Image
+
+from instill.helpers.const import ENV_IMAGE_CACHE_BYTES, HEADERS
+from instill.helpers.errors import InvalidInputException
+from instill.helpers.image_cache import ImageCache
+
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_PER_HOST_LIMIT = 8
+DEFAULT_REQUEST_TIMEOUT = 10.0  # seconds
+DEFAULT_FETCH_DEADLINE = 30.0  # seconds
+
+
+class ImageFetcher:
+    """Concurrent, connection-pooled downloader for image URLs.
+
+    Downloads run on a dedicated thread pool over one pooled
+    `requests.Session`, so the replica's event loop is never blocked. At most
+    `per_host_limit` requests go to the same host at once and `fetch_all`
+    bounds the whole batch by a single deadline. With an `ImageCache`,
+    repeated URLs are served from memory and revalidated when stale.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        cache: Optional[ImageCache] = None,
+    ) -> None:
+        self.cache = cache
+        self.per_host_limit = per_host_limit
+        self.request_timeout = request_timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=max_connections, pool_maxsize=max_connections
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_connections, thread_name_prefix="image-fetcher"
+        )
+        # asyncio semaphores are bound to a loop, so keep one set per loop
+        self._host_limits: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get(self, url: str) -> bytes:
+        resp = self.session.get(url, timeout=self.request_timeout)
+        resp.raise_for_status()
+        return resp.content
+
+    def fetch(self, url: str) -> Image.Image:
+        """Download and open one image, blocking the calling thread."""
+        cache = self.cache
+        if cache is None:
+            return Image.open(io.BytesIO(self.get(url)))
+
+        image = cache.get(url)
+        if image is not None:
+            return image
+        resp = self.session.get(
+            url, headers=cache.validators(url), timeout=self.request_timeout
+        )
+        if resp.status_code == 304:
+            image = cache.revalidated(url, resp.headers)
+            if image is not None:
+                return image
+            # evicted since the conditional request was sent
+            resp = self.session.get(url, timeout=self.request_timeout)
+        resp.raise_for_status()
+        return cache.put(url, Image.open(io.BytesIO(resp.content)), resp.headers)
+
+    async def fetch_async(self, url: str) -> Image.Image:
+        if self.cache is not None:
+            image = self.cache.get(url)
+            if image is not None:
+                return image
+        async with self._host_limit(url):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.fetch, url)
+
+    async def fetch_all(
+        self,
+        urls: Iterable[str],
+        deadline: Optional[float] = DEFAULT_FETCH_DEADLINE,
+    ) -> Dict[str, Image.Image]:
+        """Download every distinct URL concurrently.
+
+        Returns:
+            a mapping from each URL to its image
+
+        Raises:
+            InvalidInputException: if the batch does not finish within
+                `deadline` seconds
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+        try:
+            images = await asyncio.wait_for(
+                asyncio.gather(*(self.fetch_async(url) for url in unique_urls)),
+                timeout=deadline,
+            )
+        except asyncio.TimeoutError as e:
+            raise InvalidInputException(
+                f"fetching {len(unique_urls)} images exceeded {deadline}s"
+            ) from e
+        return dict(zip(unique_urls, images))
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        limits = self._host_limits.setdefault(asyncio.get_running_loop(), {})
+        host = urlsplit(url).netloc
+        if host not in limits:
+            limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return limits[host]
+
+
+_default_fetcher: Optional[ImageFetcher] = None
+
+
+def get_image_fetcher() -> ImageFetcher:
+    """Return the process-wide `ImageFetcher`, creating it on first use.
+
+    Setting `RAY_IMAGE_CACHE_BYTES` on a deployment gives the fetcher an
+    `ImageCache` of that size.
+    """
+    global _default_fetcher  # pylint: disable=global-statement
+    if _default_fetcher is None:
+        cache = None
+        cache_bytes = os.getenv(ENV_IMAGE_CACHE_BYTES)
+        if cache_bytes is not None and int(cache_bytes) > 0:
+            cache = ImageCache(max_bytes=int(cache_bytes))
+        _default_fetcher = ImageFetcher(cache=cache)
+    return _default_fetcher
+
+
+def set_image_fetcher(fetcher: ImageFetcher):
+    """Replace the process-wide `ImageFetcher`, e.g. to change its limits."""
+    global _default_fetcher  # pylint: disable=global-statement
+    _default_fetcher = fetcher
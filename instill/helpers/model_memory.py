@@ -0,0 +1,299 @@
+"""Estimate the memory a model needs from its weight file headers.
+
+Only headers are read: the JSON header of safetensors files, the tensor
+info table of GGUF files and the `total_size` of PyTorch index files, so a
+directory holding tens of GB of weights is sized in milliseconds. Results
+are cached per file by mtime and size.
+"""
+
+import fnmatch
+import functools
+import json
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+from instill.helpers.utils import IGNORE_FOLDERS
+
+GGML_TYPE_NAMES = {
+    0: "F32",
+    1: "F16",
+    2: "Q4_0",
+    3: "Q4_1",
+    6: "Q5_0",
+    7: "Q5_1",
+    8: "Q8_0",
+    9: "Q8_1",
+    10: "Q2_K",
+    11: "Q3_K",
+    12: "Q4_K",
+    13: "Q5_K",
+    14: "Q6_K",
+    15: "Q8_K",
+    24: "I8",
+    25: "I16",
+    26: "I32",
+    27: "I64",
+    28: "F64",
+    30: "BF16",
+}
+
+TORCH_DTYPE_BYTES = {
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "float8_e4m3fn": 1,
+}
+
+# checkpoint names saved by transformers and torch.save conventions, so that
+# optimizer.pt, training_args.bin and the like are not counted as weights
+PYTORCH_WEIGHT_PATTERNS = ("pytorch_model*.bin", "model*.pt", "model*.pth")
+
+GGUF_MAGIC = b"GGUF"
+GGUF_DEFAULT_ALIGNMENT = 32
+# struct formats of the fixed-size GGUF metadata value types
+_GGUF_SCALAR_FORMATS = {
+    0: "<B",
+    1: "<b",
+    2: "<H",
+    3: "<h",
+    4: "<I",
+    5: "<i",
+    6: "<f",
+    7: "<?",
+    10: "<Q",
+    11: "<q",
+    12: "<d",
+}
+_GGUF_TYPE_STRING = 8
+_GGUF_TYPE_ARRAY = 9
+
+
+class ModelMemoryEstimate:
+    """Memory needed to serve a model.
+
+    Attributes:
+        weight_bytes_by_dtype: bytes of weights per tensor dtype, "unknown"
+            when the format does not record it
+        kv_cache_bytes: bytes of KV cache for the requested number of tokens,
+            0 when the model has no transformer `config.json`
+    """
+
+    def __init__(
+        self, weight_bytes_by_dtype: Dict[str, int], kv_cache_bytes: int = 0
+    ) -> None:
+        self.weight_bytes_by_dtype = weight_bytes_by_dtype
+        self.kv_cache_bytes = kv_cache_bytes
+
+    @property
+    def weight_bytes(self) -> int:
+        return sum(self.weight_bytes_by_dtype.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return self.weight_bytes + self.kv_cache_bytes
+
+    def __repr__(self) -> str:
+        return (
+            f"ModelMemoryEstimate(weight_bytes={self.weight_bytes}, "
+            f"kv_cache_bytes={self.kv_cache_bytes})"
+        )
+
+
+def read_safetensors_header(path: str) -> Dict[str, int]:
+    """Weight bytes per dtype of a safetensors file, from its JSON header."""
+    with open(path, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+
+    bytes_by_dtype: Dict[str, int] = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        start, end = info["data_offsets"]
+        dtype = info["dtype"]
+        bytes_by_dtype[dtype] = bytes_by_dtype.get(dtype, 0) + end - start
+    return bytes_by_dtype
+
+
+def _read_gguf_string(f) -> bytes:
+    (length,) = struct.unpack("<Q", f.read(8))
+    return f.read(length)
+
+
+def _read_gguf_value(f, value_type: int):
+    if value_type == _GGUF_TYPE_STRING:
+        return _read_gguf_string(f)
+    if value_type == _GGUF_TYPE_ARRAY:
+        item_type, count = struct.unpack("<IQ", f.read(12))
+        if item_type in _GGUF_SCALAR_FORMATS:
+            # skip numeric arrays, e.g. token scores, without decoding them
+            f.seek(count * struct.calcsize(_GGUF_SCALAR_FORMATS[item_type]), 1)
+            return None
+        return [_read_gguf_value(f, item_type) for _ in range(count)]
+    fmt = _GGUF_SCALAR_FORMATS[value_type]
+    return struct.unpack(fmt, f.read(struct.calcsize(fmt)))[0]
+
+
+def read_gguf_header(path: str) -> Dict[str, int]:
+    """Weight bytes per ggml type of a GGUF file, from its tensor info table.
+
+    Tensor sizes are taken from the distance between consecutive tensor data
+    offsets, so quantized block layouts do not need to be known.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if f.read(4) != GGUF_MAGIC:
+            raise ValueError(f"{path} is not a GGUF file")
+        (version,) = struct.unpack("<I", f.read(4))
+        count_format = "<II" if version == 1 else "<QQ"
+        tensor_count, kv_count = struct.unpack(
+            count_format, f.read(struct.calcsize(count_format))
+        )
+
+        alignment = GGUF_DEFAULT_ALIGNMENT
+        for _ in range(kv_count):
+            key = _read_gguf_string(f)
+            (value_type,) = struct.unpack("<I", f.read(4))
+            value = _read_gguf_value(f, value_type)
+            if key == b"general.alignment":
+                alignment = value
+
+        tensors = []
+        for _ in range(tensor_count):
+            _read_gguf_string(f)
+            (n_dims,) = struct.unpack("<I", f.read(4))
+            f.seek(8 * n_dims, 1)
+            ggml_type, offset = struct.unpack("<IQ", f.read(12))
+            tensors.append((offset, ggml_type))
+        data_start = -(-f.tell() // alignment) * alignment
+
+    tensors.sort()
+    bytes_by_dtype: Dict[str, int] = {}
+    for i, (offset, ggml_type) in enumerate(tensors):
+        end = tensors[i + 1][0] if i + 1 < len(tensors) else file_size - data_start
+        dtype = GGML_TYPE_NAMES.get(ggml_type, f"GGML_{ggml_type}")
+        bytes_by_dtype[dtype] = bytes_by_dtype.get(dtype, 0) + end - offset
+    return bytes_by_dtype
+
+
+def read_pytorch_index(path: str) -> Dict[str, int]:
+    """Weight bytes of a sharded PyTorch checkpoint, from its index file."""
+    with open(path, encoding="utf-8") as f:
+        index = json.load(f)
+    return {"unknown": int(index["metadata"]["total_size"])}
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_weight_bytes(
+    path: str, _mtime_ns: int, _size: int
+) -> Tuple[Tuple[str, int], ...]:
+    if path.endswith(".safetensors"):
+        bytes_by_dtype = read_safetensors_header(path)
+    elif path.endswith(".gguf"):
+        bytes_by_dtype = read_gguf_header(path)
+    elif path.endswith(".index.json"):
+        bytes_by_dtype = read_pytorch_index(path)
+    else:
+        bytes_by_dtype = {"unknown": os.path.getsize(path)}
+    return tuple(bytes_by_dtype.items())
+
+
+def weight_bytes(path: str) -> Dict[str, int]:
+    """Weight bytes per dtype of one weight file, cached by mtime and size."""
+    stat = os.stat(path)
+    return dict(_cached_weight_bytes(path, stat.st_mtime_ns, stat.st_size))
+
+
+def _find_files(model_path: str) -> Dict[str, list]:
+    found: Dict[str, list] = {
+        "safetensors": [],
+        "gguf": [],
+        "index": [],
+        "pytorch": [],
+        "config": [],
+    }
+    for root, dirs, files in os.walk(model_path):
+        dirs[:] = [d for d in dirs if d not in IGNORE_FOLDERS]
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(".safetensors"):
+                found["safetensors"].append(path)
+            elif name.endswith(".gguf"):
+                found["gguf"].append(path)
+            elif name.endswith(".bin.index.json"):
+                found["index"].append(path)
+            elif any(fnmatch.fnmatch(name, p) for p in PYTORCH_WEIGHT_PATTERNS):
+                found["pytorch"].append(path)
+            elif name == "config.json":
+                found["config"].append(path)
+    return found
+
+
+def _config_value(config: Dict, *keys: str):
+    """The first set value of `keys`, which name one setting across architectures."""
+    for key in keys:
+        if config.get(key):
+            return config[key]
+    return None
+
+
+def kv_cache_bytes(config: Dict, num_tokens: int) -> int:
+    """KV cache bytes for `num_tokens` tokens of a transformers `config.json`.
+
+    Returns 0 when the config lacks the layer, head or hidden sizes.
+    """
+    config = config.get("text_config", config)
+    num_layers = _config_value(config, "num_hidden_layers", "n_layer", "num_layers")
+    num_heads = _config_value(config, "num_attention_heads", "n_head", "num_heads")
+    if not num_layers or not num_heads:
+        return 0
+    num_kv_heads = config.get("num_key_value_heads") or num_heads
+    head_dim = config.get("head_dim")
+    if not head_dim:
+        hidden_size = _config_value(config, "hidden_size", "n_embd", "d_model")
+        if not hidden_size:
+            return 0
+        head_dim = hidden_size // num_heads
+    max_tokens = _config_value(config, "max_position_embeddings", "n_positions")
+    if max_tokens:
+        num_tokens = min(num_tokens, max_tokens)
+    dtype_bytes = TORCH_DTYPE_BYTES.get(config.get("torch_dtype", "float16"), 2)
+    # one key and one value vector per layer, head and token
+    return 2 * num_layers * num_kv_heads * head_dim * num_tokens * dtype_bytes
+
+
+def estimate_model_memory(
+    model_path: str, kv_cache_tokens: int = 0
+) -> Optional[ModelMemoryEstimate]:
+    """Estimate the weights and KV cache memory of a model file or directory.
+
+    safetensors weights are preferred over GGUF, sharded PyTorch indexes and
+    plain PyTorch checkpoints, since model repositories often ship the same
+    weights in several formats.
+
+    Returns:
+        the estimate, or None if no weight file was found
+    """
+    if os.path.isfile(model_path):
+        return ModelMemoryEstimate(weight_bytes(model_path))
+
+    found = _find_files(model_path)
+    weight_files = (
+        found["safetensors"] or found["gguf"] or found["index"] or found["pytorch"]
+    )
+    if not weight_files:
+        return None
+
+    bytes_by_dtype: Dict[str, int] = {}
+    for path in weight_files:
+        for dtype, size in weight_bytes(path).items():
+            bytes_by_dtype[dtype] = bytes_by_dtype.get(dtype, 0) + size
+
+    kv_bytes = 0
+    if kv_cache_tokens and found["config"]:
+        config_path = min(found["config"], key=len)  # the top-level config
+        with open(config_path, encoding="utf-8") as f:
+            kv_bytes = kv_cache_bytes(json.load(f), kv_cache_tokens)
+
+    return ModelMemoryEstimate(bytes_by_dtype, kv_bytes)
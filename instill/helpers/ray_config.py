@@ -1,17 +1,26 @@
+# pylint: disable=no-name-in-module
+import functools
+import inspect
 import os
-from typing import Callable, Optional
+from typing import Callable, Dict, Hashable, List, Optional
 from warnings import warn
 
 from ray.serve import Deployment
+from ray.serve import batch as ray_batch
 from ray.serve import deployment as ray_deployment
+from starlette.requests import Request
 
 from instill.helpers.const import (
     DEFAULT_AUTOSCALING_CONFIG,
+    DEFAULT_BATCH_WAIT_TIMEOUT_S,
+    DEFAULT_KV_CACHE_TOKENS,
+    DEFAULT_MAX_BATCH_SIZE,
     DEFAULT_MAX_ONGOING_REQUESTS,
     DEFAULT_MAX_QUEUED_REQUESTS,
     DEFAULT_RAY_ACTOR_OPTIONS,
     ENV_IS_HIGH_SCALE_MODEL,
     ENV_IS_TEST_MODEL,
+    ENV_KV_CACHE_TOKENS,
     ENV_MEMORY,
     ENV_NUM_OF_CPUS,
     ENV_NUM_OF_GPUS,
@@ -25,8 +34,13 @@ from instill.helpers.const import (
     VRAM_MINIMUM_RESERVE,
     VRAM_UPSCALE_FACTOR,
 )
-from instill.helpers.errors import ModelPathException
+from instill.helpers.errors import InvalidOutputShapeException, ModelPathException
+from instill.helpers.model_memory import estimate_model_memory
 from instill.helpers.utils import get_dir_size
+from instill.protogen.model.ray.v1alpha.user_defined_pb2 import (
+    CallRequest,
+    CallResponse,
+)
 
 
 class InstillDeployable:
@@ -87,59 +101,49 @@ class InstillDeployable:
             self._update_target_ongoing_requests(4)
             self._update_max_concurrent_requests(6)
 
-    def _determine_vram_usage(self, model_path: str, total_vram: str):
+    def _estimate_model_bytes(self, model_path: str, kv_cache_tokens: int = 0):
+        estimate = estimate_model_memory(model_path, kv_cache_tokens)
+        if estimate is not None:
+            return estimate.total_bytes
         warn(
-            "determine vram usage base on file size will soon be removed",
+            "no weight file found, determine memory usage base on file size will "
+            "soon be removed",
             PendingDeprecationWarning,
         )
+        if os.path.isdir(model_path):
+            return get_dir_size(model_path)
+        return os.path.getsize(model_path)
+
+    def _determine_vram_usage(self, model_path: str, total_vram: str):
         if total_vram == "":
             return 0.25
-        if os.path.isfile(model_path):
-            min_vram_usage = max(
-                VRAM_MINIMUM_RESERVE,
-                VRAM_UPSCALE_FACTOR
-                * os.path.getsize(model_path)
-                / (1024 * 1024 * 1024),
-            )
-            ratio = min_vram_usage / float(total_vram)
-            if ratio > 1:
-                warn(
-                    "model projected vram usage is more than the GPU can handle, \
-                    deployment might result in error state"
-                )
-                ratio = 1
-            return ratio
-        if os.path.isdir(model_path):
-            min_vram_usage = max(
-                VRAM_MINIMUM_RESERVE,
-                VRAM_UPSCALE_FACTOR * get_dir_size(model_path) / (1024 * 1024 * 1024),
+        if not os.path.exists(model_path):
+            raise ModelPathException
+
+        kv_cache_tokens = int(os.getenv(ENV_KV_CACHE_TOKENS) or DEFAULT_KV_CACHE_TOKENS)
+        min_vram_usage = max(
+            VRAM_MINIMUM_RESERVE,
+            VRAM_UPSCALE_FACTOR
+            * self._estimate_model_bytes(model_path, kv_cache_tokens)
+            / (1024 * 1024 * 1024),
+        )
+        ratio = min_vram_usage / float(total_vram)
+        if ratio > 1:
+            warn(
+                "model projected vram usage is more than the GPU can handle, \
+                deployment might result in error state"
             )
-            ratio = min_vram_usage / float(total_vram)
-            if ratio > 1:
-                warn(
-                    "model projected vram usage is more than the GPU can handle, \
-                    deployment might result in error state"
-                )
-                ratio = 1
-            return ratio
-        raise ModelPathException
+            ratio = 1
+        return ratio
 
     def _determine_ram_usage(self, model_path: str):
-        warn(
-            "determine ram usage base on file size will soon be removed",
-            PendingDeprecationWarning,
+        if not os.path.exists(model_path):
+            raise ModelPathException
+
+        return max(
+            RAM_MINIMUM_RESERVE * (1024 * 1024 * 1024),
+            RAM_UPSCALE_FACTOR * self._estimate_model_bytes(model_path),
         )
-        if os.path.isfile(model_path):
-            return max(
-                RAM_MINIMUM_RESERVE * (1024 * 1024 * 1024),
-                RAM_UPSCALE_FACTOR * os.path.getsize(model_path),
-            )
-        if os.path.isdir(model_path):
-            return max(
-                RAM_MINIMUM_RESERVE * (1024 * 1024 * 1024),
-                RAM_UPSCALE_FACTOR * get_dir_size(model_path),
-            )
-        raise ModelPathException
 
     def _update_num_cpus(self, num_cpus: float):
         if self._deployment.ray_actor_options is not None:
@@ -224,10 +228,110 @@ class InstillDeployable:
 def instill_deployment(
     _func_or_class: Optional[Callable] = None,
 ) -> Callable[[Callable], InstillDeployable]:
+    max_ongoing_requests = DEFAULT_MAX_ONGOING_REQUESTS
+    max_batch_size = getattr(
+        getattr(_func_or_class, "__call__", None), "_instill_max_batch_size", 0
+    )
+    if max_batch_size:
+        # admit enough requests to fill a batch while the previous one runs
+        max_ongoing_requests = max(max_ongoing_requests, 2 * max_batch_size)
+
     return ray_deployment(
         _func_or_class=_func_or_class,
         ray_actor_options=DEFAULT_RAY_ACTOR_OPTIONS,
         autoscaling_config=DEFAULT_AUTOSCALING_CONFIG,
-        max_ongoing_requests=DEFAULT_MAX_ONGOING_REQUESTS,
+        max_ongoing_requests=max_ongoing_requests,
         max_queued_requests=DEFAULT_MAX_QUEUED_REQUESTS,
     )
+
+
+def instill_batch(
+    _func: Optional[Callable] = None,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    batch_wait_timeout_s: float = DEFAULT_BATCH_WAIT_TIMEOUT_S,
+    bucket_key: Optional[Callable[[CallRequest], Hashable]] = None,
+):
+    """Merge the task inputs of concurrent requests into one model call.
+
+    Decorate the `__call__` of an `instill_deployment` class. Up to
+    `max_batch_size` requests arriving within `batch_wait_timeout_s` of each
+    other are combined into a single `CallRequest`, and the `task_outputs`
+    of the model's response are split back to each caller in order, so the
+    model keeps using the `parse_task_*` and `construct_task_*` helpers
+    unchanged. Requests with different `bucket_key` values, e.g. a rounded
+    prompt length, are sent to the model as separate batches to limit
+    padding. HTTP test requests bypass batching.
+
+    Example:
+        @instill_deployment
+        class Model:
+            @instill_batch(max_batch_size=32)
+            async def __call__(self, request):
+                ...
+    """
+
+    # the nested functions are pickled by value with the deployment, so they
+    # must not reference the generated message classes in annotations
+    def decorator(call: Callable) -> Callable:
+        @ray_batch(
+            max_batch_size=max_batch_size, batch_wait_timeout_s=batch_wait_timeout_s
+        )
+        async def handle_batch(instances: List, requests: List) -> List:
+            return await _call_in_buckets(call, instances[0], requests, bucket_key)
+
+        @functools.wraps(call)
+        async def wrapper(self, request):
+            # http test input
+            if isinstance(request, Request):
+                return await _maybe_await(call(self, request))
+
+            response = await handle_batch(self, request)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        wrapper._instill_max_batch_size = max_batch_size  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator(_func) if callable(_func) else decorator
+
+
+async def _maybe_await(result):
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+async def _call_in_buckets(
+    call: Callable,
+    instance,
+    requests: List[CallRequest],
+    bucket_key: Optional[Callable[[CallRequest], Hashable]],
+) -> List:
+    buckets: Dict[Hashable, List[int]] = {}
+    for i, request in enumerate(requests):
+        key = bucket_key(request) if bucket_key is not None else None
+        buckets.setdefault(key, []).append(i)
+
+    # a failed bucket only fails its own requests
+    responses: List = [None] * len(requests)
+    for indexes in buckets.values():
+        merged = CallRequest()
+        for i in indexes:
+            merged.task_inputs.extend(requests[i].task_inputs)
+        try:
+            response = await _maybe_await(call(instance, merged))
+            if len(response.task_outputs) != len(merged.task_inputs):
+                raise InvalidOutputShapeException
+        except Exception as e:  # pylint: disable=broad-except
+            for i in indexes:
+                responses[i] = e
+            continue
+
+        start = 0
+        for i in indexes:
+            end = start + len(requests[i].task_inputs)
+            responses[i] = CallResponse(task_outputs=response.task_outputs[start:end])
+            start = end
+
+    return responses
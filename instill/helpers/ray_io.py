@@ -1,18 +1,25 @@
 # pylint: disable=no-member,no-name-in-module, inconsistent-return-statements, unused-import
+import asyncio
 import base64
 import io
+import json
 import re
-from typing import Dict, Iterable, List, Union
+from typing import AsyncIterator, Dict, Iterable, List, Sequence, Union, overload
 
 import numpy as np
-import requests
-from google.protobuf import json_format, struct_pb2
 from google.protobuf.struct_pb2 import Struct
 from PIL import Image
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
 from instill.helpers.const import (
-    HEADERS,
+    BBOX_FORMAT_XYWH,
+    BBOX_FORMAT_XYXY,
+    EMBEDDING_DTYPE_FLOAT16,
+    EMBEDDING_DTYPE_FLOAT32,
+    EMBEDDING_DTYPE_INT8,
+    EMBEDDING_FORMAT_BASE64,
+    EMBEDDING_FORMAT_FLOAT,
     IMAGE_INPUT_TYPE_BASE64,
     IMAGE_INPUT_TYPE_URL,
     PROMPT_ROLES,
@@ -26,6 +33,13 @@ from instill.helpers.const import (
     VisionInput,
 )
 from instill.helpers.errors import InvalidInputException, InvalidOutputShapeException
+from instill.helpers.image_fetcher import get_image_fetcher
+from instill.helpers.struct_codec import (
+    StructView,
+    dict_to_struct,
+    fill_struct,
+    struct_to_dict,
+)
 from instill.protogen.model.ray.v1alpha.user_defined_pb2 import (
     CallRequest,
     CallResponse,
@@ -47,9 +61,12 @@ def base64_to_pil_image(base64_str):
 
 
 def url_to_pil_image(url):
-    resp = requests.get(url, headers=HEADERS, timeout=10)
-    resp.raise_for_status()
-    return Image.open(io.BytesIO(resp.content))
+    return get_image_fetcher().fetch(url)
+
+
+async def fetch_url_images(urls: Iterable[str]) -> Dict[str, Image.Image]:
+    """Download all image URLs of a request concurrently, keyed by URL."""
+    return await get_image_fetcher().fetch_all(urls)
 
 
 def snake_to_lower_camel(name):
@@ -58,24 +75,28 @@ def snake_to_lower_camel(name):
     return components[0] + "".join(x.title() for x in components[1:])
 
 
-def dict_to_struct(dict_data: Dict) -> Struct:
-    """Convert Dict to Struct"""
-    struct_pb: Struct = struct_pb2.Struct()
-    json_format.ParseDict(dict_data, struct_pb)
+def dicts_to_call_response(task_outputs: List[Union[Struct, Dict]]) -> CallResponse:
+    """Build a CallResponse, writing dict outputs straight into its Structs"""
+    response = CallResponse()
+    for output in task_outputs:
+        if isinstance(output, Struct):
+            response.task_outputs.append(output)
+        else:
+            fill_struct(response.task_outputs.add().fields, output)
 
-    return struct_pb
+    return response
 
 
 async def _parse_vision_task_to_vision_input(
     request: Union[CallRequest, Request],
 ) -> List[VisionInput]:
 
-    def extract_data(data: Dict) -> VisionInput:
+    def extract_data(data: Dict, url_images: Dict[str, Image.Image]) -> VisionInput:
         image_type = data["type"]
 
         inp = VisionInput()
         if image_type == IMAGE_INPUT_TYPE_URL:
-            inp.image = url_to_pil_image(data[image_type])
+            inp.image = url_images[data[image_type]]
         elif image_type == IMAGE_INPUT_TYPE_BASE64:
             inp.image = base64_to_pil_image(data[image_type])
         else:
@@ -90,17 +111,19 @@ async def _parse_vision_task_to_vision_input(
         if "type" not in data:
             data["type"] = IMAGE_INPUT_TYPE_URL
 
-        return [extract_data(data)]
-
-    input_list = []
-    for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
-
-        data = task_input_dict["data"]
+        data_list = [data]
+    else:
+        data_list = [
+            StructView(task_input)["data"] for task_input in request.task_inputs
+        ]
+
+    url_images = await fetch_url_images(
+        data[IMAGE_INPUT_TYPE_URL]
+        for data in data_list
+        if data["type"] == IMAGE_INPUT_TYPE_URL
+    )
 
-        input_list.append(extract_data(data))
-
-    return input_list
+    return [extract_data(data, url_images) for data in data_list]
 
 
 async def parse_task_classification_to_vision_input(
@@ -121,19 +144,12 @@ def construct_task_classification_output(
     task_outputs: List[Union[Struct, Dict]] = []
     for category, score in zip(categories, scores):
         data: Dict = {"category": str(category), "score": float(score)}
-        if isinstance(request, Request):
-            task_outputs.append({"data": data})
-        else:
-            task_outputs.append(dict_to_struct({"data": data}))
+        task_outputs.append({"data": data})
 
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_detection_to_vision_input(
@@ -143,19 +159,69 @@ async def parse_task_detection_to_vision_input(
     return await _parse_vision_task_to_vision_input(request)
 
 
+# per-input model outputs, as nested sequences or NumPy arrays
+_Labels = Union[Sequence[Union[Sequence[str], np.ndarray]], np.ndarray]
+_Scores = Union[Sequence[Union[Sequence[float], np.ndarray]], np.ndarray]
+_Boxes = Union[Sequence[Union[Sequence[Sequence[float]], np.ndarray]], np.ndarray]
+_Keypoints = Union[
+    Sequence[Union[Sequence[Sequence[Sequence[float]]], np.ndarray]], np.ndarray
+]
+
+
+def _float_array(values, shape: tuple) -> np.ndarray:
+    """Cast model outputs to a float array of `shape`, -1 matching any length"""
+    array = np.asarray(values, dtype=np.float64)
+    if array.size == 0:
+        return array.reshape([0 if dim == -1 else dim for dim in shape])
+    if array.ndim != len(shape) or any(
+        dim not in (-1, size) for dim, size in zip(shape, array.shape)
+    ):
+        raise InvalidOutputShapeException
+    return array
+
+
+def _bounding_boxes(boxes, bbox_format: str) -> List[Dict]:
+    """Convert an (N, 4) array-like of boxes to bounding-box dicts in bulk"""
+    array = _float_array(boxes, (-1, 4))
+    if bbox_format == BBOX_FORMAT_XYXY:
+        array = np.concatenate([array[:, :2], array[:, 2:] - array[:, :2]], axis=1)
+    elif bbox_format != BBOX_FORMAT_XYWH:
+        raise ValueError(f"unsupported bounding box format {bbox_format}")
+    return [
+        {"top": top, "left": left, "width": width, "height": height}
+        for left, top, width, height in array.tolist()
+    ]
+
+
+def _scores(scores) -> List[float]:
+    return _float_array(scores, (-1,)).tolist()
+
+
+def _keypoints(keypoints) -> List[List[Dict]]:
+    """Convert an (N, K, 3) array-like of (x, y, visibility) to point dicts"""
+    return [
+        [{"x": x, "y": y, "v": v} for x, y, v in points]
+        for points in _float_array(keypoints, (-1, -1, 3)).tolist()
+    ]
+
+
 def construct_task_detection_output(
     request: Union[CallRequest, Request],
-    categories: List[List[str]],
-    scores: List[List[float]],
-    bounding_boxes: List[List[tuple]],
+    categories: _Labels,
+    scores: _Scores,
+    bounding_boxes: _Boxes,
+    bbox_format: str = BBOX_FORMAT_XYWH,
 ) -> Union[CallResponse, List]:
     """Construct trigger output for detection task
 
     Args:
-        categories (List[List[str]]): for each image input, the list of detected object's category
-        scores (List[List[float]]): for each image input, the list of detected object's score
-        bounding_boxes (List[List[tuple]]): for each image input, the list of detected object's bbox, with the format
-        (top left x, top left y, width, height)
+        categories (Sequence[Sequence[str] | np.ndarray] | np.ndarray): for each image input, the
+        list or (N,) array of detected object's category
+        scores (Sequence[Sequence[float] | np.ndarray] | np.ndarray): for each image input, the list or (N,) array of
+        detected object's score
+        bounding_boxes (Sequence[Sequence[tuple] | np.ndarray] | np.ndarray): for each image input, the list or (N, 4)
+        array of detected object's bbox, with the format (top left x, top left y, width, height)
+        bbox_format (str): `xywh`, or `xyxy` for (top left x, top left y, bottom right x, bottom right y)
     """
     if not len(categories) == len(scores) == len(bounding_boxes):
         raise InvalidOutputShapeException
@@ -164,32 +230,19 @@ def construct_task_detection_output(
     for category, score, bbox in zip(categories, scores, bounding_boxes):
         data: Dict = {}
         objects: List[Dict] = []
-        for cat, sc, bb in zip(category, score, bbox):
-            bb_dict = {
-                "top": float(bb[1]),
-                "left": float(bb[0]),
-                "width": float(bb[2]),
-                "height": float(bb[3]),
-            }
-            objects.append(
-                {"category": str(cat), "score": float(sc), "bounding-box": bb_dict}
-            )
+        for cat, sc, bb_dict in zip(
+            category, _scores(score), _bounding_boxes(bbox, bbox_format)
+        ):
+            objects.append({"category": str(cat), "score": sc, "bounding-box": bb_dict})
 
         data["objects"] = objects
 
-        if isinstance(request, Request):
-            task_outputs.append({"data": data})
-        else:
-            task_outputs.append(dict_to_struct({"data": data}))
+        task_outputs.append({"data": data})
 
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_ocr_to_vision_input(
@@ -201,17 +254,21 @@ async def parse_task_ocr_to_vision_input(
 
 def construct_task_ocr_output(
     request: Union[CallRequest, Request],
-    texts: List[List[str]],
-    scores: List[List[float]],
-    bounding_boxes: List[List[tuple]],
+    texts: _Labels,
+    scores: _Scores,
+    bounding_boxes: _Boxes,
+    bbox_format: str = BBOX_FORMAT_XYWH,
 ) -> Union[CallResponse, List]:
     """Construct trigger output for ocr task
 
     Args:
-        texts (List[List[str]]): for each image input, the list of detected text
-        scores (List[List[float]]): for each image input, the list of detected text's score
-        bounding_boxes (List[List[tuple]]): for each image input, the list of detected text's bbox, with the format
-        (top left x, top left y, width, height)
+        texts (Sequence[Sequence[str] | np.ndarray] | np.ndarray): for each image input, the list or
+        (N,) array of detected text
+        scores (Sequence[Sequence[float] | np.ndarray] | np.ndarray): for each image input, the list or (N,) array of
+        detected text's score
+        bounding_boxes (Sequence[Sequence[tuple] | np.ndarray] | np.ndarray): for each image input, the list or (N, 4)
+        array of detected text's bbox, with the format (top left x, top left y, width, height)
+        bbox_format (str): `xywh`, or `xyxy` for (top left x, top left y, bottom right x, bottom right y)
     """
     if not len(texts) == len(scores) == len(bounding_boxes):
         raise InvalidOutputShapeException
@@ -220,32 +277,19 @@ def construct_task_ocr_output(
     for text, score, bbox in zip(texts, scores, bounding_boxes):
         data: Dict = {}
         objects: List[Dict] = []
-        for txt, sc, bb in zip(text, score, bbox):
-            bb_dict = {
-                "top": float(bb[1]),
-                "left": float(bb[0]),
-                "width": float(bb[2]),
-                "height": float(bb[3]),
-            }
-            objects.append(
-                {"text": str(txt), "score": float(sc), "bounding-box": bb_dict}
-            )
+        for txt, sc, bb_dict in zip(
+            text, _scores(score), _bounding_boxes(bbox, bbox_format)
+        ):
+            objects.append({"text": str(txt), "score": sc, "bounding-box": bb_dict})
 
         data["objects"] = objects
 
-        if isinstance(request, Request):
-            task_outputs.append({"data": data})
-        else:
-            task_outputs.append(dict_to_struct({"data": data}))
+        task_outputs.append({"data": data})
 
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_instance_segmentation_to_vision_input(
@@ -257,19 +301,24 @@ async def parse_task_instance_segmentation_to_vision_input(
 
 def construct_task_instance_segmentation_output(
     request: Union[CallRequest, Request],
-    rles: List[List[str]],
-    categories: List[List[str]],
-    scores: List[List[float]],
-    bounding_boxes: List[List[tuple]],
+    rles: _Labels,
+    categories: _Labels,
+    scores: _Scores,
+    bounding_boxes: _Boxes,
+    bbox_format: str = BBOX_FORMAT_XYWH,
 ) -> Union[CallResponse, List]:
     """Construct trigger output for instance segmentation task
 
     Args:
-        rles (List[List[str]]): for each image input, the list of detected object's rle
-        categories (List[List[str]]): for each image input, the list of detected object's category
-        scores (List[List[float]]): for each image input, the list of detected text's score
-        bounding_boxes (List[List[tuple]]): for each image input, the list of detected text's bbox, with the format
-        (top left x, top left y, width, height)
+        rles (Sequence[Sequence[str] | np.ndarray] | np.ndarray): for each image input, the list or
+        (N,) array of detected object's rle
+        categories (Sequence[Sequence[str] | np.ndarray] | np.ndarray): for each image input, the
+        list or (N,) array of detected object's category
+        scores (Sequence[Sequence[float] | np.ndarray] | np.ndarray): for each image input, the list or (N,) array of
+        detected object's score
+        bounding_boxes (Sequence[Sequence[tuple] | np.ndarray] | np.ndarray): for each image input, the list or (N, 4)
+        array of detected object's bbox, with the format (top left x, top left y, width, height)
+        bbox_format (str): `xywh`, or `xyxy` for (top left x, top left y, bottom right x, bottom right y)
     """
     if not len(rles) == len(categories) == len(scores) == len(bounding_boxes):
         raise InvalidOutputShapeException
@@ -278,37 +327,26 @@ def construct_task_instance_segmentation_output(
     for rle, category, score, bbox in zip(rles, categories, scores, bounding_boxes):
         data: Dict = {}
         objects: List[Dict] = []
-        for r, cat, sc, bb in zip(rle, category, score, bbox):
-            bb_dict = {
-                "top": float(bb[1]),
-                "left": float(bb[0]),
-                "width": float(bb[2]),
-                "height": float(bb[3]),
-            }
+        for r, cat, sc, bb_dict in zip(
+            rle, category, _scores(score), _bounding_boxes(bbox, bbox_format)
+        ):
             objects.append(
                 {
                     "rle": str(r),
                     "category": str(cat),
-                    "score": float(sc),
+                    "score": sc,
                     "bounding-box": bb_dict,
                 }
             )
 
         data["objects"] = objects
 
-        if isinstance(request, Request):
-            task_outputs.append({"data": data})
-        else:
-            task_outputs.append(dict_to_struct({"data": data}))
+        task_outputs.append({"data": data})
 
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_semantic_segmentation_to_vision_input(
@@ -342,19 +380,12 @@ def construct_task_semantic_segmentation_output(
 
         data["stuffs"] = objects
 
-        if isinstance(request, Request):
-            task_outputs.append({"data": data})
-        else:
-            task_outputs.append(dict_to_struct({"data": data}))
+        task_outputs.append({"data": data})
 
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_keypoint_to_vision_input(
@@ -366,18 +397,22 @@ async def parse_task_keypoint_to_vision_input(
 
 def construct_task_keypoint_output(
     request: Union[CallRequest, Request],
-    keypoints: List[List[List[tuple]]],
-    scores: List[List[float]],
-    bounding_boxes: List[List[tuple]],
+    keypoints: _Keypoints,
+    scores: _Scores,
+    bounding_boxes: _Boxes,
+    bbox_format: str = BBOX_FORMAT_XYWH,
 ) -> Union[CallResponse, List]:
     """Construct trigger output for keypoint task
 
     Args:
-        keypoints (List[List[List[str]]]): for each image input, the list of detected object's keypoints,
-        with the format (x_coordinate, y_coordinate, visibility)
-        scores (List[List[float]]): for each image input, the list of detected object's score
-        bounding_boxes (List[List[tuple]]): for each image input, the list of detected object's bbox, with the format
-        (top left x, top left y, width, height)
+        keypoints (Sequence[Sequence[Sequence[tuple]] | np.ndarray] | np.ndarray): for each image
+        input, the list or (N, K, 3) array of detected object's keypoints, with the format
+        (x_coordinate, y_coordinate, visibility)
+        scores (Sequence[Sequence[float] | np.ndarray] | np.ndarray): for each image input, the list or (N,) array of
+        detected object's score
+        bounding_boxes (Sequence[Sequence[tuple] | np.ndarray] | np.ndarray): for each image input, the list or (N, 4)
+        array of detected object's bbox, with the format (top left x, top left y, width, height)
+        bbox_format (str): `xywh`, or `xyxy` for (top left x, top left y, bottom right x, bottom right y)
     """
 
     if not len(keypoints) == len(scores) == len(bounding_boxes):
@@ -387,36 +422,21 @@ def construct_task_keypoint_output(
     for keypoint, score, bbox in zip(keypoints, scores, bounding_boxes):
         data: Dict = {}
         objects: List[Dict] = []
-        for kps, sc, bb in zip(keypoint, score, bbox):
-            point_list = []
-            for kp in kps:
-                point_list.append({"x": kp[0], "y": kp[1], "v": kp[2]})
-
-            bb_dict = {
-                "top": float(bb[1]),
-                "left": float(bb[0]),
-                "width": float(bb[2]),
-                "height": float(bb[3]),
-            }
+        for point_list, sc, bb_dict in zip(
+            _keypoints(keypoint), _scores(score), _bounding_boxes(bbox, bbox_format)
+        ):
             objects.append(
-                {"keypoints": point_list, "score": float(sc), "bounding-box": bb_dict}
+                {"keypoints": point_list, "score": sc, "bounding-box": bb_dict}
             )
 
         data["objects"] = objects
 
-        if isinstance(request, Request):
-            task_outputs.append({"data": data})
-        else:
-            task_outputs.append(dict_to_struct({"data": data}))
+        task_outputs.append({"data": data})
 
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_completion_to_completion_input(
@@ -457,7 +477,7 @@ async def parse_task_completion_to_completion_input(
 
     input_list = []
     for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
+        task_input_dict = StructView(task_input)
 
         data = task_input_dict["data"]
         parameter = (
@@ -505,7 +525,7 @@ async def parse_task_completion_to_completion_input(
 
         # stream
         if "stream" in parameter:
-            inp.seed = int(parameter["stream"])
+            inp.stream = bool(int(parameter["stream"]))
 
         input_list.append(inp)
 
@@ -589,11 +609,7 @@ def construct_task_completion_output(
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_chat_to_chat_input(
@@ -634,7 +650,7 @@ async def parse_task_chat_to_chat_input(
 
     input_list: List[ChatInput] = []
     for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
+        task_input_dict = StructView(task_input)
 
         data = task_input_dict["data"]
         parameter = (
@@ -729,7 +745,7 @@ async def parse_task_chat_to_chat_input(
 
         # stream
         if "stream" in parameter:
-            inp.seed = int(parameter["stream"])
+            inp.stream = bool(int(parameter["stream"]))
 
         input_list.append(inp)
 
@@ -813,11 +829,74 @@ def construct_task_chat_output(
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
+
+
+async def _iterate(chunks) -> AsyncIterator:
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    # e.g. a transformers TextIteratorStreamer, which blocks between tokens
+    iterator = iter(chunks)
+    done = object()
+    while True:
+        chunk = await asyncio.to_thread(next, iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+# CallRequest first, since a protobuf message also matches Request without
+# protobuf type stubs
+@overload
+def stream_task_output(
+    request: CallRequest,
+    chunks: Union[AsyncIterator, Iterable],
+) -> AsyncIterator[CallResponse]: ...
+
+
+@overload
+def stream_task_output(
+    request: Request,
+    chunks: Union[AsyncIterator, Iterable],
+) -> StreamingResponse: ...
+
+
+def stream_task_output(
+    request: Union[CallRequest, Request],
+    chunks: Union[AsyncIterator, Iterable],
+) -> Union[StreamingResponse, AsyncIterator[CallResponse]]:
+    """Stream incremental outputs of a chat or completion model
+
+    Each chunk is what `construct_task_chat_output` or
+    `construct_task_completion_output` returns for the text generated since
+    the previous chunk, with an empty finish reason until the last one.
+    Return the result from `__call__`: gRPC callers that stream, e.g. a
+    `DeploymentHandle` with `stream=True`, receive one `CallResponse` per
+    chunk and HTTP test requests receive newline delimited JSON, so the
+    return type follows the type of `request`.
+
+    Args:
+        chunks (Union[AsyncIterator, Iterable]): the model's (async) generator of chunk outputs
+
+    Example:
+        async def __call__(self, request):
+            inputs = await parse_task_chat_to_chat_input(request)
+            if inputs[0].stream:
+                return stream_task_output(request, self.generate_chunks(request, inputs))
+            ...
+    """
+    if isinstance(request, Request):
+
+        async def ndjson():
+            async for chunk in _iterate(chunks):
+                yield json.dumps(chunk) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    return _iterate(chunks)
 
 
 async def parse_task_chat_to_multimodal_chat_input(
@@ -841,7 +920,7 @@ async def parse_task_chat_to_multimodal_chat_input(
         test_prompt = test_data["prompt"]
         image_url = test_data["image-url"]
         inp.messages = [{"role": "user", "content": test_prompt}]
-        inp.prompt_images = [[url_to_pil_image(image_url)]]
+        inp.prompt_images = [[await get_image_fetcher().fetch_async(image_url)]]
 
         # Override defaults only if valid values are provided in test_data
         if "max-tokens" in test_data and test_data["max-tokens"] not in ["", None, 0]:
@@ -863,10 +942,18 @@ async def parse_task_chat_to_multimodal_chat_input(
 
         return [inp]
 
-    input_list = []
-    for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
+    task_input_dicts = [StructView(task_input) for task_input in request.task_inputs]
+    url_images = await fetch_url_images(
+        c["image-url"]
+        for task_input_dict in task_input_dicts
+        for message in task_input_dict["data"]["messages"]
+        if message["role"] == PROMPT_ROLES[0]
+        for c in message["content"]
+        if c["type"] == "image-url"
+    )
 
+    input_list = []
+    for task_input_dict in task_input_dicts:
         data = task_input_dict["data"]
         parameter = (
             task_input_dict["parameter"] if "parameter" in task_input_dict else {}
@@ -891,7 +978,7 @@ async def parse_task_chat_to_multimodal_chat_input(
                             )
                         messages.insert(i, {"role": role, "content": c["text"]})
                     elif c["type"] == "image-url":
-                        imgs.append(url_to_pil_image(c["image-url"]))
+                        imgs.append(url_images[c["image-url"]])
                     elif c["type"] == "image-base64":
                         imgs.append(base64_to_pil_image(c["image-base64"]))
                     else:
@@ -947,7 +1034,7 @@ async def parse_task_chat_to_multimodal_chat_input(
 
         # stream
         if "stream" in parameter:
-            inp.seed = int(parameter["stream"])
+            inp.stream = bool(int(parameter["stream"]))
 
         input_list.append(inp)
 
@@ -969,7 +1056,7 @@ async def parse_task_text_to_image_input(
 
     input_list = []
     for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
+        task_input_dict = StructView(task_input)
 
         data = task_input_dict["data"]
         parameter = (
@@ -1037,11 +1124,7 @@ def construct_task_text_to_image_output(
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_task_embedding_to_text_embedding_input(
@@ -1061,7 +1144,7 @@ async def parse_task_embedding_to_text_embedding_input(
 
     input_list = []
     for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
+        task_input_dict = StructView(task_input)
 
         data = task_input_dict["data"]
         parameter = (
@@ -1112,14 +1195,20 @@ async def parse_task_embedding_to_image_embedding_input(
         test_img = test_data["image"]
 
         inp = ImageEmbeddingInput()
-        inp.images = [url_to_pil_image(test_img)]
+        inp.images = [await get_image_fetcher().fetch_async(test_img)]
 
         return [inp]
 
-    input_list = []
-    for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
+    task_input_dicts = [StructView(task_input) for task_input in request.task_inputs]
+    url_images = await fetch_url_images(
+        embedding["image-url"]
+        for task_input_dict in task_input_dicts
+        for embedding in task_input_dict["data"]["embeddings"]
+        if embedding["type"] == "image-url"
+    )
 
+    input_list = []
+    for task_input_dict in task_input_dicts:
         data = task_input_dict["data"]
         parameter = (
             task_input_dict["parameter"] if "parameter" in task_input_dict else {}
@@ -1131,7 +1220,7 @@ async def parse_task_embedding_to_image_embedding_input(
         images: List[Image.Image] = []
         for embedding in data["embeddings"]:
             if embedding["type"] == "image-url":
-                images.append(url_to_pil_image(embedding[embedding["type"]]))
+                images.append(url_images[embedding[embedding["type"]]])
             elif embedding["type"] == "image-base64":
                 images.append(base64_to_pil_image(embedding[embedding["type"]]))
             else:
@@ -1171,18 +1260,28 @@ async def parse_task_embedding_to_multimodal_embedding_input(
         inp = MultimodalEmbeddingInput()
         inp.contents = []
         if "image" in test_data:
+            test_img = test_data["image"]
             inp.contents.append(
-                {"type": "image", "image": url_to_pil_image(test_data["image"])}
+                {
+                    "type": "image",
+                    "image": await get_image_fetcher().fetch_async(test_img),
+                }
             )
         if "text" in test_data:
             inp.contents.append({"type": "text", "text": test_data["text"]})
 
         return [inp]
 
-    input_list = []
-    for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
+    task_input_dicts = [StructView(task_input) for task_input in request.task_inputs]
+    url_images = await fetch_url_images(
+        embedding["image-url"]
+        for task_input_dict in task_input_dicts
+        for embedding in task_input_dict["data"]["embeddings"]
+        if embedding["type"] == "image-url"
+    )
 
+    input_list = []
+    for task_input_dict in task_input_dicts:
         data = task_input_dict["data"]
         parameter = (
             task_input_dict["parameter"] if "parameter" in task_input_dict else {}
@@ -1196,7 +1295,7 @@ async def parse_task_embedding_to_multimodal_embedding_input(
                 contents.append(
                     {
                         "type": "image",
-                        "image": url_to_pil_image(embedding[embedding["type"]]),
+                        "image": url_images[embedding[embedding["type"]]],
                     }
                 )
             elif embedding["type"] == "image-base64":
@@ -1234,12 +1333,72 @@ async def parse_task_embedding_to_multimodal_embedding_input(
     return input_list
 
 
+def _base64_embeddings(embeddings, dtype: str) -> List[Dict]:
+    """Encode a batch of vectors as base64 of little-endian `dtype` values"""
+    array = np.asarray(embeddings, dtype=np.float32)
+    if array.size == 0:
+        return []
+    if array.ndim != 2:
+        raise InvalidOutputShapeException
+    scales = None
+    if dtype == EMBEDDING_DTYPE_FLOAT32:
+        array = array.astype("<f4", copy=False)
+    elif dtype == EMBEDDING_DTYPE_FLOAT16:
+        array = array.astype("<f2")
+    elif dtype == EMBEDDING_DTYPE_INT8:
+        # symmetric per-vector quantization, vector ~= int8 values * scale
+        scales = np.abs(array).max(axis=1) / 127
+        scales[scales == 0] = 1
+        array = np.rint(array / scales[:, None]).clip(-127, 127).astype(np.int8)
+    else:
+        raise ValueError(f"unsupported embedding dtype {dtype}")
+
+    encoded: List[Dict] = [
+        {"vector": base64.b64encode(row.tobytes()).decode("ascii"), "dtype": dtype}
+        for row in array
+    ]
+    if scales is not None:
+        for embed, scale in zip(encoded, scales.tolist()):
+            embed["scale"] = scale
+    return encoded
+
+
+def _requested_embedding_formats(
+    request: Union[CallRequest, Request], count: int
+) -> List[str]:
+    """The `parameter.format` of each task input, `float` where unset"""
+    formats = [EMBEDDING_FORMAT_FLOAT] * count
+    if isinstance(request, Request):
+        return formats
+    for i, task_input in enumerate(request.task_inputs[:count]):
+        task_input_dict = StructView(task_input)
+        parameter = (
+            task_input_dict["parameter"] if "parameter" in task_input_dict else {}
+        )
+        if "format" in parameter:
+            formats[i] = str(parameter["format"])
+    return formats
+
+
 def construct_task_embedding_output(
     request: Union[CallRequest, Request],
     indexes: List[List[int]],
     created_timestamps: List[List[int]],
-    embeddings: List[List[list]],
+    embeddings: List[Union[List[list], np.ndarray]],
+    formats: Union[List[str], None] = None,
+    dtype: str = EMBEDDING_DTYPE_FLOAT32,
 ) -> Union[CallResponse, List]:
+    """Construct trigger output for embedding task
+
+    Args:
+        embeddings (List[Union[List[list], np.ndarray]]): for each input, the list or (N, D) array of
+        embedding vectors
+        formats (List[str]): for each input, the requested `format`, by default the `format`
+        parameter of the matching task input in `request`, else `float`. With `base64` each
+        vector is emitted as the base64 encoded bytes of its little-endian `dtype` values
+        dtype (str): `float32`, `float16` or `int8` for base64 output. int8 vectors are quantized per
+        vector and carry the `scale` to multiply them by
+    """
 
     if not len(embeddings) == len(indexes) == len(created_timestamps):
         raise InvalidOutputShapeException
@@ -1247,24 +1406,40 @@ def construct_task_embedding_output(
         len(embeddings[0]) == len(indexes[0]) == len(created_timestamps[0])
     ):
         raise InvalidOutputShapeException
+    if formats is None:
+        formats = _requested_embedding_formats(request, len(embeddings))
+    elif not len(formats) == len(embeddings):
+        raise InvalidOutputShapeException
 
     task_outputs: List[Union[Struct, Dict]] = []
-    for index_list, created_timestamp_list, embedding_list in zip(
-        indexes, created_timestamps, embeddings
+    for index_list, created_timestamp_list, embedding_list, fmt in zip(
+        indexes, created_timestamps, embeddings, formats
     ):
+        if fmt == EMBEDDING_FORMAT_BASE64:
+            vectors = _base64_embeddings(embedding_list, dtype)
+        elif isinstance(embedding_list, np.ndarray):
+            vectors = [{"vector": embed} for embed in embedding_list.tolist()]
+        else:
+            vectors = [
+                {
+                    "vector": (
+                        embed.tolist() if isinstance(embed, np.ndarray) else list(embed)
+                    )
+                }
+                for embed in embedding_list
+            ]
+
         data: Dict = {}
         embeds: List[Dict] = []
         for (
             index,
             created_timestamp,
-            embed,
-        ) in zip(index_list, created_timestamp_list, embedding_list):
-            if isinstance(embed, np.ndarray):
-                embed = embed.tolist()
+            vector,
+        ) in zip(index_list, created_timestamp_list, vectors):
             embeds.append(
                 {
                     "index": index,
-                    "vector": list(embed),
+                    **vector,
                     "created": created_timestamp,
                 }
             )
@@ -1274,11 +1449,7 @@ def construct_task_embedding_output(
     if isinstance(request, Request):
         return task_outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in task_outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(task_outputs)
 
 
 async def parse_custom_input(
@@ -1293,9 +1464,7 @@ async def parse_custom_input(
 
     input_list = []
     for task_input in request.task_inputs:
-        task_input_dict = json_format.MessageToDict(task_input)
-
-        input_list.append(task_input_dict)
+        input_list.append(struct_to_dict(task_input))
 
     return input_list
 
@@ -1307,8 +1476,4 @@ def construct_custom_output(
     if isinstance(request, Request):
         return outputs
 
-    # Convert any remaining dictionaries to Struct objects
-    struct_outputs = [
-        o if isinstance(o, Struct) else dict_to_struct(o) for o in outputs
-    ]
-    return CallResponse(task_outputs=struct_outputs)
+    return dicts_to_call_response(outputs)
@@ -0,0 +1,189 @@
+"""Fast conversion between Python values and `google.protobuf.Struct`.
+
+`json_format.ParseDict` and `json_format.MessageToDict` walk every value
+through reflective, JSON-oriented conversion code. The encoder here writes
+straight into the `Struct` / `ListValue` fields and dispatches on exact
+types, and `StructView` reads a `Struct` lazily, converting only the values
+that are actually accessed.
+"""
+
+# pylint: disable=no-member,no-name-in-module
+import numbers
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List
+
+import numpy as np
+from google.protobuf.struct_pb2 import ListValue, Struct, Value
+
+
+def dict_to_struct(data: Dict) -> Struct:
+    """Convert a dict of JSON-compatible values (or numpy scalars) to a Struct."""
+    struct_pb = Struct()
+    fill_struct(struct_pb.fields, data)
+    return struct_pb
+
+
+def fill_struct(fields, data: Dict):
+    """Write `data` into the `fields` map of a Struct."""
+    for key, value in data.items():
+        t = type(value)
+        if t is float or t is int:
+            fields[key].number_value = value
+        elif t is str:
+            fields[key].string_value = value
+        elif t is dict:
+            if value:
+                fill_struct(fields[key].struct_value.fields, value)
+            else:
+                fields[key].struct_value.SetInParent()
+        elif t is list or t is tuple:
+            if value:
+                fill_list(fields[key].list_value.values, value)
+            else:
+                fields[key].list_value.SetInParent()
+        else:
+            fill_value(fields[key], value)
+
+
+def fill_list(values, data):
+    """Append `data` to the `values` of a ListValue."""
+    for value in data:
+        t = type(value)
+        if t is float or t is int:
+            values.add().number_value = value
+        elif t is str:
+            values.add().string_value = value
+        elif t is dict and value:
+            fill_struct(values.add().struct_value.fields, value)
+        else:
+            fill_value(values.add(), value)
+
+
+def fill_value(value_pb: Value, value: Any):
+    """Write any supported value into a `Value`; the slow, general path."""
+    if value is None:
+        value_pb.null_value = 0
+    elif isinstance(value, (bool, np.bool_)):
+        value_pb.bool_value = bool(value)
+    elif isinstance(value, numbers.Number):
+        value_pb.number_value = float(value)  # type: ignore[arg-type]
+    elif isinstance(value, str):
+        value_pb.string_value = value
+    elif isinstance(value, dict):
+        value_pb.struct_value.SetInParent()
+        fill_struct(value_pb.struct_value.fields, value)
+    elif isinstance(value, np.ndarray):
+        value_pb.list_value.SetInParent()
+        fill_list(value_pb.list_value.values, value.tolist())
+    elif isinstance(value, (list, tuple)):
+        value_pb.list_value.SetInParent()
+        fill_list(value_pb.list_value.values, value)
+    else:
+        raise TypeError(f"cannot convert {type(value).__name__} to a Struct value")
+
+
+class StructView(Mapping):
+    """Read-only mapping over a `Struct` that converts values on access.
+
+    Nested structs and lists are returned as further views, so reading a few
+    keys of a large request never touches the rest of it. Strings are only
+    materialized when they are read.
+    """
+
+    __slots__ = ("_struct", "_fields")
+
+    def __init__(self, struct_pb: Struct) -> None:
+        self._struct = struct_pb
+        self._fields = struct_pb.fields
+
+    def __getitem__(self, key: str) -> Any:
+        value_pb = self._fields.get(key)
+        if value_pb is None:
+            raise KeyError(key)
+        return value_to_python(value_pb)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def to_dict(self) -> Dict:
+        return struct_to_dict(self._struct)
+
+
+class ListView(Sequence):
+    """Read-only sequence over a `ListValue` that converts values on access."""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, list_pb: ListValue) -> None:
+        self._values = list_pb.values
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [value_to_python(v) for v in self._values[index]]
+        return value_to_python(self._values[index])
+
+    def __iter__(self):
+        for value_pb in self._values:
+            yield value_to_python(value_pb)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, ListView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(self.to_list())
+
+    def to_list(self) -> List:
+        return [python_value(v) for v in self._values]
+
+
+def value_to_python(value_pb: Value) -> Any:
+    """Convert a `Value`, returning views for nested structs and lists."""
+    kind = value_pb.WhichOneof("kind")
+    if kind == "string_value":
+        return value_pb.string_value
+    if kind == "number_value":
+        return value_pb.number_value
+    if kind == "struct_value":
+        return StructView(value_pb.struct_value)
+    if kind == "list_value":
+        return ListView(value_pb.list_value)
+    if kind == "bool_value":
+        return value_pb.bool_value
+    return None
+
+
+def struct_to_dict(struct_pb: Struct) -> Dict:
+    """Convert a Struct to plain dicts and lists, like `MessageToDict`."""
+    return {key: python_value(value) for key, value in struct_pb.fields.items()}
+
+
+def python_value(value_pb: Value) -> Any:
+    """Convert a `Value` to plain Python objects."""
+    kind = value_pb.WhichOneof("kind")
+    if kind == "string_value":
+        return value_pb.string_value
+    if kind == "number_value":
+        return value_pb.number_value
+    if kind == "struct_value":
+        return struct_to_dict(value_pb.struct_value)
+    if kind == "list_value":
+        return [python_value(v) for v in value_pb.list_value.values]
+    if kind == "bool_value":
+        return value_pb.bool_value
+    return None
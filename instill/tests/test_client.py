@@ -1,10 +1,60 @@
-# pylint: disable=redefined-outer-name,unused-variable,expression-not-assigned,no-name-in-module
+# pylint: disable=redefined-outer-name,unused-variable,expression-not-assigned,no-name-in-module,protected-access,invalid-name,no-member
 
+import asyncio
+import http.server
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from unittest.mock import patch
+
+import grpc
+import pytest
+from google.longrunning import operations_pb2
+
+import instill.config
+import instill.protogen.artifact.artifact.v1alpha.artifact_pb2 as artifact_interface
+import instill.protogen.artifact.artifact.v1alpha.artifact_public_service_pb2_grpc as artifact_service
+import instill.protogen.artifact.artifact.v1alpha.object_pb2 as object_interface
+import instill.protogen.common.healthcheck.v1beta.healthcheck_pb2 as healthcheck
+import instill.protogen.core.mgmt.v1beta.mgmt_pb2 as mgmt_interface
 import instill.protogen.core.mgmt.v1beta.mgmt_public_service_pb2_grpc as mgmt_service
+import instill.protogen.model.model.v1alpha.model_pb2 as model_interface
 import instill.protogen.model.model.v1alpha.model_public_service_pb2_grpc as model_service
+import instill.protogen.pipeline.pipeline.v1beta.pipeline_pb2 as pipeline_interface
 import instill.protogen.pipeline.pipeline.v1beta.pipeline_public_service_pb2_grpc as pipeline_service
-from instill.clients import MgmtClient, ModelClient, PipelineClient
-from instill.clients.instance import InstillInstance
+from instill.clients import (
+    AsyncPipelineClient,
+    CallPolicy,
+    ChannelOptions,
+    HedgingPolicy,
+    InstillClient,
+    MgmtClient,
+    ModelClient,
+    OperationError,
+    OperationWaiter,
+    PipelineBatcher,
+    PipelineClient,
+)
+from instill.clients.artifact import ArtifactClient
+from instill.clients.instance import (
+    DEFAULT_CHANNEL_OPTIONS,
+    MB,
+    SERVICES,
+    InstillInstance,
+    channel_pool,
+)
+from instill.clients.paginator import paginate_by_page, paginate_by_token
+from instill.clients.policy import CompressedCall
+from instill.config import _Config, _InstillHost
+from instill.utils.error_handler import NotServingException, raising
+from instill.utils.health_cache import HealthCache
+from instill.utils.namespace_cache import (
+    NamespaceCache,
+    get_namespace_cache,
+    set_namespace_cache,
+)
 
 
 def mock(_: str):
@@ -88,3 +138,1071 @@ def describe_client():
             pipeline_client = PipelineClient("", mock)
             pipeline_client.host = pipeline_instance
             expect(pipeline_client.host.token) == "token"
+
+
+def describe_channel_pool():
+    def when_same_host(expect):
+        mgmt_instance = InstillInstance(
+            mgmt_service.MgmtPublicServiceStub, "pool_url", "token", False, False
+        )
+        model_instance = InstillInstance(
+            model_service.ModelPublicServiceStub, "pool_url", "other", False, False
+        )
+        expect(mgmt_instance.channel).is_(model_instance.channel)
+        expect(channel_pool.refcount(mgmt_instance._channel_key)) == 2
+
+        mgmt_instance.close()
+        mgmt_instance.close()
+        expect(channel_pool.refcount(model_instance._channel_key)) == 1
+        model_instance.close()
+        expect(channel_pool.refcount(model_instance._channel_key)) == 0
+
+    def when_different_host(expect):
+        first = InstillInstance(
+            mgmt_service.MgmtPublicServiceStub, "pool_url_a", "token", False, False
+        )
+        second = InstillInstance(
+            mgmt_service.MgmtPublicServiceStub, "pool_url_b", "token", False, False
+        )
+        expect(first.channel).is_not(second.channel)
+        first.close()
+        second.close()
+
+    def when_closing_async_enabled(expect):
+        instance = InstillInstance(
+            mgmt_service.MgmtPublicServiceStub, "pool_url", "token", False, True
+        )
+        expect(instance._async_channel_key).is_(None)
+
+        async def run():
+            expect(instance.async_client).is_(instance.async_client)
+            async_key = instance._async_channel_key
+            assert async_key is not None
+            expect(channel_pool.refcount(async_key)) == 1
+            instance.close()
+            expect(channel_pool.refcount(async_key)) == 0
+
+        asyncio.run(run())
+
+    def when_aio_outside_a_loop():
+        instance = InstillInstance(
+            mgmt_service.MgmtPublicServiceStub, "pool_url", "token", False, True
+        )
+        with pytest.raises(RuntimeError):
+            instance.async_client  # pylint: disable=pointless-statement
+        instance.close()
+
+    def when_aio_on_different_loops(expect):
+        async def make_key():
+            return channel_pool.make_key(
+                "url", "a", False, DEFAULT_CHANNEL_OPTIONS, aio=True
+            )
+
+        expect(asyncio.run(make_key())) != asyncio.run(make_key())
+
+    def when_secure_keys_include_token(expect):
+        key_a = channel_pool.make_key("url", "a", True, DEFAULT_CHANNEL_OPTIONS)
+        key_b = channel_pool.make_key("url", "b", True, DEFAULT_CHANNEL_OPTIONS)
+        expect(key_a) != key_b
+        key_a = channel_pool.make_key("url", "a", False, DEFAULT_CHANNEL_OPTIONS)
+        key_b = channel_pool.make_key("url", "b", False, DEFAULT_CHANNEL_OPTIONS)
+        expect(key_a) == key_b
+
+
+def describe_channel_options():
+    def when_default(expect):
+        expect(ChannelOptions().to_options()) == DEFAULT_CHANNEL_OPTIONS
+
+    def when_configured(expect):
+        options = dict(
+            ChannelOptions(
+                keepalive_time=30,
+                keepalive_permit_without_calls=True,
+                lb_policy="round_robin",
+                http2_window_size=4 * MB,
+                extra={"grpc.primary_user_agent": "test"},
+            ).to_options()
+        )
+
+        expect(options["grpc.keepalive_time_ms"]) == 30000
+        expect(options["grpc.keepalive_timeout_ms"]) == 20000
+        expect(options["grpc.keepalive_permit_without_calls"]) == 1
+        expect(options["grpc.lb_policy_name"]) == "round_robin"
+        expect(options["grpc.http2.lookahead_bytes"]) == 4 * MB
+        expect(options["grpc.primary_user_agent"]) == "test"
+
+    def when_pooled(expect):
+        options = ChannelOptions(lb_policy="round_robin")
+        first = InstillInstance(
+            mgmt_service.MgmtPublicServiceStub,
+            "options_url",
+            "token",
+            False,
+            False,
+            channel_options=options,
+        )
+        second = InstillInstance(
+            model_service.ModelPublicServiceStub,
+            "options_url",
+            "token",
+            False,
+            False,
+            channel_options=ChannelOptions(lb_policy="round_robin"),
+        )
+        default = InstillInstance(
+            mgmt_service.MgmtPublicServiceStub, "options_url", "token", False, False
+        )
+
+        expect(first.channel).is_(second.channel)
+        expect(first.channel).is_not(default.channel)
+        for instance in (first, second, default):
+            instance.close()
+
+    def when_triggering(pipeline_server, expect):
+        client = PipelineClient(
+            "",
+            lookup_func=lambda _: "",
+            url=pipeline_server,
+            secure=False,
+            channel_options=ChannelOptions(keepalive_time=10, lb_policy="round_robin"),
+        )
+        resp = client.trigger("ns", "pipe", [{"text": "hi"}])
+        client.close()
+
+        expect(resp["outputs"]) == [{"echo": "hi"}]
+
+    def when_created_from_config(expect):
+        hosts = {
+            "edge": _InstillHost(
+                url="edge_url",
+                secure=False,
+                token="",
+                channel_options={"lb_policy": "round_robin"},
+            )
+        }
+        with patch.object(
+            instill.config.global_config, "_config", _Config(hosts=hosts)
+        ):
+            client = InstillClient.from_config("edge", lazy_health_check=True)
+
+        expect(client.pipeline.host.url) == "edge_url"
+        expect(
+            ("grpc.lb_policy_name", "round_robin")
+            in client.pipeline.host._channel_key[3]
+        ).is_(True)
+        client.close()
+
+
+def describe_instill_client():
+    def when_lazy_health_check(expect):
+        with patch.object(MgmtClient, "is_serving") as is_serving:
+            client = InstillClient(
+                "", url="localhost:1", secure=False, lazy_health_check=True
+            )
+            is_serving.assert_not_called()
+        expect(client.mgmt.host.channel).is_(client.artifact.host.channel)
+        client.close()
+
+    @patch("instill.clients.client.Logger")
+    def when_core_is_unreachable(_):
+        with pytest.raises(NotServingException):
+            InstillClient("", url="localhost:1", secure=False, health_check_timeout=1)
+
+    @patch("instill.clients.client.Logger")
+    def when_services_are_probed(_, expect):
+        with patch.object(MgmtClient, "is_serving", return_value=True), patch.object(
+            PipelineClient, "is_serving", return_value=False
+        ), patch.object(ModelClient, "is_serving", return_value=True), patch(
+            "instill.clients.client.ArtifactClient.is_serving", return_value=True
+        ):
+            client = InstillClient("", url="localhost:1", secure=False)
+        expect(client.mgmt.health.is_serving()).is_(True)
+        expect(client.pipeline.health.is_serving()).is_(False)
+        client.close()
+
+
+class _PipelineServicer(pipeline_service.PipelinePublicServiceServicer):
+    def __init__(self) -> None:
+        self.batch_sizes: List[int] = []
+        self.operation_polls: Dict[str, int] = {}
+        self.hub_stats_calls = 0
+        self.hub_stats_failures = 0
+        self.requesters: List[Optional[str]] = []
+
+    def Readiness(
+        self,
+        request: pipeline_interface.ReadinessRequest,
+        context: grpc.ServicerContext,
+    ) -> pipeline_interface.ReadinessResponse:
+        return pipeline_interface.ReadinessResponse(
+            health_check_response=healthcheck.HealthCheckResponse(
+                status=healthcheck.HealthCheckResponse.SERVING_STATUS_SERVING
+            )
+        )
+
+    def GetHubStats(
+        self,
+        request: pipeline_interface.GetHubStatsRequest,
+        context: grpc.ServicerContext,
+    ) -> pipeline_interface.GetHubStatsResponse:
+        self.hub_stats_calls += 1
+        if self.hub_stats_calls <= self.hub_stats_failures:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "try again")
+        return pipeline_interface.GetHubStatsResponse(number_of_public_pipelines=3)
+
+    def TriggerNamespacePipeline(
+        self,
+        request: pipeline_interface.TriggerNamespacePipelineRequest,
+        context: grpc.ServicerContext,
+    ) -> pipeline_interface.TriggerNamespacePipelineResponse:
+        self.batch_sizes.append(len(request.data))
+        self.requesters.append(
+            dict(context.invocation_metadata()).get("instill-requester-uid")
+        )
+        texts = [d.variable["text"] for d in request.data]
+        if "fail" in texts:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "bad input")
+        if "unavailable" in texts:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "try again")
+        if "straggler" in texts and len(self.batch_sizes) == 1:
+            time.sleep(1)  # only the first attempt is slow
+        resp = pipeline_interface.TriggerNamespacePipelineResponse()
+        for d in request.data:
+            resp.outputs.add().update({"echo": d.variable["text"]})
+        return resp
+
+    def TriggerNamespacePipelineWithStream(
+        self,
+        request: pipeline_interface.TriggerNamespacePipelineWithStreamRequest,
+        context: grpc.ServicerContext,
+    ) -> Iterator[pipeline_interface.TriggerNamespacePipelineWithStreamResponse]:
+        for d in request.data:
+            if d.variable["text"] == "slow":
+                time.sleep(1)
+            resp = pipeline_interface.TriggerNamespacePipelineWithStreamResponse()
+            resp.outputs.add().update({"echo": d.variable["text"]})
+            yield resp
+
+    def GetOperation(
+        self,
+        request: pipeline_interface.GetOperationRequest,
+        context: grpc.ServicerContext,
+    ) -> pipeline_interface.GetOperationResponse:
+        # operations named "<polls>-<outcome>" finish after <polls> polls
+        polls = self.operation_polls.get(request.operation_id, 0) + 1
+        self.operation_polls[request.operation_id] = polls
+        needed, outcome = request.operation_id.split("-")
+        if outcome == "hang" and polls == 1:
+            time.sleep(3)
+        operation = operations_pb2.Operation(name=request.operation_id)
+        if polls >= int(needed):
+            operation.done = True
+            if outcome == "fail":
+                operation.error.code = grpc.StatusCode.INTERNAL.value[0]
+                operation.error.message = "boom"
+        return pipeline_interface.GetOperationResponse(operation=operation)
+
+
+@pytest.fixture
+def pipeline_servicer():
+    # the generated stubs mark every RPC abstract, but the runtime base answers
+    # the ones not overridden here with UNIMPLEMENTED
+    return _PipelineServicer()  # type: ignore[abstract]
+
+
+@pytest.fixture
+def pipeline_server(pipeline_servicer):
+    server = grpc.server(ThreadPoolExecutor(max_workers=4))
+    pipeline_service.add_PipelinePublicServiceServicer_to_server(
+        pipeline_servicer, server
+    )
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    yield f"localhost:{port}"
+    server.stop(None)
+
+
+def describe_call_policy():
+    @pytest.fixture
+    def client(pipeline_server):
+        clients = []
+
+        def make(policy=None):
+            clients.append(
+                PipelineClient(
+                    "",
+                    lookup_func=lambda _: "",
+                    url=pipeline_server,
+                    secure=False,
+                    preflight_check=False,
+                    call_policy=policy,
+                )
+            )
+            return clients[-1]
+
+        yield make
+        for c in clients:
+            c.close()
+
+    def when_building_service_config(expect):
+        policy = CallPolicy(
+            timeout=30,
+            idempotent_timeout=60,
+            method_timeouts={"TriggerNamespacePipeline": 5},
+        )
+        configs = json.loads(policy.service_config(SERVICES))["methodConfig"]
+        by_method = {
+            c["name"][0].get("method"): c
+            for c in configs
+            if c["name"][0]["service"].endswith("PipelinePublicService")
+        }
+
+        expect(by_method[None]["timeout"]) == "30.000000000s"
+        expect(by_method["GetHubStats"]["timeout"]) == "60.000000000s"
+        expect(by_method["GetHubStats"]["retryPolicy"]["retryableStatusCodes"]) == [
+            "UNAVAILABLE"
+        ]
+        expect(by_method["TriggerNamespacePipeline"]) == {
+            "name": [
+                {
+                    "service": "pipeline.pipeline.v1beta.PipelinePublicService",
+                    "method": "TriggerNamespacePipeline",
+                }
+            ],
+            "timeout": "5.000000000s",
+        }
+        expect("Readiness" in by_method).is_(False)
+
+    def when_default(expect):
+        configs = json.loads(CallPolicy().service_config(SERVICES))["methodConfig"]
+
+        expect(any("timeout" in c for c in configs)).is_(False)
+        expect(all("retryPolicy" in c for c in configs)).is_(True)
+        expect(CallPolicy().retry).is_not(CallPolicy().retry)
+
+    def when_retries_disabled(expect):
+        policy = CallPolicy(retry=None)
+        configs = json.loads(policy.service_config(SERVICES))["methodConfig"]
+
+        expect(policy.retry).is_(None)
+        expect(any("retryPolicy" in c for c in configs)).is_(False)
+
+    def when_retrying_idempotent_calls(client, pipeline_servicer, expect):
+        pipeline_servicer.hub_stats_failures = 2
+        resp = client().get_hub_stats()
+
+        expect(resp.number_of_public_pipelines) == 3
+        expect(pipeline_servicer.hub_stats_calls) == 3
+
+    def when_not_retrying_triggers(client, pipeline_servicer, expect):
+        with pytest.raises(grpc.RpcError) as e:
+            raising(client().trigger)("ns", "pipe", [{"text": "unavailable"}])
+
+        expect(e.value.code()) == grpc.StatusCode.UNAVAILABLE
+        expect(pipeline_servicer.batch_sizes) == [1]
+
+    def when_deadline_exceeded(client, expect):
+        policy = CallPolicy(method_timeouts={"TriggerNamespacePipeline": 0.1})
+        with pytest.raises(grpc.RpcError) as e:
+            raising(client(policy).trigger)("ns", "pipe", [{"text": "straggler"}])
+
+        expect(e.value.code()) == grpc.StatusCode.DEADLINE_EXCEEDED
+
+    def when_hedging(client, pipeline_servicer, expect):
+        policy = CallPolicy(hedging=HedgingPolicy(hedging_delay=0.05))
+        start = time.monotonic()
+        resp = client(policy).trigger("ns", "pipe", [{"text": "straggler"}])
+
+        expect(resp["outputs"]) == [{"echo": "straggler"}]
+        expect(time.monotonic() - start) < 1
+        expect(pipeline_servicer.batch_sizes) == [1, 1]
+
+    def when_hedging_a_fast_call(client, pipeline_servicer, expect):
+        policy = CallPolicy(hedging=HedgingPolicy(hedging_delay=1))
+        client(policy).trigger("ns", "pipe", [{"text": "hi"}])
+
+        expect(pipeline_servicer.batch_sizes) == [1]
+
+    def when_hedging_async(pipeline_server, pipeline_servicer, expect):
+        policy = CallPolicy(hedging=HedgingPolicy(hedging_delay=0.05))
+
+        async def run():
+            async with AsyncPipelineClient(
+                "", url=pipeline_server, secure=False, call_policy=policy
+            ) as client:
+                return await client.trigger("ns", "pipe", [{"text": "straggler"}])
+
+        start = time.monotonic()
+        resp = asyncio.run(run())
+
+        expect(resp["outputs"]) == [{"echo": "straggler"}]
+        expect(time.monotonic() - start) < 1
+        expect(pipeline_servicer.batch_sizes) == [1, 1]
+
+    def when_compressing(expect):
+        sent = []
+        compressed = CompressedCall(
+            lambda request, **kwargs: sent.append(kwargs["compression"]),
+            grpc.Compression.Gzip,
+            threshold=100,
+        )
+        compressed(pipeline_interface.TriggerNamespacePipelineRequest(pipeline_id="p"))
+        compressed(
+            pipeline_interface.TriggerNamespacePipelineRequest(pipeline_id="p" * 100)
+        )
+        compressed(
+            pipeline_interface.TriggerNamespacePipelineRequest(),
+            compression=grpc.Compression.Deflate,
+        )
+
+        expect(sent) == [
+            grpc.Compression.NoCompression,
+            grpc.Compression.Gzip,
+            grpc.Compression.Deflate,
+        ]
+
+    def when_triggering_compressed(client, expect):
+        policy = CallPolicy(
+            compression=grpc.Compression.Gzip,
+            compression_threshold=0,
+            hedging=HedgingPolicy(),
+        )
+        c = client(policy)
+        data = [{"text": "x" * 10000}]
+
+        expect(c.trigger("ns", "pipe", data)["outputs"]) == [{"echo": "x" * 10000}]
+        resp = c.trigger("ns", "pipe", data, compression=grpc.Compression.Deflate)
+        expect(resp["outputs"]) == [{"echo": "x" * 10000}]
+
+
+def describe_async_client():
+    def when_triggering(pipeline_server, expect):
+        async def run():
+            async with AsyncPipelineClient(
+                "", url=pipeline_server, secure=False
+            ) as client:
+                serving = await client.is_serving()
+                resp = await client.trigger("ns", "pipe", [{"text": "hi"}])
+                return serving, resp
+
+        serving, resp = asyncio.run(run())
+        expect(serving).is_(True)
+        expect(resp["outputs"]) == [{"echo": "hi"}]
+
+    def when_triggering_many(pipeline_server, expect):
+        async def run():
+            async with AsyncPipelineClient(
+                "", url=pipeline_server, secure=False
+            ) as client:
+                return await client.trigger_many(
+                    "ns", "pipe", [[{"text": "a"}], [{"text": "fail"}]]
+                )
+
+        ok, failed = asyncio.run(run())
+        expect(ok.output["outputs"]) == [{"echo": "a"}]
+        expect(failed.error.code()) == grpc.StatusCode.INVALID_ARGUMENT
+
+    def when_streaming(pipeline_server, expect):
+        async def run():
+            async with AsyncPipelineClient(
+                "", url=pipeline_server, secure=False
+            ) as client:
+                chunks = []
+                async with client.stream_trigger(
+                    "ns", "pipe", [{"text": "a"}, {"text": "slow"}]
+                ) as stream:
+                    async for chunk in stream:
+                        chunks.append(chunk)
+                        stream.cancel()
+                return chunks
+
+        expect(asyncio.run(run())) == [{"outputs": [{"echo": "a"}]}]
+
+    def when_run_on_separate_loops(pipeline_server, expect):
+        clients: list = []
+
+        async def run():
+            # left open, so the pool still holds the first loop's channel
+            clients.append(AsyncPipelineClient("", url=pipeline_server, secure=False))
+            return await clients[-1].trigger("ns", "pipe", [{"text": "hi"}])
+
+        expect(asyncio.run(run())["outputs"]) == [{"echo": "hi"}]
+        expect(asyncio.run(run())["outputs"]) == [{"echo": "hi"}]
+        for client in clients:
+            asyncio.run(client.close())
+
+    def when_constructed_outside_the_loop(pipeline_server, expect):
+        client: Any = AsyncPipelineClient("", url=pipeline_server, secure=False)
+
+        async def run():
+            return await client.trigger("ns", "pipe", [{"text": "hi"}])
+
+        expect(asyncio.run(run())["outputs"]) == [{"echo": "hi"}]
+        expect(asyncio.run(run())["outputs"]) == [{"echo": "hi"}]
+        asyncio.run(client.close())
+
+    def when_not_serving():
+        async def run():
+            async with AsyncPipelineClient("", url="localhost:1", secure=False) as c:
+                await c.trigger("ns", "pipe", [{"text": "hi"}])
+
+        with pytest.raises(NotServingException):
+            asyncio.run(run())
+
+
+def describe_prepared_trigger():
+    @pytest.fixture
+    def client(pipeline_server):
+        client = PipelineClient(
+            "", lookup_func=lambda _: "", url=pipeline_server, secure=False
+        )
+        yield client
+        client.close()
+
+    def when_building_requests(expect):
+        inputs = [{"text": "a", "n": 1, "ok": True, "nested": {"x": [1.5, "y"]}}]
+
+        request = (
+            PipelineClient("", mock).prepare_trigger("ns", "pipe").build_request(inputs)
+        )
+        expected = pipeline_interface.TriggerNamespacePipelineRequest(
+            namespace_id="ns", pipeline_id="pipe"
+        )
+        expected.data.add().variable.update(inputs[0])
+        expect(request) == expected
+
+        request = (
+            ModelClient("", mock).prepare_trigger("ns", "m", "v1").build_request(inputs)
+        )
+        expected = model_interface.TriggerNamespaceModelRequest(
+            namespace_id="ns", model_id="m", version="v1"
+        )
+        expected.task_inputs.add().update(inputs[0])
+        expect(request) == expected
+
+    def when_triggering(client, pipeline_servicer, expect):
+        prepared = client.prepare_trigger("ns", "pipe")
+        first = prepared.trigger([{"text": "a"}])
+        client.metadata = [("instill-requester-uid", "uid-alice")]
+        second = prepared.trigger([{"text": "b"}, {"text": "c"}])
+
+        expect(first) == {"outputs": [{"echo": "a"}]}
+        expect(second) == {"outputs": [{"echo": "b"}, {"echo": "c"}]}
+        expect(pipeline_servicer.requesters) == [None, "uid-alice"]
+
+    def when_triggering_async(pipeline_server, expect):
+        async def run():
+            async with AsyncPipelineClient(
+                "", url=pipeline_server, secure=False
+            ) as client:
+                prepared = client.prepare_trigger("ns", "pipe")
+                return [await prepared.trigger([{"text": t}]) for t in "ab"]
+
+        expect(asyncio.run(run())) == [
+            {"outputs": [{"echo": "a"}]},
+            {"outputs": [{"echo": "b"}]},
+        ]
+
+
+def describe_trigger_many():
+    @pytest.fixture
+    def client(pipeline_server):
+        client = PipelineClient(
+            "", lookup_func=lambda _: "", url=pipeline_server, secure=False
+        )
+        yield client
+        client.close()
+
+    def when_ordered(client, expect):
+        inputs = [[{"text": str(i)}] for i in range(10)]
+        results = list(client.trigger_many("ns", "pipe", inputs, concurrency=3))
+
+        expect([r.index for r in results]) == list(range(10))
+        expect([r.output["outputs"] for r in results]) == [
+            [{"echo": str(i)}] for i in range(10)
+        ]
+
+    def when_as_completed(client, expect):
+        inputs = [[{"text": str(i)}] for i in range(5)]
+        results = client.trigger_many("ns", "pipe", inputs, ordered=False)
+
+        expect(sorted(r.index for r in results)) == list(range(5))
+
+    def when_an_item_fails(client, expect):
+        inputs = [[{"text": "a"}], [{"text": "fail"}], [{"text": "b"}]]
+        results = list(client.trigger_many("ns", "pipe", inputs))
+
+        expect([r.ok for r in results]) == [True, False, True]
+        expect(results[1].error.code()) == grpc.StatusCode.INVALID_ARGUMENT
+        expect(results[1].inputs) == [{"text": "fail"}]
+
+
+def describe_stream_trigger():
+    @pytest.fixture
+    def client(pipeline_server):
+        client = PipelineClient(
+            "", lookup_func=lambda _: "", url=pipeline_server, secure=False
+        )
+        yield client
+        client.close()
+
+    def when_consumed(client, expect):
+        with client.stream_trigger("ns", "pipe", [{"text": "a"}, {"text": "b"}]) as s:
+            chunks = list(s)
+
+        expect(chunks) == [
+            {"outputs": [{"echo": "a"}]},
+            {"outputs": [{"echo": "b"}]},
+        ]
+
+    def when_cancelled(client, expect):
+        stream = client.stream_trigger("ns", "pipe", [{"text": "a"}, {"text": "slow"}])
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk)
+            stream.cancel()
+
+        expect(chunks) == [{"outputs": [{"echo": "a"}]}]
+
+    def when_deadline_exceeded(client, expect):
+        stream = client.stream_trigger("ns", "pipe", [{"text": "slow"}], timeout=0.1)
+        with pytest.raises(grpc.RpcError) as e:
+            list(stream)
+        expect(e.value.code()) == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+class _ArtifactServicer(artifact_service.ArtifactPublicServiceServicer):
+    def __init__(self, upload_url: str) -> None:
+        self.upload_url = upload_url
+        self.uploaded_files: List[artifact_interface.File] = []
+        self.processed_batches: List[List[str]] = []
+        self.failing_uploads: Set[str] = set()
+        self.failing_processing = False
+
+    def Readiness(
+        self,
+        request: artifact_interface.ReadinessRequest,
+        context: grpc.ServicerContext,
+    ) -> artifact_interface.ReadinessResponse:
+        return artifact_interface.ReadinessResponse(
+            health_check_response=healthcheck.HealthCheckResponse(
+                status=healthcheck.HealthCheckResponse.SERVING_STATUS_SERVING
+            )
+        )
+
+    def GetObjectUploadURL(
+        self,
+        request: object_interface.GetObjectUploadURLRequest,
+        context: grpc.ServicerContext,
+    ) -> object_interface.GetObjectUploadURLResponse:
+        return object_interface.GetObjectUploadURLResponse(
+            upload_url=self.upload_url,
+            object=object_interface.Object(uid=f"obj-{request.object_name}"),
+        )
+
+    def UploadCatalogFile(
+        self,
+        request: artifact_interface.UploadCatalogFileRequest,
+        context: grpc.ServicerContext,
+    ) -> artifact_interface.UploadCatalogFileResponse:
+        if request.file.name in self.failing_uploads:
+            context.abort(grpc.StatusCode.INTERNAL, "upload failed")
+        self.uploaded_files.append(request.file)
+        file = artifact_interface.File()
+        file.CopyFrom(request.file)
+        file.file_uid = f"uid-{request.file.name}"
+        return artifact_interface.UploadCatalogFileResponse(file=file)
+
+    def ProcessCatalogFiles(
+        self,
+        request: artifact_interface.ProcessCatalogFilesRequest,
+        context: grpc.ServicerContext,
+    ) -> artifact_interface.ProcessCatalogFilesResponse:
+        if self.failing_processing:
+            context.abort(grpc.StatusCode.INTERNAL, "processing failed")
+        self.processed_batches.append(list(request.file_uids))
+        return artifact_interface.ProcessCatalogFilesResponse()
+
+
+class _ObjectStoreHandler(http.server.BaseHTTPRequestHandler):
+    objects: dict = {}
+
+    def do_PUT(self):
+        length = int(self.headers["Content-Length"])
+        self.objects[self.path] = self.rfile.read(length)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def object_store():
+    _ObjectStoreHandler.objects = {}
+    server = http.server.HTTPServer(("localhost", 0), _ObjectStoreHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def artifact_servicer(object_store):
+    # see pipeline_servicer for why the abstract check is silenced
+    return _ArtifactServicer(f"{object_store}/bucket/upload")  # type: ignore[abstract]
+
+
+@pytest.fixture
+def artifact_client(artifact_servicer):
+    server = grpc.server(ThreadPoolExecutor(max_workers=4))
+    artifact_service.add_ArtifactPublicServiceServicer_to_server(
+        artifact_servicer, server
+    )
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    client = ArtifactClient(
+        "", lookup_func=lambda _: "", url=f"localhost:{port}", secure=False
+    )
+    yield client
+    client.close()
+    server.stop(None)
+
+
+def describe_upload_catalog_file_chunked():
+    def when_uploading(artifact_client, artifact_servicer, tmp_path, expect):
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"hello world" * 1000)
+
+        resp = artifact_client.upload_catalog_file_chunked(
+            "ns", "catalog", str(path), chunk_size=1024
+        )
+
+        expect(_ObjectStoreHandler.objects["/bucket/upload"]) == path.read_bytes()
+        expect(resp.file.object_uid) == "obj-notes.txt"
+        expect(resp.file.content) == ""
+        expect(artifact_servicer.uploaded_files[0].name) == "notes.txt"
+
+
+def describe_upload_directory():
+    @pytest.fixture
+    def corpus(tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "a.txt").write_text("alpha")
+        (tmp_path / "b.md").write_text("# beta")
+        (tmp_path / "sub" / "c.txt").write_text("gamma")
+        (tmp_path / "sub" / "copy-of-a.txt").write_text("alpha")
+        (tmp_path / "script.py").write_text("print()")
+        return tmp_path
+
+    def when_uploading(artifact_client, artifact_servicer, corpus, expect):
+        summary = artifact_client.upload_directory(
+            "ns", "catalog", str(corpus), workers=2, process_batch_size=2
+        )
+
+        expect(sorted(summary["uploaded"] + summary["skipped"])) == [
+            "a.txt",
+            "b.md",
+            "sub/c.txt",
+            "sub/copy-of-a.txt",
+        ]
+        expect(len(summary["skipped"])) == 1
+        expect(summary["unsupported"]) == ["script.py"]
+        expect(summary["failed"]) == {}
+        expect(len(artifact_servicer.uploaded_files)) == 3
+        expect([len(b) for b in artifact_servicer.processed_batches]) == [2, 1]
+        expect((corpus / ".instill-manifest.json").exists()).is_(True)
+
+    def when_reuploading(artifact_client, artifact_servicer, corpus, expect):
+        artifact_client.upload_directory("ns", "catalog", str(corpus))
+        (corpus / "d.txt").write_text("delta")
+        summary = artifact_client.upload_directory("ns", "catalog", str(corpus))
+
+        expect(summary["uploaded"]) == ["d.txt"]
+        expect(len(summary["skipped"])) == 4
+        expect(len(artifact_servicer.uploaded_files)) == 4
+
+    def when_names_collide(artifact_client, artifact_servicer, corpus, expect):
+        (corpus / "other").mkdir()
+        (corpus / "other" / "c.txt").write_text("another gamma")
+        artifact_client.upload_directory("ns", "catalog", str(corpus), workers=1)
+
+        expect(sorted(f.name for f in artifact_servicer.uploaded_files)) == [
+            "a.txt",
+            "b.md",
+            "other/c.txt",
+            "sub/c.txt",
+        ]
+
+    def when_an_upload_fails(artifact_client, artifact_servicer, corpus, expect):
+        artifact_servicer.failing_uploads = {"a.txt"}
+        summary = artifact_client.upload_directory(
+            "ns", "catalog", str(corpus), workers=1
+        )
+
+        expect(list(summary["failed"])) == ["a.txt"]
+        expect(summary["uploaded"]) == ["b.md", "sub/c.txt", "sub/copy-of-a.txt"]
+        expect(summary["skipped"]) == []
+
+    def when_processing_fails(artifact_client, artifact_servicer, corpus, expect):
+        # one worker, so a.txt rather than its copy is uploaded both times
+        artifact_servicer.failing_processing = True
+        summary = artifact_client.upload_directory(
+            "ns", "catalog", str(corpus), workers=1
+        )
+        expect(sorted(summary["failed"])) == ["a.txt", "b.md", "sub/c.txt"]
+        expect(summary["file_uids"]) == []
+
+        artifact_servicer.failing_processing = False
+        summary = artifact_client.upload_directory(
+            "ns", "catalog", str(corpus), workers=1
+        )
+        expect(sorted(summary["uploaded"])) == ["a.txt", "b.md", "sub/c.txt"]
+        expect(len(summary["file_uids"])) == 3
+
+
+def describe_operation_waiter():
+    @pytest.fixture
+    def client(pipeline_server):
+        client = PipelineClient(
+            "", lookup_func=lambda _: "", url=pipeline_server, secure=False
+        )
+        yield client
+        client.close()
+
+    @pytest.fixture
+    def waiter(client):
+        with OperationWaiter(client, initial_interval=0.01, jitter=0.1) as waiter:
+            yield waiter
+
+    def when_waiting(waiter, pipeline_servicer, expect):
+        operations = waiter.wait(["1-ok", "3-ok", "2-ok"], timeout=5)
+
+        expect([op.name for op in operations]) == ["1-ok", "3-ok", "2-ok"]
+        expect(pipeline_servicer.operation_polls) == {"1-ok": 1, "2-ok": 2, "3-ok": 3}
+        expect(len(waiter)) == 0
+
+    def when_iterating_as_completed(waiter, expect):
+        for name in ["4-ok", "1-ok"]:
+            waiter.add(name)
+        names = [f.result().name for f in waiter.as_completed(timeout=5)]
+
+        expect(names) == ["1-ok", "4-ok"]
+
+    def when_operation_fails(waiter):
+        future = waiter.add("1-fail")
+        with pytest.raises(OperationError):
+            future.result(timeout=5)
+
+    def when_a_poll_hangs(client, pipeline_servicer, expect):
+        with OperationWaiter(client, initial_interval=0.01, poll_timeout=0.2) as w:
+            operations = w.wait(["2-hang", "1-ok"], timeout=2)
+
+        expect([op.name for op in operations]) == ["2-hang", "1-ok"]
+        expect(pipeline_servicer.operation_polls["2-hang"]) == 2
+
+    def when_already_done(waiter, pipeline_servicer, expect):
+        done = operations_pb2.Operation(name="0-ok", done=True)
+        expect(waiter.add(done).result(timeout=0)) == done
+        expect(pipeline_servicer.operation_polls) == {}
+
+
+def _pipeline(pipeline_id: str) -> pipeline_interface.Pipeline:
+    return pipeline_interface.Pipeline(id=pipeline_id)
+
+
+def describe_paginator():
+    def when_paging_by_token(expect):
+        pages = {
+            "": pipeline_interface.ListNamespacePipelinesResponse(
+                pipelines=[_pipeline("a"), _pipeline("b")], next_page_token="t1"
+            ),
+            "t1": pipeline_interface.ListNamespacePipelinesResponse(
+                pipelines=[_pipeline("c")]
+            ),
+        }
+        fetched = []
+
+        def fetch(token):
+            fetched.append(token)
+            return pages[token]
+
+        items = paginate_by_token(fetch, "pipelines")
+        expect(fetched) == []
+        expect([p.id for p in items]) == ["a", "b", "c"]
+        expect(fetched) == ["", "t1"]
+
+    def when_paging_by_number(expect):
+        fetched = []
+
+        def fetch(page):
+            fetched.append(page)
+            runs = [
+                pipeline_interface.PipelineRun(pipeline_run_uid=f"{page}-{i}")
+                for i in range(2)
+            ]
+            return pipeline_interface.ListPipelineRunsResponse(
+                pipeline_runs=runs[: 5 - 2 * page], total_size=5, page_size=2, page=page
+            )
+
+        uids = [r.pipeline_run_uid for r in paginate_by_page(fetch, "pipeline_runs")]
+        expect(uids) == ["0-0", "0-1", "1-0", "1-1", "2-0"]
+        expect(fetched) == [0, 1, 2]  # page 2 reaches total_size
+
+    def when_prefetching(expect):
+        next_page_requested = threading.Event()
+
+        def fetch(token):
+            if token:
+                next_page_requested.set()
+                return pipeline_interface.ListNamespacePipelinesResponse()
+            return pipeline_interface.ListNamespacePipelinesResponse(
+                pipelines=[_pipeline("a")], next_page_token="t1"
+            )
+
+        items = paginate_by_token(fetch, "pipelines")
+        next(items)
+        expect(next_page_requested.wait(timeout=5)).is_(True)
+
+    def when_not_prefetching(expect):
+        fetched = []
+
+        def fetch(token):
+            fetched.append(token)
+            return pipeline_interface.ListNamespacePipelinesResponse(
+                pipelines=[_pipeline(token)], next_page_token="" if token else "t1"
+            )
+
+        items = paginate_by_token(fetch, "pipelines", prefetch=False)
+        next(items)
+        expect(fetched) == [""]
+
+
+def describe_pipeline_batcher():
+    @pytest.fixture
+    def client(pipeline_server):
+        client = PipelineClient(
+            "", lookup_func=lambda _: "", url=pipeline_server, secure=False
+        )
+        yield client
+        client.close()
+
+    def when_submitting_concurrently(client, pipeline_servicer, expect):
+        with PipelineBatcher(client, max_batch_size=4, max_wait_ms=50) as batcher:
+            futures = [batcher.submit("ns", "pipe", {"text": str(i)}) for i in range(8)]
+            results = [f.result(timeout=5) for f in futures]
+
+        expect(results) == [{"outputs": [{"echo": str(i)}]} for i in range(8)]
+        expect(pipeline_servicer.batch_sizes) == [4, 4]
+
+    def when_waiting_past_max_wait(client, pipeline_servicer, expect):
+        with PipelineBatcher(client, max_batch_size=32, max_wait_ms=1) as batcher:
+            resp = batcher.trigger("ns", "pipe", {"text": "hi"}, timeout=5)
+
+        expect(resp) == {"outputs": [{"echo": "hi"}]}
+        expect(pipeline_servicer.batch_sizes) == [1]
+
+    def when_not_serving(client, pipeline_servicer, expect):
+        client.health = HealthCache(lambda: False)
+        with PipelineBatcher(client, max_wait_ms=1) as batcher:
+            future = batcher.submit("ns", "pipe", {"text": "hi"})
+            with pytest.raises(NotServingException):
+                future.result(timeout=5)
+
+        expect(pipeline_servicer.batch_sizes) == []
+
+    def when_closed(client):
+        batcher = PipelineBatcher(client)
+        batcher.close()
+        with pytest.raises(RuntimeError):
+            batcher.submit("ns", "pipe", {"text": "hi"})
+
+
+class _MgmtServicer(mgmt_service.MgmtPublicServiceServicer):
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, str]] = []
+
+    def CheckNamespace(
+        self,
+        request: mgmt_interface.CheckNamespaceRequest,
+        context: grpc.ServicerContext,
+    ) -> mgmt_interface.CheckNamespaceResponse:
+        self.calls.append(("CheckNamespace", request.id))
+        return mgmt_interface.CheckNamespaceResponse(
+            type=mgmt_interface.CheckNamespaceResponse.NAMESPACE_USER
+        )
+
+    def GetUser(
+        self,
+        request: mgmt_interface.GetUserRequest,
+        context: grpc.ServicerContext,
+    ) -> mgmt_interface.GetUserResponse:
+        self.calls.append(("GetUser", request.user_id))
+        return mgmt_interface.GetUserResponse(
+            user=mgmt_interface.User(uid=f"uid-{request.user_id}")
+        )
+
+
+def describe_namespace_cache():
+    @pytest.fixture
+    def mgmt_servicer():
+        # see pipeline_servicer for why the abstract check is silenced
+        return _MgmtServicer()  # type: ignore[abstract]
+
+    @pytest.fixture
+    def mgmt_server(mgmt_servicer):
+        server = grpc.server(ThreadPoolExecutor(max_workers=4))
+        mgmt_service.add_MgmtPublicServiceServicer_to_server(mgmt_servicer, server)
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        yield f"localhost:{port}"
+        server.stop(None)
+
+    @pytest.fixture
+    def cache():
+        previous = get_namespace_cache()
+        cache = NamespaceCache()
+        set_namespace_cache(cache)
+        yield cache
+        set_namespace_cache(previous)
+
+    def when_resolving_twice(mgmt_server, mgmt_servicer, cache, expect):
+        for _ in range(2):
+            client = MgmtClient(
+                "",
+                url=mgmt_server,
+                secure=False,
+                requester_id="alice",
+                preflight_check=False,
+            )
+            expect(client.metadata) == [("instill-requester-uid", "uid-alice")]
+            client.close()
+
+        expect(mgmt_servicer.calls) == [
+            ("CheckNamespace", "alice"),
+            ("GetUser", "alice"),
+        ]
+        expect(cache.get(mgmt_server, "alice")) == "uid-alice"
+        expect(cache.get("other:8080", "alice")) is None
+
+    def when_expired(expect):
+        cache = NamespaceCache(ttl=0)
+        lookups = []
+
+        def lookup(namespace):
+            lookups.append(namespace)
+            return "uid"
+
+        for _ in range(2):
+            cache.resolve("host", "alice", lookup)
+
+        expect(lookups) == ["alice", "alice"]
+
+    def when_persisted(tmp_path, expect):
+        path = tmp_path / "namespaces.json"
+        NamespaceCache(path=path).set("host", "alice", "uid-alice")
+
+        reloaded = NamespaceCache(path=path)
+        expect(reloaded.get("host", "alice")) == "uid-alice"
+        reloaded.invalidate("host")
+        expect(NamespaceCache(path=path).get("host", "alice")) is None
@@ -36,6 +36,22 @@ class TestInstillHost:
         assert host.secure is False
         assert host.token == ""
 
+    def test_instill_host_channel_options(self):
+        """Test _InstillHost with channel options."""
+        host = _InstillHost(url="https://test.com", secure=True, token="")
+        assert host.channel_options is None
+
+        host = _InstillHost(
+            url="https://test.com",
+            secure=True,
+            token="",
+            channel_options={"keepalive_time": 60, "lb_policy": "round_robin"},
+        )
+        assert host.channel_options == {
+            "keepalive_time": 60,
+            "lb_policy": "round_robin",
+        }
+
     def test_instill_host_validation(self):
         """Test _InstillHost validation."""
         # Should not raise any exceptions for valid data
@@ -222,6 +238,29 @@ class TestConfiguration:
             assert saved_data["hosts"]["default"]["secure"] is False
             assert saved_data["hosts"]["default"]["token"] == "saved-token"
 
+    def test_configuration_save_channel_options(self):
+        """Test saving a default host with channel options."""
+        with patch("instill.config.CONFIG_DIR", self.config_dir):
+            config = Configuration()
+            config.set_default(
+                "https://saved.com",
+                "saved-token",
+                True,
+                channel_options={"lb_policy": "round_robin"},
+            )
+            config.save()
+
+            with open(self.config_file, "r", encoding="utf-8") as f:
+                saved_data = yaml.load(f, Loader=yaml.FullLoader)
+            assert saved_data["hosts"]["default"]["channel_options"] == {
+                "lb_policy": "round_robin"
+            }
+
+            reloaded = Configuration()
+            assert reloaded.hosts["default"].channel_options == {
+                "lb_policy": "round_robin"
+            }
+
     def test_configuration_save_creates_directory(self):
         """Test that save creates the config directory if it doesn't exist."""
         # Remove the config directory
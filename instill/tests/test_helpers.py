@@ -0,0 +1,727 @@
+"""Unit tests for the instill.helpers serving modules."""
+
+# pylint: disable=unused-argument,redefined-outer-name,no-name-in-module
+import asyncio
+import base64
+import http.server
+import io
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+import pytest
+from google.protobuf import json_format
+from google.protobuf.struct_pb2 import Struct
+from PIL import Image
+from ray.serve import Deployment
+from starlette.requests import Request
+
+from instill.helpers.errors import InvalidInputException, InvalidOutputShapeException
+from instill.helpers.image_cache import ImageCache
+from instill.helpers.image_fetcher import ImageFetcher, set_image_fetcher
+from instill.helpers.model_memory import (
+    estimate_model_memory,
+    kv_cache_bytes,
+    read_gguf_header,
+)
+from instill.helpers.ray_config import (
+    _call_in_buckets,
+    instill_batch,
+    instill_deployment,
+)
+from instill.helpers.ray_io import (
+    construct_task_chat_output,
+    construct_task_detection_output,
+    construct_task_embedding_output,
+    construct_task_keypoint_output,
+    parse_custom_input,
+    parse_task_chat_to_chat_input,
+    parse_task_classification_to_vision_input,
+    parse_task_embedding_to_image_embedding_input,
+    stream_task_output,
+)
+from instill.helpers.struct_codec import StructView, dict_to_struct, struct_to_dict
+from instill.protogen.model.ray.v1alpha.user_defined_pb2 import (
+    CallRequest,
+    CallResponse,
+)
+
+
+def _png_bytes(color: str) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class _ImageHandler(http.server.BaseHTTPRequestHandler):
+    requests_seen: list = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests_seen.append(self.path)
+        if self.path.startswith("/slow"):
+            time.sleep(1)
+        if self.path.startswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+        body = _png_bytes("red")
+        self.send_response(200)
+        if self.path.startswith("/etag"):
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", "no-cache")
+        elif self.path.startswith("/nostore"):
+            self.send_header("Cache-Control", "No-Store")
+        else:
+            self.send_header("Cache-Control", "max-age=60")
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    _ImageHandler.requests_seen = []
+    server = http.server.ThreadingHTTPServer(("localhost", 0), _ImageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = ImageFetcher(max_connections=8, per_host_limit=4)
+    set_image_fetcher(fetcher)
+    yield fetcher
+    set_image_fetcher(ImageFetcher())
+
+
+def _call_request(*data_list) -> CallRequest:
+    request = CallRequest()
+    for data in data_list:
+        task_input = Struct()
+        task_input.update({"data": data})
+        request.task_inputs.append(task_input)
+    return request
+
+
+class TestImageFetcher:
+    """Test cases for ImageFetcher."""
+
+    def test_fetch_all_dedups_urls(self, image_server, fetcher):
+        """Test that each distinct URL is downloaded once."""
+        urls = [f"{image_server}/a.png", f"{image_server}/b.png"] * 3
+        images = asyncio.run(fetcher.fetch_all(urls))
+
+        assert sorted(images) == sorted(set(urls))
+        assert images[urls[0]].size == (4, 4)
+        assert sorted(_ImageHandler.requests_seen) == ["/a.png", "/b.png"]
+
+    def test_fetch_all_runs_concurrently(self, image_server, fetcher):
+        """Test that slow downloads overlap instead of running serially."""
+        urls = [f"{image_server}/slow{i}.png" for i in range(4)]
+        start = time.monotonic()
+        asyncio.run(fetcher.fetch_all(urls))
+
+        assert time.monotonic() - start < 3
+
+    def test_fetch_all_deadline(self, image_server, fetcher):
+        """Test that the batch deadline raises InvalidInputException."""
+        with pytest.raises(InvalidInputException):
+            asyncio.run(fetcher.fetch_all([f"{image_server}/slow.png"], deadline=0.1))
+
+
+class TestImageCache:
+    """Test cases for ImageCache."""
+
+    def test_fresh_entry_is_served_from_memory(self, image_server):
+        """Test that an image within its max-age is not downloaded again."""
+        cache = ImageCache()
+        fetcher = ImageFetcher(cache=cache)
+        first = fetcher.fetch(f"{image_server}/a.png")
+        second = fetcher.fetch(f"{image_server}/a.png")
+
+        assert first is not second
+        assert second.size == (4, 4)
+        assert _ImageHandler.requests_seen == ["/a.png"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_stale_entry_is_revalidated(self, image_server):
+        """Test that a no-cache entry is revalidated with its ETag."""
+        cache = ImageCache()
+        fetcher = ImageFetcher(cache=cache)
+        fetcher.fetch(f"{image_server}/etag.png")
+        image = fetcher.fetch(f"{image_server}/etag.png")
+
+        assert image.size == (4, 4)
+        assert len(_ImageHandler.requests_seen) == 2
+        assert cache.stats()["revalidations"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_no_store_is_not_cached(self, image_server):
+        """Test that no-store responses are not kept, whatever the case."""
+        cache = ImageCache()
+        fetcher = ImageFetcher(cache=cache)
+        fetcher.fetch(f"{image_server}/nostore.png")
+        fetcher.fetch(f"{image_server}/nostore.png")
+
+        assert len(cache) == 0
+        assert _ImageHandler.requests_seen == ["/nostore.png", "/nostore.png"]
+
+    def test_eviction_by_bytes(self, image_server):
+        """Test that the least recently used image is evicted over max_bytes."""
+        cache = ImageCache(max_bytes=60)  # one 4x4 RGB image
+        fetcher = ImageFetcher(cache=cache)
+        fetcher.fetch(f"{image_server}/a.png")
+        fetcher.fetch(f"{image_server}/b.png")
+
+        assert len(cache) == 1
+        assert cache.current_bytes == 48
+        assert cache.stats()["evictions"] == 1
+
+        fetcher.fetch(f"{image_server}/a.png")
+        assert _ImageHandler.requests_seen == ["/a.png", "/b.png", "/a.png"]
+
+
+class TestParseTaskInputs:
+    """Test cases for the parse_task_* helpers."""
+
+    def test_parse_vision_input_from_urls(self, image_server, fetcher):
+        """Test that vision inputs resolve every image URL."""
+        request = _call_request(
+            {"type": "image-url", "image-url": f"{image_server}/a.png"},
+            {"type": "image-url", "image-url": f"{image_server}/b.png"},
+        )
+        inputs = asyncio.run(parse_task_classification_to_vision_input(request))
+
+        assert [inp.image.size for inp in inputs] == [(4, 4), (4, 4)]
+
+    def test_parse_image_embedding_input(self, image_server, fetcher):
+        """Test that repeated image URLs in a request are downloaded once."""
+        request = _call_request(
+            {
+                "embeddings": [
+                    {"type": "image-url", "image-url": f"{image_server}/a.png"},
+                    {"type": "image-url", "image-url": f"{image_server}/a.png"},
+                ]
+            }
+        )
+        inputs = asyncio.run(parse_task_embedding_to_image_embedding_input(request))
+
+        assert len(inputs[0].images) == 2
+        assert _ImageHandler.requests_seen == ["/a.png"]
+
+
+class TestStructCodec:
+    """Test cases for the struct_codec helpers."""
+
+    def test_dict_to_struct_matches_parse_dict(self):
+        """Test that the fast encoder produces the same Struct as ParseDict."""
+        data = {
+            "data": {
+                "objects": [
+                    {"category": "dog", "score": 0.5, "bounding-box": {"top": 1}},
+                ],
+                "empty-list": [],
+                "empty-dict": {},
+                "nested": [[1, 2], [], [{"a": None}], "x", True],
+                "flag": False,
+                "none": None,
+            }
+        }
+        expected = Struct()
+        json_format.ParseDict(data, expected)
+
+        assert dict_to_struct(data) == expected
+
+    def test_dict_to_struct_numpy_values(self):
+        """Test that numpy scalars and arrays are converted to JSON values."""
+        struct_pb = dict_to_struct(
+            {
+                "score": np.float32(0.5),
+                "count": np.int64(3),
+                "ok": np.bool_(True),
+                "vector": np.array([1.0, 2.0]),
+            }
+        )
+
+        assert json_format.MessageToDict(struct_pb) == {
+            "score": 0.5,
+            "count": 3.0,
+            "ok": True,
+            "vector": [1.0, 2.0],
+        }
+
+    def test_dict_to_struct_rejects_unknown_types(self):
+        """Test that unsupported values raise TypeError."""
+        with pytest.raises(TypeError):
+            dict_to_struct({"data": object()})
+
+    def test_construct_detection_output(self):
+        """Test that detection outputs are built directly into the response."""
+        response = construct_task_detection_output(
+            CallRequest(), [["dog"], []], [[0.9], []], [[(1, 2, 3, 4)], []]
+        )
+
+        assert isinstance(response, CallResponse)
+        assert json_format.MessageToDict(response.task_outputs[0]) == {
+            "data": {
+                "objects": [
+                    {
+                        "category": "dog",
+                        "score": 0.9,
+                        "bounding-box": {
+                            "top": 2.0,
+                            "left": 1.0,
+                            "width": 3.0,
+                            "height": 4.0,
+                        },
+                    }
+                ]
+            }
+        }
+        assert json_format.MessageToDict(response.task_outputs[1]) == {
+            "data": {"objects": []}
+        }
+
+    def test_struct_view_reads_lazily(self):
+        """Test that StructView exposes a Struct as nested mappings and lists."""
+        struct_pb = Struct()
+        struct_pb.update(
+            {"data": {"messages": [{"role": "user", "content": [{"text": "hi"}]}]}}
+        )
+        view = StructView(struct_pb)
+
+        assert "data" in view
+        assert "parameter" not in view
+        assert view.get("parameter", {}) == {}
+        messages = view["data"]["messages"]
+        assert len(messages) == 1
+        assert messages[0]["content"][0]["text"] == "hi"
+        assert view == json_format.MessageToDict(struct_pb)
+        assert len(struct_pb.fields) == 1
+        with pytest.raises(KeyError):
+            view["parameter"]  # pylint: disable=pointless-statement
+
+    def test_struct_to_dict_matches_message_to_dict(self):
+        """Test that the fast decoder matches MessageToDict."""
+        struct_pb = dict_to_struct(
+            {"a": [1, "b", None, True, {}, []], "c": {"d": {"e": 2.5}}, "f": False}
+        )
+
+        assert struct_to_dict(struct_pb) == json_format.MessageToDict(struct_pb)
+
+    def test_parse_chat_input(self):
+        """Test that chat inputs are read from the request Structs."""
+        struct_pb = Struct()
+        struct_pb.update(
+            {
+                "data": {
+                    "messages": [{"role": "user", "content": [{"text": "hello"}]}]
+                },
+                "parameter": {"max-tokens": 16, "temperature": 0.5, "stream": 1},
+            }
+        )
+        request = CallRequest(task_inputs=[struct_pb])
+        inputs = asyncio.run(parse_task_chat_to_chat_input(request))
+
+        assert inputs[0].messages[-1] == {"role": "user", "content": "hello"}
+        assert inputs[0].max_tokens == 16
+        assert inputs[0].temperature == 0.5
+        assert inputs[0].stream is True
+        assert inputs[0].seed == 0
+
+    def test_parse_custom_input(self):
+        """Test that custom inputs are returned as plain dicts."""
+        request = _call_request({"prompt": "hi"})
+        inputs = asyncio.run(parse_custom_input(request))
+
+        assert inputs == [{"data": {"prompt": "hi"}}]
+        assert isinstance(inputs[0]["data"], dict)
+
+
+class TestConstructTaskOutputs:
+    """Test cases for the construct_task_* helpers."""
+
+    def test_detection_output_from_arrays(self):
+        """Test that array outputs in xyxy match the equivalent list outputs."""
+        from_lists = construct_task_detection_output(
+            CallRequest(),
+            [["dog", "cat"]],
+            [[0.5, 0.25]],
+            [[(1, 2, 3, 4), (0, 0, 1, 1)]],
+        )
+        from_arrays = construct_task_detection_output(
+            CallRequest(),
+            [np.array(["dog", "cat"])],
+            [np.array([0.5, 0.25], dtype=np.float32)],
+            [np.array([[1, 2, 4, 6], [0, 0, 1, 1]], dtype=np.int32)],
+            bbox_format="xyxy",
+        )
+
+        assert from_arrays == from_lists
+
+    def test_keypoint_output_from_arrays(self):
+        """Test that (N, K, 3) keypoint arrays are converted per object."""
+        response = construct_task_keypoint_output(
+            CallRequest(),
+            [np.arange(12).reshape(2, 2, 3), np.empty((0, 2, 3))],
+            [np.array([0.9, 0.8]), np.empty(0)],
+            [np.zeros((2, 4)), np.empty((0, 4))],
+        )
+
+        assert isinstance(response, CallResponse)
+        outputs = [json_format.MessageToDict(o) for o in response.task_outputs]
+        objects = outputs[0]["data"]["objects"]
+        assert objects[1]["keypoints"] == [
+            {"x": 6.0, "y": 7.0, "v": 8.0},
+            {"x": 9.0, "y": 10.0, "v": 11.0},
+        ]
+        assert objects[1]["score"] == 0.8
+        assert outputs[1] == {"data": {"objects": []}}
+
+    def test_bounding_boxes_with_wrong_shape(self):
+        """Test that boxes not shaped (N, 4) raise InvalidOutputShapeException."""
+        with pytest.raises(InvalidOutputShapeException):
+            construct_task_detection_output(
+                CallRequest(), [["dog"]], [[0.5]], [np.zeros((1, 5))]
+            )
+
+    def test_embedding_output_base64(self):
+        """Test that base64 embeddings round-trip through their dtype."""
+        vectors = np.array([[0.5, -1.0, 0.25], [0.0, 0.0, 0.0]], dtype=np.float32)
+        outputs = construct_task_embedding_output(
+            CallRequest(),
+            [[0, 1], [0, 1]],
+            [[1, 1], [1, 1]],
+            [vectors, vectors],
+            formats=["base64", "float"],
+            dtype="float16",
+        )
+        assert isinstance(outputs, CallResponse)
+        encoded, floats = [json_format.MessageToDict(o) for o in outputs.task_outputs]
+
+        embed = encoded["data"]["embeddings"][0]
+        assert embed["dtype"] == "float16"
+        decoded = np.frombuffer(base64.b64decode(embed["vector"]), dtype="<f2")
+        assert decoded.tolist() == [0.5, -1.0, 0.25]
+        assert floats["data"]["embeddings"][0]["vector"] == [0.5, -1.0, 0.25]
+
+    def test_embedding_output_format_from_request(self):
+        """Test that the format requested by each task input is used by default."""
+        request = CallRequest(
+            task_inputs=[
+                dict_to_struct({"data": {}, "parameter": {"format": "base64"}}),
+                dict_to_struct({"data": {}}),
+            ]
+        )
+        outputs = construct_task_embedding_output(
+            request,
+            [[0], [0]],
+            [[1], [1]],
+            [[[0.5, -1.0]], [[0.5, -1.0]]],
+        )
+        assert isinstance(outputs, CallResponse)
+        encoded, floats = [json_format.MessageToDict(o) for o in outputs.task_outputs]
+
+        embed = encoded["data"]["embeddings"][0]
+        decoded = np.frombuffer(base64.b64decode(embed["vector"]), dtype="<f4")
+        assert decoded.tolist() == [0.5, -1.0]
+        assert floats["data"]["embeddings"][0]["vector"] == [0.5, -1.0]
+
+    def test_embedding_output_int8(self):
+        """Test that int8 embeddings are quantized per vector with a scale."""
+        outputs = construct_task_embedding_output(
+            CallRequest(),
+            [[0, 1]],
+            [[1, 1]],
+            [[[0.5, -1.0, 0.25], [0.0, 0.0, 0.0]]],
+            formats=["base64"],
+            dtype="int8",
+        )
+        assert isinstance(outputs, CallResponse)
+        embeds = json_format.MessageToDict(outputs.task_outputs[0])["data"][
+            "embeddings"
+        ]
+
+        values = np.frombuffer(base64.b64decode(embeds[0]["vector"]), dtype=np.int8)
+        assert values.tolist() == [64, -127, 32]
+        np.testing.assert_allclose(
+            values * embeds[0]["scale"], [0.5, -1.0, 0.25], atol=0.01
+        )
+        assert embeds[1]["scale"] == 1.0
+
+
+class _EchoModel:
+    def __init__(self) -> None:
+        self.batch_sizes: list = []
+
+    async def __call__(self, request):
+        self.batch_sizes.append(len(request.task_inputs))
+        if any(struct_to_dict(t)["data"].get("fail") for t in request.task_inputs):
+            raise InvalidInputException("fail")
+        return CallResponse(task_outputs=list(request.task_inputs))
+
+
+class TestInstillBatch:
+    """Test cases for instill_batch."""
+
+    # The ray.serve.batch handler is not called here: it needs the Serve replica
+    # context, and its queue keeps a handler task on the replica's event loop
+    # that can only be torn down with the replica. The handler only forwards
+    # each batch to _call_in_buckets, so the merging is tested through it.
+    def test_merges_and_splits_requests(self):
+        """Test that task inputs are merged into one call and split back."""
+        model = _EchoModel()
+        requests = [_call_request({"i": 0}, {"i": 1}), _call_request({"i": 2})]
+        responses = asyncio.run(
+            _call_in_buckets(_EchoModel.__call__, model, requests, None)
+        )
+
+        assert model.batch_sizes == [3]
+        assert [
+            [struct_to_dict(o)["data"]["i"] for o in r.task_outputs] for r in responses
+        ] == [[0.0, 1.0], [2.0]]
+
+    def test_buckets_fail_independently(self):
+        """Test that each bucket is a separate call and errors stay in it."""
+        model = _EchoModel()
+        requests = [
+            _call_request({"i": 0}),
+            _call_request({"i": 1, "fail": True}),
+            _call_request({"i": 2}),
+        ]
+        responses = asyncio.run(
+            _call_in_buckets(
+                _EchoModel.__call__,
+                model,
+                requests,
+                lambda r: "fail" in struct_to_dict(r.task_inputs[0])["data"],
+            )
+        )
+
+        assert model.batch_sizes == [2, 1]
+        assert isinstance(responses[1], InvalidInputException)
+        assert len(responses[0].task_outputs) == len(responses[2].task_outputs) == 1
+
+    def test_http_requests_bypass_batching(self):
+        """Test that the decorated call passes HTTP test requests straight through."""
+
+        class Model:
+            @instill_batch(max_batch_size=8)
+            async def __call__(self, request):
+                return request
+
+        request = Request({"type": "http"})
+
+        assert asyncio.run(Model()(request)) is request
+
+    def test_deployment_admits_a_full_batch(self):
+        """Test that batched deployments raise max_ongoing_requests."""
+
+        class Model:
+            @instill_batch(max_batch_size=8)
+            async def __call__(self, request):
+                return request
+
+        deployment = instill_deployment(Model)
+
+        assert isinstance(deployment, Deployment)
+        assert deployment.max_ongoing_requests == 16  # pylint: disable=no-member
+
+
+def _chat_chunks(request, deltas):
+    for i, delta in enumerate(deltas):
+        yield construct_task_chat_output(
+            request,
+            [["stop" if i == len(deltas) - 1 else ""]],
+            [[0]],
+            [[0]],
+            [[{"role": "assistant", "content": delta}]],
+        )
+
+
+class TestStreamTaskOutput:
+    """Test cases for stream_task_output."""
+
+    def test_grpc_stream_yields_call_responses(self):
+        """Test that gRPC requests get one CallResponse per chunk."""
+        request = CallRequest()
+
+        async def collect():
+            return [
+                chunk
+                async for chunk in stream_task_output(
+                    request, _chat_chunks(request, ["Hel", "lo"])
+                )
+            ]
+
+        chunks = asyncio.run(collect())
+        assert [
+            struct_to_dict(c.task_outputs[0])["data"]["choices"][0]["message"][
+                "content"
+            ]
+            for c in chunks
+        ] == ["Hel", "lo"]
+
+    def test_http_stream_is_ndjson(self):
+        """Test that HTTP test requests get newline delimited JSON chunks."""
+        request = Request({"type": "http"})
+        response = stream_task_output(request, _chat_chunks(request, ["Hel", "lo"]))
+
+        async def collect():
+            return [line async for line in response.body_iterator]
+
+        lines = asyncio.run(collect())
+        assert response.media_type == "application/x-ndjson"
+        assert [
+            json.loads(line)[0]["data"]["choices"][0]["finish-reason"] for line in lines
+        ] == ["", "stop"]
+
+
+def _write_safetensors(path, tensors):
+    header: dict = {"__metadata__": {"format": "pt"}}
+    offset = 0
+    for name, (dtype, nbytes) in tensors.items():
+        header[name] = {
+            "dtype": dtype,
+            "shape": [nbytes],
+            "data_offsets": [offset, offset + nbytes],
+        }
+        offset += nbytes
+    header_bytes = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(header_bytes)) + header_bytes + bytes(offset))
+
+
+def _gguf_string(value: bytes) -> bytes:
+    return struct.pack("<Q", len(value)) + value
+
+
+def _write_gguf(path, tensors):
+    kvs = [
+        _gguf_string(b"general.alignment") + struct.pack("<II", 4, 64),
+        _gguf_string(b"tokenizer.ggml.tokens")
+        + struct.pack("<IIQ", 9, 8, 2)
+        + _gguf_string(b"a")
+        + _gguf_string(b"b"),
+        _gguf_string(b"tokenizer.ggml.scores")
+        + struct.pack("<IIQ", 9, 6, 2)
+        + bytes(8),
+    ]
+    infos, offset = [], 0
+    for name, (ggml_type, nbytes) in tensors.items():
+        infos.append(
+            _gguf_string(name.encode())
+            + struct.pack("<IQIQ", 1, nbytes, ggml_type, offset)
+        )
+        offset += nbytes
+    header = (
+        b"GGUF" + struct.pack("<IQQ", 3, len(tensors), len(kvs)) + b"".join(kvs + infos)
+    )
+    padding = -len(header) % 64
+    with open(path, "wb") as f:
+        f.write(header + bytes(padding) + bytes(offset))
+
+
+class TestModelMemory:
+    """Test cases for the model_memory estimator."""
+
+    def test_safetensors_shards(self, tmp_path):
+        """Test that safetensors weights are summed per dtype from headers."""
+        _write_safetensors(
+            tmp_path / "model-1.safetensors", {"a": ("BF16", 64), "b": ("F32", 16)}
+        )
+        _write_safetensors(tmp_path / "model-2.safetensors", {"c": ("BF16", 32)})
+        (tmp_path / "pytorch_model.bin").write_bytes(bytes(1000))
+        (tmp_path / "tokenizer.json").write_bytes(bytes(1000))
+
+        estimate = estimate_model_memory(str(tmp_path))
+
+        assert estimate is not None
+        assert estimate.weight_bytes_by_dtype == {"BF16": 96, "F32": 16}
+        assert estimate.kv_cache_bytes == 0
+
+    def test_gguf_header(self, tmp_path):
+        """Test that GGUF tensor sizes come from their data offsets."""
+        path = tmp_path / "model.gguf"
+        _write_gguf(path, {"a": (12, 144), "b": (0, 32), "c": (12, 288)})
+
+        assert read_gguf_header(str(path)) == {"Q4_K": 432, "F32": 32}
+
+    def test_pytorch_index_and_kv_cache(self, tmp_path):
+        """Test the index total size and the KV cache from config.json."""
+        (tmp_path / "pytorch_model.bin.index.json").write_text(
+            json.dumps({"metadata": {"total_size": 1000}, "weight_map": {}})
+        )
+        (tmp_path / "config.json").write_text(
+            json.dumps(
+                {
+                    "num_hidden_layers": 2,
+                    "num_attention_heads": 8,
+                    "num_key_value_heads": 2,
+                    "hidden_size": 64,
+                    "max_position_embeddings": 100,
+                    "torch_dtype": "bfloat16",
+                }
+            )
+        )
+
+        estimate = estimate_model_memory(str(tmp_path), kv_cache_tokens=4096)
+
+        assert estimate is not None
+        assert estimate.weight_bytes == 1000
+        # k and v, 2 layers, 2 kv heads, head dim 8, capped at 100 tokens, 2 bytes
+        assert estimate.kv_cache_bytes == 2 * 2 * 2 * 8 * 100 * 2
+        assert estimate.total_bytes == 1000 + estimate.kv_cache_bytes
+
+    def test_cache_follows_mtime(self, tmp_path):
+        """Test that a rewritten weight file is read again."""
+        path = tmp_path / "model.safetensors"
+        _write_safetensors(path, {"a": ("F16", 8)})
+        estimate = estimate_model_memory(str(tmp_path))
+        assert estimate is not None
+        assert estimate.weight_bytes == 8
+
+        _write_safetensors(path, {"a": ("F16", 8), "b": ("F16", 8)})
+        os.utime(path, ns=(1, 1))
+        estimate = estimate_model_memory(str(tmp_path))
+        assert estimate is not None
+        assert estimate.weight_bytes == 16
+
+    def test_pytorch_checkpoint_ignores_training_state(self, tmp_path):
+        """Test that optimizer and training files are not counted as weights."""
+        (tmp_path / "pytorch_model.bin").write_bytes(bytes(100))
+        (tmp_path / "optimizer.pt").write_bytes(bytes(200))
+        (tmp_path / "training_args.bin").write_bytes(bytes(10))
+
+        estimate = estimate_model_memory(str(tmp_path))
+
+        assert estimate is not None
+        assert estimate.weight_bytes == 100
+
+    def test_kv_cache_config_keys(self):
+        """Test GPT-2 style config keys and configs without a hidden size."""
+        gpt2 = {"n_layer": 2, "n_head": 4, "n_embd": 32, "n_positions": 10}
+        # k and v, 2 layers, 4 heads, head dim 8, capped at 10 tokens, 2 bytes
+        assert kv_cache_bytes(gpt2, 100) == 2 * 2 * 4 * 8 * 10 * 2
+        assert (
+            kv_cache_bytes({"num_hidden_layers": 2, "num_attention_heads": 4}, 10) == 0
+        )
+
+    def test_no_weights(self, tmp_path):
+        """Test that a directory without weight files has no estimate."""
+        (tmp_path / "README.md").write_text("hi")
+
+        assert estimate_model_memory(str(tmp_path)) is None
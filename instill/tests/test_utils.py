@@ -4,6 +4,7 @@
 import logging
 import os
 import tempfile
+import threading
 from unittest.mock import MagicMock, patch
 
 import grpc
@@ -13,9 +14,11 @@ from instill.utils.error_handler import (
     NamespaceException,
     NotServingException,
     grpc_handler,
+    raising,
 )
+from instill.utils.health_cache import HealthCache
 from instill.utils.logger import Logger
-from instill.utils.process_file import get_file_type, process_file
+from instill.utils.process_file import ChunkedFileReader, get_file_type, process_file
 
 
 class TestLogger:
@@ -320,6 +323,144 @@ class TestErrorHandler:
         mock_exit.assert_called_once_with(1)
 
 
+class TestHealthCache:
+    """Test cases for the HealthCache class."""
+
+    def test_health_cache_reuses_fresh_status(self):
+        """Test that a fresh status is served without probing again."""
+        probe = MagicMock(return_value=True)
+        cache = HealthCache(probe, ttl=60)
+
+        assert cache.is_serving() is True
+        assert cache.is_serving() is True
+        probe.assert_called_once()
+
+    def test_health_cache_reprobes_unhealthy_status(self):
+        """Test that a stale unhealthy status is probed synchronously."""
+        probe = MagicMock(side_effect=[False, True])
+        cache = HealthCache(probe, ttl=0)
+
+        assert cache.is_serving() is False
+        assert cache.is_serving() is True
+        assert probe.call_count == 2
+
+    def test_health_cache_does_not_cache_unhealthy_status(self):
+        """Test that an unhealthy status is probed again within the TTL."""
+        probe = MagicMock(side_effect=[False, True, True])
+        cache = HealthCache(probe, ttl=30)
+
+        assert cache.is_serving() is False
+        assert cache.is_serving() is True
+        assert cache.is_serving() is True
+        assert probe.call_count == 2
+
+    def test_health_cache_reprobes_seeded_unhealthy_status(self):
+        """Test that a status set to unhealthy is probed on the next check."""
+        probe = MagicMock(return_value=True)
+        cache = HealthCache(probe, ttl=30)
+        cache.set(False)
+
+        assert cache.is_serving() is True
+        probe.assert_called_once()
+
+    def test_health_cache_refreshes_stale_healthy_status_in_background(self):
+        """Test that a stale healthy status is returned while refreshing."""
+        refreshed = threading.Event()
+
+        def probe():
+            refreshed.set()
+            return True
+
+        cache = HealthCache(probe, ttl=0)
+        cache.set(True)
+
+        assert cache.is_serving() is True
+        assert refreshed.wait(timeout=5)
+
+    def test_health_cache_probe_exception(self):
+        """Test that a failing probe is reported as not serving."""
+        cache = HealthCache(MagicMock(side_effect=RuntimeError), ttl=60)
+        assert cache.is_serving() is False
+
+    def test_health_cache_disabled(self):
+        """Test that a disabled cache skips the probe entirely."""
+        probe = MagicMock(return_value=False)
+        cache = HealthCache(probe, enabled=False)
+
+        assert cache.is_serving() is True
+        probe.assert_not_called()
+
+    @patch("instill.utils.error_handler.Logger")
+    @patch("os._exit")
+    def test_grpc_handler_uses_health_cache(self, mock_exit, mock_logger):
+        """Test grpc_handler consults the client health cache."""
+        probe = MagicMock(return_value=True)
+        mock_obj = MagicMock()
+        mock_obj.health = HealthCache(probe, ttl=60)
+
+        decorated_func = grpc_handler(lambda obj: "success")
+
+        assert decorated_func(mock_obj) == "success"
+        assert decorated_func(mock_obj) == "success"
+        probe.assert_called_once()
+        mock_obj.is_serving.assert_not_called()
+
+    @patch("instill.utils.error_handler.Logger")
+    @patch("os._exit")
+    def test_grpc_handler_invalidates_health_cache(self, mock_exit, mock_logger):
+        """Test grpc_handler invalidates the health cache on UNAVAILABLE."""
+
+        class MockRpcError(grpc.RpcError):
+            def code(self):
+                return grpc.StatusCode.UNAVAILABLE
+
+            def details(self):
+                return "Service unavailable"
+
+        def test_func(obj):
+            raise MockRpcError()
+
+        probe = MagicMock(return_value=True)
+        mock_obj = MagicMock()
+        mock_obj.health = HealthCache(probe, ttl=60)
+
+        grpc_handler(test_func)(mock_obj, silent=True)
+        grpc_handler(test_func)(mock_obj, silent=True)
+        assert probe.call_count == 2
+
+    @patch("os._exit")
+    def test_raising_grpc_handler_raises_rpc_errors(self, mock_exit):
+        """Test that raising() re-raises RPC errors instead of exiting."""
+
+        class MockRpcError(grpc.RpcError):
+            def code(self):
+                return grpc.StatusCode.UNAVAILABLE
+
+        def test_func(obj):
+            raise MockRpcError()
+
+        probe = MagicMock(return_value=True)
+        mock_obj = MagicMock()
+        mock_obj.health = HealthCache(probe, ttl=60)
+
+        with pytest.raises(MockRpcError):
+            raising(grpc_handler(test_func))(mock_obj)
+        with pytest.raises(MockRpcError):
+            raising(grpc_handler(test_func))(mock_obj)
+        assert probe.call_count == 2
+        mock_exit.assert_not_called()
+
+    @patch("os._exit")
+    def test_raising_grpc_handler_raises_not_serving(self, mock_exit):
+        """Test that raising() raises NotServingException instead of exiting."""
+        mock_obj = MagicMock()
+        mock_obj.health = HealthCache(MagicMock(return_value=False), ttl=60)
+
+        with pytest.raises(NotServingException):
+            raising(grpc_handler(lambda obj: "success"))(mock_obj)
+        mock_exit.assert_not_called()
+
+
 class TestProcessFile:
     """Test cases for file processing utilities."""
 
@@ -510,6 +651,18 @@ class TestProcessFile:
                 # Clean up
                 os.unlink(temp_file.name)
 
+    def test_chunked_file_reader(self):
+        """Test ChunkedFileReader never returns more than chunk_size bytes."""
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(b"x" * 10)
+
+        with ChunkedFileReader(temp_file.name, chunk_size=4) as reader:
+            assert len(reader) == 10
+            chunks = [reader.read(8192), reader.read(), reader.read(1), reader.read()]
+        assert chunks == [b"xxxx", b"xxxx", b"x", b"x"]
+
+        os.unlink(temp_file.name)
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,8 +1,10 @@
 # pylint: disable=inconsistent-return-statements,no-member
+import functools
 import os
 
 import grpc
 
+from instill.utils.health_cache import HealthCache
 from instill.utils.logger import Logger
 
 
@@ -22,14 +24,60 @@ class NamespaceException(Exception):
         return self.message
 
 
+def _check_serving(client) -> bool:
+    health = getattr(client, "health", None)
+    if isinstance(health, HealthCache):
+        return health.is_serving()
+    return client.is_serving()
+
+
+def _invalidate_health(client, rpc_error: grpc.RpcError):
+    health = getattr(client, "health", None)
+    if not isinstance(health, HealthCache):
+        return
+    code = rpc_error.code() if hasattr(rpc_error, "code") else None
+    if code in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED):
+        health.invalidate()
+
+
+def _call_raising(func, *args, **kwargs):
+    if not _check_serving(args[0]):
+        raise NotServingException
+    try:
+        return func(*args, **kwargs)
+    except grpc.RpcError as rpc_error:
+        _invalidate_health(args[0], rpc_error)
+        raise
+
+
+_GRPC_HANDLERS: set = set()
+
+
+def is_grpc_handler(func) -> bool:
+    """Whether `func` was decorated with `grpc_handler`."""
+    return func in _GRPC_HANDLERS
+
+
 def grpc_handler(func):
+    """Check the serving status before an RPC and exit the process on errors.
+
+    With `silent=True` RPC errors resolve to None instead. With
+    `raise_errors=True` every error, including `NotServingException`, is
+    raised to the caller, for helpers such as batchers and pollers that
+    report errors per request instead of exiting.
+    """
+
+    @functools.wraps(func)
     def func_wrapper(*args, **kwargs):
         silent = kwargs.pop("silent", False)
+        if kwargs.pop("raise_errors", False):
+            return _call_raising(func, *args, **kwargs)
         try:
-            if not args[0].is_serving():
+            if not _check_serving(args[0]):
                 raise NotServingException
             return func(*args, **kwargs)
         except grpc.RpcError as rpc_error:
+            _invalidate_health(args[0], rpc_error)
             if not silent:
                 Logger.w(rpc_error.code())
                 Logger.w(rpc_error.details())
@@ -38,4 +86,45 @@ def grpc_handler(func):
             Logger.exception(e)
             os._exit(1)
 
+    _GRPC_HANDLERS.add(func_wrapper)
+    return func_wrapper
+
+
+def raising(method):
+    """A `grpc_handler` method that raises errors instead of exiting.
+
+    Example:
+        resp = raising(client.pipeline.trigger)(namespace_id, pipeline_id, data)
+    """
+    return functools.partial(method, raise_errors=True)
+
+
+async def _async_check_serving(client) -> bool:
+    health = getattr(client, "health", None)
+    if isinstance(health, HealthCache):
+        return await health.async_is_serving()
+    return await client.is_serving()
+
+
+def async_grpc_handler(func):
+    """Coroutine counterpart of `grpc_handler`.
+
+    Errors are re-raised instead of exiting the process, since an event loop
+    usually serves many unrelated requests. With `silent=True` RPC errors
+    resolve to None.
+    """
+
+    @functools.wraps(func)
+    async def func_wrapper(*args, **kwargs):
+        silent = kwargs.pop("silent", False)
+        if not await _async_check_serving(args[0]):
+            raise NotServingException
+        try:
+            return await func(*args, **kwargs)
+        except grpc.RpcError as rpc_error:
+            _invalidate_health(args[0], rpc_error)
+            if silent:
+                return None
+            raise
+
     return func_wrapper
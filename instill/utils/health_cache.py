@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+DEFAULT_HEALTH_CHECK_TTL = 30.0  # seconds
+DEFAULT_HEALTH_CHECK_TIMEOUT = 5.0  # seconds
+
+
+class HealthCache:
+    """TTL cache of a service's serving status.
+
+    `grpc_handler` consults this cache instead of issuing a `Readiness` RPC
+    before every call. Only a healthy status is cached: once stale it is
+    returned immediately while a background probe refreshes it. An unknown or
+    unhealthy status is probed synchronously on every check, so a transient
+    readiness failure does not fail calls for a whole TTL. `invalidate` forces the next check to probe, and a cache
+    created with `enabled=False` skips the pre-flight check entirely.
+
+    Async clients pass `async_probe` and use the `async_*` methods, which
+    refresh in a task on the running loop instead of a thread.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        ttl: float = DEFAULT_HEALTH_CHECK_TTL,
+        enabled: bool = True,
+        async_probe: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> None:
+        self._probe = probe
+        self._async_probe = async_probe
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._status: Optional[bool] = None
+        self._checked_at = 0.0
+        self._refreshing = False
+
+    def is_serving(self) -> bool:
+        if not self.enabled:
+            return True
+
+        with self._lock:
+            status = self._status
+            if self._is_fresh():
+                return bool(status)
+            if status:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._background_refresh, daemon=True
+                    ).start()
+                return True
+
+        return self.refresh()
+
+    async def async_is_serving(self) -> bool:
+        if not self.enabled:
+            return True
+
+        with self._lock:
+            status = self._status
+            if self._is_fresh():
+                return bool(status)
+            if status:
+                if not self._refreshing:
+                    self._refreshing = True
+                    self._refresh_task = asyncio.ensure_future(
+                        self._async_background_refresh()
+                    )
+                return True
+
+        return await self.async_refresh()
+
+    def refresh(self) -> bool:
+        try:
+            status = bool(self._probe())
+        except Exception:
+            status = False
+        self.set(status)
+        return status
+
+    async def async_refresh(self) -> bool:
+        if self._async_probe is None:
+            return await asyncio.to_thread(self.refresh)
+        try:
+            status = bool(await self._async_probe())
+        except Exception:
+            status = False
+        self.set(status)
+        return status
+
+    def set(self, status: bool):
+        with self._lock:
+            self._status = status
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._status = None
+
+    def _is_fresh(self) -> bool:
+        return bool(self._status) and time.monotonic() - self._checked_at < self.ttl
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    async def _async_background_refresh(self):
+        try:
+            await self.async_refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
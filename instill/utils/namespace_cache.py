@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+DEFAULT_NAMESPACE_CACHE_TTL = 3600.0  # seconds
+NAMESPACE_CACHE_FILE = "namespaces.json"
+
+
+class NamespaceCache:
+    """Process-wide TTL cache of namespace ID to UID lookups.
+
+    Resolving a `requester_id` takes a `CheckNamespace` RPC plus a
+    `GetUser` or `GetOrganization` RPC. Entries are keyed by host URL and
+    namespace ID, so each namespace is resolved once per host until it
+    expires after `ttl` seconds. With a `path`, entries are also saved to a
+    JSON file and reloaded by later processes.
+
+    Example:
+        set_namespace_cache(NamespaceCache.persistent())
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_NAMESPACE_CACHE_TTL,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        # "<url>/<namespace_id>" -> [uid, expires_at as wall-clock time]
+        self._entries: Dict[str, List] = {}
+        self._loaded = self.path is None
+
+    @classmethod
+    def persistent(cls, ttl: float = DEFAULT_NAMESPACE_CACHE_TTL) -> "NamespaceCache":
+        """A cache saved under the SDK's `CONFIG_DIR`."""
+        # imported here as loading instill.config reads the user's config file
+        from instill.config import CONFIG_DIR  # pylint: disable=import-outside-toplevel
+
+        return cls(ttl=ttl, path=CONFIG_DIR / NAMESPACE_CACHE_FILE)
+
+    def get(self, url: str, namespace_id: str) -> Optional[str]:
+        with self._lock:
+            self._load()
+            entry = self._entries.get(self._key(url, namespace_id))
+            if entry is None or entry[1] <= time.time():
+                return None
+            return entry[0]
+
+    def set(self, url: str, namespace_id: str, uid: str):
+        with self._lock:
+            self._load()
+            self._entries[self._key(url, namespace_id)] = [uid, time.time() + self.ttl]
+            self._save()
+
+    def invalidate(self, url: Optional[str] = None, namespace_id: Optional[str] = None):
+        """Drop one entry, every entry of a host, or the whole cache."""
+        with self._lock:
+            self._load()
+            if url is None:
+                self._entries.clear()
+            elif namespace_id is None:
+                prefix = self._key(url, "")
+                for key in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[key]
+            else:
+                self._entries.pop(self._key(url, namespace_id), None)
+            self._save()
+
+    def resolve(self, url: str, namespace_id: str, lookup: Callable[[str], str]) -> str:
+        uid = self.get(url, namespace_id)
+        if uid is None:
+            uid = lookup(namespace_id)
+            self.set(url, namespace_id, uid)
+        return uid
+
+    async def async_resolve(
+        self,
+        url: str,
+        namespace_id: str,
+        lookup: Callable[[str], Awaitable[str]],
+    ) -> str:
+        uid = self.get(url, namespace_id)
+        if uid is None:
+            uid = await lookup(namespace_id)
+            self.set(url, namespace_id, uid)
+        return uid
+
+    @staticmethod
+    def _key(url: str, namespace_id: str) -> str:
+        return f"{url}/{namespace_id}"
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:  # type: ignore[arg-type]
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, entry in entries.items():
+            if entry[1] > now:
+                self._entries.setdefault(key, entry)
+
+    def _save(self):
+        if self.path is None:
+            return
+        now = time.time()
+        entries = {k: e for k, e in self._entries.items() if e[1] > now}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+
+_default_cache = NamespaceCache()
+
+
+def get_namespace_cache() -> NamespaceCache:
+    """Return the process-wide `NamespaceCache` shared by all clients."""
+    return _default_cache
+
+
+def set_namespace_cache(cache: NamespaceCache):
+    """Replace the process-wide `NamespaceCache`, e.g. with a persistent one."""
+    global _default_cache  # pylint: disable=global-statement
+    _default_cache = cache
@@ -1,9 +1,14 @@
 # pylint: disable=no-member,wrong-import-position,too-many-lines,no-name-in-module
 import base64
+import hashlib
+import json
 import os
+import threading
 
 import instill.protogen.artifact.artifact.v1alpha.artifact_pb2 as artifact_interface
 
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024**2  # bytes
+
 
 def get_file_type(file_path, file_extension):
     # Dictionary mapping file extensions to file types
@@ -55,7 +60,7 @@ def get_file_type(file_path, file_extension):
     return f"FILE_TYPE_{file_type.upper()}"
 
 
-def process_file(file_path) -> artifact_interface.File:
+def get_file_info(file_path) -> tuple:
     # Check if the file path exists
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File does not exist: {file_path}")
@@ -65,7 +70,11 @@ def process_file(file_path) -> artifact_interface.File:
     _, file_extension = os.path.splitext(file_name)
 
     # Check file type
-    file_type = get_file_type(file_path, file_extension)
+    return file_name, get_file_type(file_path, file_extension)
+
+
+def process_file(file_path) -> artifact_interface.File:
+    file_name, file_type = get_file_info(file_path)
 
     # Read file content and encode to base64
     with open(file_path, "rb") as file:
@@ -77,6 +86,79 @@ def process_file(file_path) -> artifact_interface.File:
     )
 
 
+class ChunkedFileReader:
+    """Read-only file wrapper that hands out at most `chunk_size` bytes per read.
+
+    Passed as a `requests` body, the file is sent with a `Content-Length`
+    header and streamed from disk one chunk at a time, so memory use does not
+    grow with the file size.
+    """
+
+    def __init__(self, file_path, chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._size = os.path.getsize(file_path)
+        self._file = open(file_path, "rb")  # pylint: disable=consider-using-with
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.chunk_size:
+            size = self.chunk_size
+        return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+
+def hash_file(file_path, block_size: int = 1024**2) -> str:
+    """Return the hex sha256 digest of a file, read in `block_size` blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class UploadManifest:
+    """Local JSON record of the files uploaded to each catalog, by content hash.
+
+    Layout: {"<namespace_id>/<catalog_id>": {"<sha256>": {"name", "file_uid"}}}
+    """
+
+    def __init__(self, path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._catalogs: dict = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._catalogs = json.load(f)
+
+    def get(self, catalog: str, content_hash: str):
+        with self._lock:
+            return self._catalogs.get(catalog, {}).get(content_hash)
+
+    def add(self, catalog: str, content_hash: str, name: str, file_uid: str):
+        with self._lock:
+            self._catalogs.setdefault(catalog, {})[content_hash] = {
+                "name": name,
+                "file_uid": file_uid,
+            }
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._catalogs, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
 # Example usage
 # file_path = "/tmp/example.pdf"
 # result = process_file(file_path)